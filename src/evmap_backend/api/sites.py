@@ -17,17 +17,23 @@ def sites(
     ne_lat: float,
     ne_lng: float,
     cluster_grid: float = None,
+    deduplicate: bool = False,
 ):
+    sites = ChargingSite.objects.all()
+    if deduplicate:
+        # only return the representative of sites published by several data sources
+        sites = sites.filter(duplicate_of__isnull=True)
+
     if cluster_grid:
         region = snap_bbox_to_grid(
             Polygon.from_bbox((sw_lng, sw_lat, ne_lng, ne_lat)),
             cluster_grid,
         )
-        queryset = ChargingSite.objects.filter(location_mercator__coveredby=region)
+        queryset = sites.filter(location_mercator__coveredby=region)
         clusters, queryset = cluster_sites(queryset, cluster_grid)
     else:
         region = Polygon.from_bbox((sw_lng, sw_lat, ne_lng, ne_lat))
-        queryset = ChargingSite.objects.filter(location__coveredby=region)
+        queryset = sites.filter(location__coveredby=region)
         clusters = None
 
     return ChargingSitesSchema(
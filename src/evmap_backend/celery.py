@@ -1,9 +1,11 @@
 import datetime
 import logging
 import os
+import time
 
 from celery import Celery
 from celery.schedules import schedule
+from celery.signals import beat_init, before_task_publish, task_prerun
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,10 +18,12 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
 
 
-@app.on_after_finalize.connect
-def setup_periodic_tasks(sender: Celery, **kwargs):
+@beat_init.connect
+def setup_periodic_tasks(sender, **kwargs):
+    # only runs in the beat process, so that workers do not query the database and
+    # import all data sources on startup
     from evmap_backend.data_sources.models import UpdateState
-    from evmap_backend.data_sources.registry import DATA_SOURCE_CLASSES
+    from evmap_backend.data_sources.registry import iter_data_source_classes
 
     update_states = {}
     try:
@@ -29,9 +33,10 @@ def setup_periodic_tasks(sender: Celery, **kwargs):
     except Exception:
         logger.debug("Could not read UpdateState table, skipping beat schedule seeding")
 
-    count = 0
-    for cls in DATA_SOURCE_CLASSES:
-        interval = cls.sync_interval
+    entries = {}
+    for cls in iter_data_source_classes():
+        # pull_data_source skips runs until the source's adaptive interval has passed
+        interval = cls.min_sync_interval
         if interval is None:
             continue
 
@@ -40,12 +45,40 @@ def setup_periodic_tasks(sender: Celery, **kwargs):
             "task": "evmap_backend.data_sources.tasks.pull_data_source",
             "schedule": schedule(run_every=interval),
             "args": (cls.id,),
+            # pulls that could not start before the next one is due are dropped
+            "options": {"queue": cls.queue, "expires": interval.total_seconds()},
             "last_run_at": last_update
             if last_update is not None
             else datetime.datetime.min,
         }
 
-        sender.conf.beat_schedule[f"pull-{cls.id}"] = entry
-        count += 1
+        entries[f"pull-{cls.id}"] = entry
 
-    logger.info(f"Registered {count} periodic pull tasks")
+    logger.info(f"Registered {len(entries)} periodic pull tasks")
+
+    entries["prune-sync-runs"] = {
+        "task": "evmap_backend.data_sources.tasks.prune_sync_runs",
+        "schedule": schedule(run_every=datetime.timedelta(days=1)),
+    }
+
+    sender.app.conf.beat_schedule.update(entries)
+    # the scheduler has already read the configuration when beat_init is sent
+    sender.scheduler.update_from_dict(entries)
+
+
+@before_task_publish.connect
+def add_enqueued_at(headers: dict, **kwargs):
+    # used to measure how long tasks wait in their queue
+    headers.setdefault("enqueued_at", time.time())
+
+
+@task_prerun.connect
+def record_queue_lag(task, **kwargs):
+    from evmap_backend.helpers import metrics
+
+    enqueued_at = task.request.get("enqueued_at")
+    if enqueued_at is None:
+        return
+    queue = (task.request.delivery_info or {}).get("routing_key") or "default"
+    metrics.timing(f"celery.{queue}.lag", time.time() - enqueued_at)
+    metrics.log_metrics(f"celery.{queue}.")
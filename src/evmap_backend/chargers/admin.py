@@ -32,6 +32,7 @@ class ChargingSiteAdmin(DALFModelAdmin, GISModelAdmin):
         ("country", DALFChoicesField),
     ]
     inlines = [ChargepointInline]
+    raw_id_fields = ["duplicate_of"]
     gis_widget = MapLibreWidget
 
 
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ChargersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "evmap_backend.chargers"
+
+    def ready(self):
+        from evmap_backend.chargers.tasks import schedule_conflation
+        from evmap_backend.data_sources.signals import sites_changed
+
+        sites_changed.connect(schedule_conflation, dispatch_uid="chargers_conflation")
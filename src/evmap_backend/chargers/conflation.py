@@ -0,0 +1,342 @@
+"""
+Conflation of ChargingSite records from different data sources.
+
+The same physical station is often published by several data sources (e.g. an
+aggregator and the operator itself). Sites are linked into groups of duplicates:
+
+1. Sites of different data sources sharing a chargepoint EVSEID are linked first.
+2. Remaining pairs of nearby sites from different data sources are scored by distance,
+   network and connector similarity, and linked greedily from the highest score down.
+
+A group never contains two sites of the same data source. Each group has one
+representative site, all other members point to it through ChargingSite.duplicate_of.
+"""
+
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db import connection, transaction
+from django.db.models import Count
+
+from evmap_backend.chargers.models import Chargepoint, ChargingSite, Connector
+
+logger = logging.getLogger(__name__)
+
+# Weight configuration for scoring components
+DISTANCE_WEIGHT = 0.4
+NETWORK_WEIGHT = 0.3
+CONNECTOR_WEIGHT = 0.3
+
+# Sites sharing an EVSEID are only linked up to this distance, to guard against
+# placeholder EVSEIDs used by several stations
+EVSEID_MAX_DISTANCE_M = 1000.0
+
+# Above this number of changed sites, incremental conflation falls back to a full run
+FULL_CONFLATION_THRESHOLD = 50_000
+# The same applies when the region around the changed sites grows beyond this size,
+# e.g. in dense areas where it spreads across a whole city
+MAX_REGION_SIZE = 100_000
+
+# Name of the lock that callers hold while conflating, so that two runs do not
+# overwrite each other's groups
+CONFLATION_LOCK = "conflation"
+
+
+def score_distance(distance_m: float, max_distance_m: float) -> float:
+    """Linear score from 1.0 at 0m to 0.0 at max_distance_m."""
+    if distance_m >= max_distance_m:
+        return 0.0
+    return 1.0 - (distance_m / max_distance_m)
+
+
+def power_matches(power_a: float, power_b: float) -> bool:
+    """Check if two power values are within a factor of 2 of each other."""
+    if power_a <= 0 or power_b <= 0:
+        return True  # If either is zero/unknown, don't penalize
+    ratio = power_a / power_b
+    return 0.5 <= ratio <= 2.0
+
+
+def _score_network(network_a: Optional[int], network_b: Optional[int]) -> float:
+    """1.0 for the same network, 0.0 for different ones, 0.5 if either is unknown."""
+    if network_a is None or network_b is None:
+        return 0.5
+    return 1.0 if network_a == network_b else 0.0
+
+
+def _connector_coverage(
+    connectors: Set[Tuple[str, float]], others: Set[Tuple[str, float]]
+) -> float:
+    """Fraction of connectors that have a connector of the same type and power."""
+    matched = sum(
+        1
+        for connector_type, power in connectors
+        if any(
+            other_type == connector_type and power_matches(power, other_power)
+            for other_type, other_power in others
+        )
+    )
+    return matched / len(connectors)
+
+
+def _score_connectors(
+    connectors_a: Set[Tuple[str, float]], connectors_b: Set[Tuple[str, float]]
+) -> float:
+    """
+    Score connector similarity of two sites, comparing the distinct (type, power)
+    combinations in both directions. Sources differ in how they count connectors, so
+    only the combinations are compared, not their number.
+    """
+    if not connectors_a or not connectors_b:
+        return 0.5  # No connector info, neutral score
+    return (
+        _connector_coverage(connectors_a, connectors_b)
+        + _connector_coverage(connectors_b, connectors_a)
+    ) / 2
+
+
+def score_site_pair(
+    distance_m: float,
+    network_a: Optional[int],
+    network_b: Optional[int],
+    connectors_a: Set[Tuple[str, float]],
+    connectors_b: Set[Tuple[str, float]],
+    max_distance_m: float,
+) -> float:
+    """
+    Compute weighted duplicate score (0-1) for two ChargingSites.
+    """
+    return (
+        DISTANCE_WEIGHT * score_distance(distance_m, max_distance_m)
+        + NETWORK_WEIGHT * _score_network(network_a, network_b)
+        + CONNECTOR_WEIGHT * _score_connectors(connectors_a, connectors_b)
+    )
+
+
+class _Groups:
+    """Union-find over site IDs which keeps the data sources of each group disjoint."""
+
+    def __init__(self, data_sources: Dict[int, str]):
+        self.parent = {site_id: site_id for site_id in data_sources}
+        self.data_sources = {
+            site_id: {data_source} for site_id, data_source in data_sources.items()
+        }
+
+    def find(self, site_id: int) -> int:
+        while self.parent[site_id] != site_id:
+            self.parent[site_id] = self.parent[self.parent[site_id]]
+            site_id = self.parent[site_id]
+        return site_id
+
+    def link(self, site_a: int, site_b: int) -> bool:
+        """Merge the groups of both sites, unless they share a data source."""
+        root_a, root_b = self.find(site_a), self.find(site_b)
+        if root_a == root_b:
+            return False
+        if self.data_sources[root_a] & self.data_sources[root_b]:
+            return False
+        if len(self.data_sources[root_a]) < len(self.data_sources[root_b]):
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.data_sources[root_a] |= self.data_sources.pop(root_b)
+        return True
+
+
+def _region_filter(alias: str, region: Optional[List[int]]) -> Tuple[str, list]:
+    if region is None:
+        return "", []
+    return f" AND {alias}.id = ANY(%s)", [region]
+
+
+def _evseid_pairs(region: Optional[List[int]]) -> List[Tuple[int, int]]:
+    """
+    Pairs of sites from different data sources that share chargepoint EVSEIDs, the
+    pairs sharing the most EVSEIDs first.
+    """
+    site_table = ChargingSite._meta.db_table
+    cp_table = Chargepoint._meta.db_table
+    filter_a, args_a = _region_filter("sa", region)
+    filter_b, args_b = _region_filter("sb", region)
+    sql = f"""
+        SELECT sa.id, sb.id, COUNT(*) AS shared
+        FROM {cp_table} a
+        JOIN {cp_table} b ON a.evseid = b.evseid AND a.site_id < b.site_id
+        JOIN {site_table} sa ON sa.id = a.site_id
+        JOIN {site_table} sb ON sb.id = b.site_id
+        WHERE a.evseid <> ''
+            AND sa.data_source <> sb.data_source
+            AND ST_DWithin(sa.location, sb.location, %s)
+            {filter_a} {filter_b}
+        GROUP BY sa.id, sb.id
+        ORDER BY shared DESC, sa.id, sb.id
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [EVSEID_MAX_DISTANCE_M, *args_a, *args_b])
+        return [(site_a, site_b) for site_a, site_b, _ in cursor.fetchall()]
+
+
+def _spatial_pairs(
+    region: Optional[List[int]], max_distance_m: float
+) -> List[Tuple[int, int, float, Optional[int], Optional[int]]]:
+    """Pairs of sites from different data sources within max_distance_m."""
+    site_table = ChargingSite._meta.db_table
+    filter_a, args_a = _region_filter("a", region)
+    filter_b, args_b = _region_filter("b", region)
+    sql = f"""
+        SELECT a.id, b.id, ST_Distance(a.location, b.location),
+            a.network_id, b.network_id
+        FROM {site_table} a
+        JOIN {site_table} b
+            ON ST_DWithin(a.location, b.location, %s)
+            AND a.id < b.id
+            AND a.data_source <> b.data_source
+        WHERE TRUE {filter_a} {filter_b}
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [max_distance_m, *args_a, *args_b])
+        return cursor.fetchall()
+
+
+def _prefetch_connectors(site_ids: Set[int]) -> Dict[int, Set[Tuple[str, float]]]:
+    """Fetch the distinct (type, power) combinations of the given sites."""
+    connectors: Dict[int, Set[Tuple[str, float]]] = defaultdict(set)
+    for site_id, connector_type, max_power in Connector.objects.filter(
+        chargepoint__site_id__in=site_ids
+    ).values_list("chargepoint__site_id", "connector_type", "max_power"):
+        connectors[site_id].add((connector_type, max_power))
+    return connectors
+
+
+def _expand_region(
+    site_ids: Iterable[int], max_distance_m: float, max_size: Optional[int] = None
+) -> Optional[Set[int]]:
+    """
+    Extend the given sites to the smallest region that is closed under the relations
+    used for linking: sites of other data sources within max_distance_m, sites sharing
+    an EVSEID and the current members of the same group.
+
+    No link crosses the border of such a region, so the groups computed inside it are
+    the same as those of a full run. Returns None as soon as the region grows beyond
+    max_size sites.
+    """
+    site_table = ChargingSite._meta.db_table
+    cp_table = Chargepoint._meta.db_table
+    sql = f"""
+        SELECT b.id
+        FROM {site_table} a
+        JOIN {site_table} b
+            ON ST_DWithin(a.location, b.location, %s)
+            AND a.data_source <> b.data_source
+        WHERE a.id = ANY(%s)
+        UNION
+        SELECT b.site_id
+        FROM {cp_table} a
+        JOIN {cp_table} b ON a.evseid = b.evseid
+        WHERE a.site_id = ANY(%s) AND a.evseid <> ''
+        UNION
+        SELECT id FROM {site_table} WHERE duplicate_of_id = ANY(%s)
+        UNION
+        SELECT duplicate_of_id FROM {site_table}
+        WHERE id = ANY(%s) AND duplicate_of_id IS NOT NULL
+    """
+
+    region: Set[int] = set()
+    new_ids = set(site_ids)
+    with connection.cursor() as cursor:
+        while new_ids:
+            region |= new_ids
+            if max_size is not None and len(region) > max_size:
+                return None
+            ids = list(new_ids)
+            cursor.execute(sql, [max_distance_m, ids, ids, ids, ids])
+            new_ids = {row[0] for row in cursor.fetchall()} - region
+    return region
+
+
+def conflate_sites(
+    site_ids: Optional[Iterable[int]] = None,
+    max_distance_m: float = 100.0,
+    min_confidence: float = 0.6,
+):
+    """
+    Link duplicate ChargingSites of different data sources into groups.
+
+    Args:
+        site_ids: Only recompute the groups around these sites, e.g. the ones that
+                  were created, changed or deleted by a sync. Defaults to all sites.
+        max_distance_m: Maximum distance in meters for spatial candidates.
+        min_confidence: Minimum score for two sites to be linked spatially.
+    """
+    region = None
+    if site_ids is not None:
+        site_ids = set(site_ids)
+        if len(site_ids) <= FULL_CONFLATION_THRESHOLD:
+            region_ids = _expand_region(site_ids, max_distance_m, MAX_REGION_SIZE)
+            if region_ids is None:
+                logger.info("Region of the changed sites is too large, conflating all")
+            elif not region_ids:
+                return
+            else:
+                region = sorted(region_ids)
+    queryset = ChargingSite.objects.all()
+    if region is not None:
+        queryset = queryset.filter(id__in=region)
+
+    sites = {
+        site_id: (data_source, chargepoint_count, duplicate_of)
+        for site_id, data_source, chargepoint_count, duplicate_of in queryset.annotate(
+            chargepoint_count=Count("chargepoints")
+        ).values_list("id", "data_source", "chargepoint_count", "duplicate_of_id")
+    }
+    groups = _Groups({site_id: site[0] for site_id, site in sites.items()})
+
+    # Phase 1: sites sharing EVSEIDs
+    evseid_links = sum(groups.link(a, b) for a, b in _evseid_pairs(region))
+
+    # Phase 2: greedy linking of nearby sites by score
+    pairs = _spatial_pairs(region, max_distance_m)
+    connectors = _prefetch_connectors(
+        {site_id for pair in pairs for site_id in pair[:2]}
+    )
+    scored_pairs = []
+    for site_a, site_b, distance_m, network_a, network_b in pairs:
+        score = score_site_pair(
+            distance_m,
+            network_a,
+            network_b,
+            connectors.get(site_a, set()),
+            connectors.get(site_b, set()),
+            max_distance_m,
+        )
+        if score >= min_confidence:
+            scored_pairs.append((score, site_a, site_b))
+    scored_pairs.sort(key=lambda x: (-x[0], x[1], x[2]))
+    spatial_links = sum(groups.link(a, b) for _, a, b in scored_pairs)
+
+    # The member with the most chargepoints represents the group, then the oldest one
+    members = defaultdict(list)
+    for site_id in sites:
+        members[groups.find(site_id)].append(site_id)
+    to_update = []
+    for group in members.values():
+        representative = min(group, key=lambda site_id: (-sites[site_id][1], site_id))
+        for site_id in group:
+            duplicate_of = None if site_id == representative else representative
+            if sites[site_id][2] != duplicate_of:
+                to_update.append(ChargingSite(id=site_id, duplicate_of_id=duplicate_of))
+
+    with transaction.atomic():
+        ChargingSite.objects.bulk_update(
+            to_update, fields=["duplicate_of_id"], batch_size=1000
+        )
+
+    logger.info(
+        "Conflation complete: %d sites in %d groups, %d EVSEID links, %d spatial "
+        "links, %d sites updated",
+        len(sites),
+        len(members),
+        evseid_links,
+        spatial_links,
+        len(to_update),
+    )
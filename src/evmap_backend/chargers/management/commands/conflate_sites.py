@@ -0,0 +1,37 @@
+from django.core.management import BaseCommand
+
+from evmap_backend.chargers.conflation import CONFLATION_LOCK, conflate_sites
+from evmap_backend.helpers.locks import exclusive
+
+
+class Command(BaseCommand):
+    help = "Link duplicate charging sites from different data sources"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-distance",
+            type=float,
+            default=None,
+            help="Maximum distance in meters for candidate search",
+        )
+        parser.add_argument(
+            "--min-confidence",
+            type=float,
+            default=None,
+            help="Minimum confidence score for two sites to be linked",
+        )
+
+    def handle(self, *args, **options):
+        kwargs = {
+            k: v
+            for k, v in {
+                "max_distance_m": options["max_distance"],
+                "min_confidence": options["min_confidence"],
+            }.items()
+            if v is not None
+        }
+
+        self.stdout.write(self.style.SUCCESS("Starting conflation..."))
+        with exclusive(CONFLATION_LOCK, wait=True):
+            conflate_sites(**kwargs)
+        self.stdout.write(self.style.SUCCESS("Conflation complete."))
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.9 on 2026-10-19 10:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("chargers", "0020_connector_chargers_co_chargep_0c31b6_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chargingsite",
+            name="duplicate_of",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="duplicates",
+                to="chargers.chargingsite",
+            ),
+        ),
+    ]
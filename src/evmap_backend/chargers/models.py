@@ -1,5 +1,3 @@
-from typing import Dict, Tuple
-
 from django.contrib.gis.db import models
 from django.contrib.gis.db.models import GeometryField
 from django.contrib.gis.db.models.functions import Transform
@@ -27,7 +25,6 @@ class Network(models.Model):
     name = models.CharField(max_length=255, blank=True)
     evse_operator_id = EVSEOperatorIDField(blank=True, unique=True)
     website = models.URLField(blank=True)
-    _network_cache = {}
 
     def __str__(self):
         if self.evse_operator_id:
@@ -39,22 +36,6 @@ class Network(models.Model):
         else:
             return self.name
 
-    @classmethod
-    def get_or_create(
-        cls, evse_operator_id: str, defaults: Dict[str, object]
-    ) -> Tuple["Network", bool]:
-        if evse_operator_id in cls._network_cache:
-            return cls._network_cache[evse_operator_id], False
-
-        network, created = Network.objects.get_or_create(
-            evse_operator_id=evse_operator_id,
-            defaults=defaults,
-        )
-
-        cls._network_cache[evse_operator_id] = network
-
-        return network, created
-
 
 class ChargingSite(models.Model):
     class Meta:
@@ -96,6 +77,16 @@ class ChargingSite(models.Model):
     license_attribution = models.TextField(blank=True)
     license_attribution_link = models.URLField(blank=True)
 
+    # representative of the group of duplicates from other data sources, if this site
+    # is not the representative itself (see chargers.conflation)
+    duplicate_of = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="duplicates",
+    )
+
 
 class Chargepoint(models.Model):
     class Meta:
@@ -0,0 +1,37 @@
+import logging
+from typing import List, Optional
+
+from celery import shared_task
+from django.db import transaction
+
+from evmap_backend.chargers.conflation import (
+    CONFLATION_LOCK,
+    FULL_CONFLATION_THRESHOLD,
+    conflate_sites,
+)
+from evmap_backend.helpers.locks import exclusive
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def conflate_sites_task(site_ids: Optional[List[int]] = None):
+    """Recompute the groups of duplicate sites, only around the given sites if any."""
+    with exclusive(CONFLATION_LOCK, wait=True):
+        conflate_sites(site_ids)
+
+
+def schedule_conflation(sender, data_source: str, site_ids: set, **kwargs):
+    """
+    Receiver for sites_changed, which recomputes the groups of duplicates around the
+    changed sites once the sync has been committed.
+    """
+    # large changes are conflated in full, instead of sending all IDs to the worker
+    if len(site_ids) > FULL_CONFLATION_THRESHOLD:
+        args = ()
+    else:
+        args = (sorted(site_ids),)
+    logger.info(
+        f"{len(site_ids)} sites of {data_source} changed, scheduling conflation"
+    )
+    transaction.on_commit(lambda: conflate_sites_task.delay(*args))
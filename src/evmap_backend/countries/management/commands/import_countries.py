@@ -9,6 +9,7 @@ from django.contrib.gis.geos import GEOSGeometry, MultiPolygon
 from django.core.management import BaseCommand
 
 from evmap_backend.countries.models import Country
+from evmap_backend.countries.resolver import invalidate_country_resolver
 from evmap_backend.helpers.geo import WGS84
 
 
@@ -56,6 +57,7 @@ class Command(BaseCommand):
                     )
                     count += 1
 
+                invalidate_country_resolver()
                 self.stdout.write(
                     self.style.SUCCESS(f"Successfully imported {count} countries.")
                 )
@@ -11,7 +11,6 @@ class Country(models.Model):
     @staticmethod
     def get_country_for_point(point: Point) -> str | None:
         """Return the ISO2 country code for a point, or None if not found."""
-        match = Country.objects.filter(geom__contains=point).first()
-        if match is None:
-            return None
-        return match.iso2
+        from evmap_backend.countries.resolver import get_country_resolver
+
+        return get_country_resolver().resolve(point)
@@ -0,0 +1,147 @@
+"""
+In-process resolution of country codes for points.
+
+Country geometries are loaded from the database once, simplified and prepared, and
+indexed in a regular grid of one-degree cells. A point lookup only has to check the
+few countries whose geometry intersects the cell of the point, and cells that are
+completely covered by a single country are answered without any geometry test.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.contrib.gis.geos import GEOSGeometry, Point, Polygon
+
+from evmap_backend.helpers.geo import WGS84
+
+logger = logging.getLogger(__name__)
+
+Cell = Tuple[int, int]
+
+
+class CountryResolver:
+    def __init__(
+        self,
+        countries: Iterable[Tuple[str, GEOSGeometry]],
+        cell_size: float = 1.0,
+        fallback: Optional[Callable[[Point, List[str]], Optional[str]]] = None,
+    ):
+        self.cell_size = cell_size
+        self.fallback = fallback
+        self._geoms: Dict[str, object] = {}
+        # cell -> ISO2 code if the cell is covered completely by one country
+        self._covered: Dict[Cell, str] = {}
+        # cell -> ISO2 codes of the countries intersecting the cell
+        self._candidates: Dict[Cell, List[str]] = defaultdict(list)
+
+        for iso2, geom in countries:
+            prepared = geom.prepared
+            self._geoms[iso2] = prepared
+            xmin, ymin, xmax, ymax = geom.extent
+            for x in range(self._index(xmin), self._index(xmax) + 1):
+                for y in range(self._index(ymin), self._index(ymax) + 1):
+                    cell = self._cell_polygon(x, y)
+                    if prepared.covers(cell):
+                        self._covered[(x, y)] = iso2
+                    elif prepared.intersects(cell):
+                        self._candidates[(x, y)].append(iso2)
+
+    @classmethod
+    def from_database(cls, tolerance: float = 0.001) -> "CountryResolver":
+        """
+        Build a resolver from the Country table. Geometries are simplified with the
+        given tolerance (in degrees). Points close to a border that are not inside any
+        of the simplified geometries are looked up in the database.
+        """
+        from evmap_backend.countries.models import Country
+
+        def exact_lookup(point: Point, candidates: List[str]) -> Optional[str]:
+            match = Country.objects.filter(
+                iso2__in=candidates, geom__contains=point
+            ).first()
+            return match.iso2 if match is not None else None
+
+        start = time.perf_counter()
+        resolver = cls(
+            (
+                (country.iso2, country.geom.simplify(tolerance, preserve_topology=True))
+                for country in Country.objects.all()
+            ),
+            fallback=exact_lookup,
+        )
+        logger.info(
+            "Loaded %d countries into resolver in %.1fs",
+            len(resolver._geoms),
+            time.perf_counter() - start,
+        )
+        return resolver
+
+    def _index(self, coordinate: float) -> int:
+        return math.floor(coordinate / self.cell_size)
+
+    def _cell_polygon(self, x: int, y: int) -> Polygon:
+        return Polygon.from_bbox(
+            (
+                x * self.cell_size,
+                y * self.cell_size,
+                (x + 1) * self.cell_size,
+                (y + 1) * self.cell_size,
+            )
+        )
+
+    def resolve(self, point: Point | Tuple[float, float]) -> Optional[str]:
+        """Return the ISO2 country code for a point, or None if not found."""
+        if not isinstance(point, Point):
+            point = Point(*point, srid=WGS84)
+        cell = (self._index(point.x), self._index(point.y))
+
+        covered = self._covered.get(cell)
+        if covered is not None:
+            return covered
+
+        candidates = self._candidates.get(cell, ())
+        for iso2 in candidates:
+            if self._geoms[iso2].covers(point):
+                return iso2
+        if candidates and self.fallback is not None:
+            # the point may be just outside of a simplified geometry
+            return self.fallback(point, candidates)
+        return None
+
+    def resolve_many(
+        self, points: Sequence[Point | Tuple[float, float]]
+    ) -> List[Optional[str]]:
+        """Return the ISO2 country codes for a batch of points."""
+        return [self.resolve(point) for point in points]
+
+
+_resolver: Optional[CountryResolver] = None
+_resolver_loaded = 0.0
+_resolver_lock = threading.Lock()
+
+RESOLVER_MAX_AGE = 24 * 60 * 60
+
+
+def get_country_resolver() -> CountryResolver:
+    """
+    Return the process-wide CountryResolver, loading it on first use. The resolver
+    is reloaded once a day so that long-running processes pick up changes made by
+    import_countries in other processes.
+    """
+    global _resolver, _resolver_loaded
+    with _resolver_lock:
+        if _resolver is None or time.monotonic() - _resolver_loaded > RESOLVER_MAX_AGE:
+            _resolver = CountryResolver.from_database()
+            _resolver_loaded = time.monotonic()
+        return _resolver
+
+
+def invalidate_country_resolver():
+    """Discard the loaded resolver, so that it is reloaded on next use."""
+    global _resolver
+    with _resolver_lock:
+        _resolver = None
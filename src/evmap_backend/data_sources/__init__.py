@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from datetime import timedelta
 from enum import Enum
-from typing import List
+from typing import BinaryIO, List
 
 from django.http import HttpRequest
 from django.utils.functional import classproperty
@@ -27,6 +27,11 @@ class DataType(Enum):
     """
 
 
+# Celery queues, each consumed by its own workers (see docker/supervisord.conf)
+REALTIME_QUEUE = "realtime"
+STATIC_QUEUE = "static"
+
+
 class UpdateMethod(Enum):
     PULL = 1
     """Data can be retrieved by calling pull_data from a cron job"""
@@ -83,13 +88,54 @@ class DataSource(ABC):
 
         return timedelta(days=1)
 
+    @classproperty
+    def min_sync_interval(cls) -> timedelta | None:
+        """Returns the shortest interval for sources whose data changes on every pull.
+
+        The effective interval is adapted between min_sync_interval and
+        max_sync_interval, depending on how much data changed in the last pulls (see
+        evmap_backend.data_sources.schedule). Subclasses can override this property.
+        """
+        if cls.sync_interval is None:
+            return None
+        return max(cls.sync_interval / 5, timedelta(minutes=1))
+
+    @classproperty
+    def max_sync_interval(cls) -> timedelta | None:
+        """Returns the longest interval for sources whose data rarely changes.
+
+        Subclasses can override this property.
+        """
+        if cls.sync_interval is None:
+            return None
+        return cls.sync_interval * 7
+
+    @classproperty
+    def queue(cls) -> str:
+        """Returns the Celery queue on which pulls and pushes of this source are processed.
+
+        Realtime data has its own queue and workers, so that it is not delayed by long
+        static syncs. Subclasses can override this property.
+        """
+        if DataType.DYNAMIC in cls.supported_data_types:
+            return REALTIME_QUEUE
+        return STATIC_QUEUE
+
+    coalesce_pushes: bool = True
+    """
+    Whether queued HTTP pushes can be skipped if a newer push has already arrived.
+    This is correct for sources that push complete snapshots. Sources that push
+    incremental updates have to set this to False.
+    """
+
     def pull_data(self):
         raise NotImplementedError()
 
     def verify_push(self, request: HttpRequest):
         raise NotImplementedError()
 
-    def process_push(self, body: bytes):
+    def process_push(self, body: BinaryIO):
+        """Process a pushed payload, given as a (decompressed) binary file object."""
         raise NotImplementedError()
 
     def stream_data(self):
@@ -1,14 +1,199 @@
+from datetime import timedelta
+
 from django.contrib import admin
+from django.db.models import Avg, Count, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+
+from evmap_backend.data_sources.models import FeedState, SyncRun, UpdateState
 
-from evmap_backend.data_sources.models import UpdateState
+# Trends compare the runs of the last TREND_WINDOW to those of the TREND_BASELINE
+# before it
+TREND_WINDOW = timedelta(days=7)
+TREND_BASELINE = timedelta(days=28)
+# Averages that grew by more than this factor are highlighted as regressions
+TREND_REGRESSION_FACTOR = 1.5
 
 
 class UpdateStateAdmin(admin.ModelAdmin):
-    readonly_fields = ["data_source", "last_update", "push"]
-    list_display = ["data_source", "last_update", "push"]
+    readonly_fields = [
+        "data_source",
+        "last_update",
+        "push",
+        "sync_interval",
+        "last_changes",
+        "unchanged_pulls",
+        "last_push_received",
+    ]
+    list_display = [
+        "data_source",
+        "last_update",
+        "push",
+        "sync_interval",
+        "last_changes",
+        "unchanged_pulls",
+    ]
     list_filter = ["push"]
     ordering = ["last_update"]
 
 
+class FeedStateAdmin(admin.ModelAdmin):
+    readonly_fields = [
+        "data_source",
+        "url",
+        "etag",
+        "last_modified",
+        "content_hash",
+        "content_length",
+        "processing_time",
+        "last_checked",
+        "last_changed",
+        "bytes_downloaded",
+        "not_modified_count",
+        "time_saved",
+    ]
+    list_display = [
+        "data_source",
+        "url",
+        "last_checked",
+        "last_changed",
+        "bytes_downloaded",
+        "not_modified_count",
+        "time_saved",
+    ]
+    search_fields = ["data_source"]
+    ordering = ["data_source"]
+
+
+class SyncRunAdmin(admin.ModelAdmin):
+    list_display = [
+        "data_source",
+        "kind",
+        "started_at",
+        "duration",
+        "bytes_downloaded",
+        "db_time",
+        "sites_created",
+        "sites_updated",
+        "sites_deleted",
+        "statuses_created",
+        "has_error",
+    ]
+    list_filter = ["kind", "data_source"]
+    search_fields = ["data_source"]
+    date_hierarchy = "started_at"
+    change_list_template = "admin/data_sources/syncrun/change_list.html"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(boolean=True, description="Error")
+    def has_error(self, obj):
+        return bool(obj.error)
+
+    def get_urls(self):
+        urls = super().get_urls()
+        custom = [
+            path(
+                "trends/",
+                self.admin_site.admin_view(self.trends_view),
+                name="data_sources_syncrun_trends",
+            ),
+        ]
+        return custom + urls
+
+    def trends_view(self, request):
+        """Compare recent runs of each source to the baseline, or show daily averages
+        of a single source."""
+        data_source = request.GET.get("data_source")
+        context = dict(
+            self.admin_site.each_context(request),
+            opts=self.model._meta,
+            title="Sync run trends",
+            data_source=data_source,
+            window_days=TREND_WINDOW.days,
+            baseline_days=TREND_BASELINE.days,
+        )
+        if data_source:
+            context["days"] = self._daily_stats(data_source)
+        else:
+            context["sources"] = self._source_trends()
+        return TemplateResponse(
+            request, "admin/data_sources/syncrun/trends.html", context
+        )
+
+    def _daily_stats(self, data_source: str):
+        since = timezone.now() - TREND_WINDOW - TREND_BASELINE
+        return (
+            SyncRun.objects.filter(data_source=data_source, started_at__gte=since)
+            .annotate(day=TruncDate("started_at"))
+            .values("day")
+            .annotate(
+                runs=Count("id"),
+                errors=Count("id", filter=~Q(error="")),
+                avg_duration=Avg("duration"),
+                max_duration=Max("duration"),
+                avg_parse_time=Avg("parse_time"),
+                avg_db_time=Avg("db_time"),
+                avg_bytes=Avg("bytes_downloaded"),
+                sites_changed=Sum("sites_created")
+                + Sum("sites_updated")
+                + Sum("sites_deleted"),
+                statuses_created=Sum("statuses_created"),
+                peak_rss=Max("peak_rss"),
+            )
+            .order_by("-day")
+        )
+
+    def _source_trends(self):
+        recent_start = timezone.now() - TREND_WINDOW
+        recent = Q(started_at__gte=recent_start)
+        baseline = ~recent
+        rows = (
+            SyncRun.objects.filter(started_at__gte=recent_start - TREND_BASELINE)
+            .values("data_source")
+            .annotate(
+                runs=Count("id", filter=recent),
+                errors=Count("id", filter=recent & ~Q(error="")),
+                duration=Avg("duration", filter=recent),
+                baseline_duration=Avg("duration", filter=baseline),
+                db_time=Avg("db_time", filter=recent),
+                baseline_db_time=Avg("db_time", filter=baseline),
+                bytes=Avg("bytes_downloaded", filter=recent),
+                baseline_bytes=Avg("bytes_downloaded", filter=baseline),
+                peak_rss=Max("peak_rss", filter=recent),
+                baseline_peak_rss=Max("peak_rss", filter=baseline),
+            )
+            .order_by("data_source")
+        )
+        trends = []
+        for row in rows:
+            for field in ["duration", "db_time", "bytes", "peak_rss"]:
+                row[f"{field}_change"] = _relative_change(
+                    row[field], row[f"baseline_{field}"]
+                )
+            row["regression"] = any(
+                row[f"{field}_change"] is not None
+                and row[f"{field}_change"] > (TREND_REGRESSION_FACTOR - 1) * 100
+                for field in ["duration", "db_time", "bytes", "peak_rss"]
+            )
+            trends.append(row)
+        return trends
+
+
+def _relative_change(value, baseline):
+    """Change of value compared to baseline in percent, None if unknown."""
+    if value is None or not baseline:
+        return None
+    return (value / baseline - 1) * 100
+
+
 # Register your models here.
 admin.site.register(UpdateState, UpdateStateAdmin)
+admin.site.register(FeedState, FeedStateAdmin)
+admin.site.register(SyncRun, SyncRunAdmin)
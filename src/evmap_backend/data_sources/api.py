@@ -1,21 +1,22 @@
-import gzip
 import logging
-from datetime import timedelta
+import time
 
-from django.utils import timezone
 from ninja import NinjaAPI
 
 from evmap_backend.data_sources import DataSource, UpdateMethod
-from evmap_backend.data_sources.models import UpdateState
+from evmap_backend.data_sources.push import spool_push
 from evmap_backend.data_sources.registry import get_data_source
+from evmap_backend.data_sources.tasks import process_push
 
 api = NinjaAPI(urls_namespace="data_sources")
 
 
-@api.post("/push/{data_source}")
+@api.post("/push/{data_source}", response={202: None})
 def push(request, data_source: str):
     """
     HTTP push endpoint for data updates
+
+    The payload is stored and processed asynchronously by a Celery task.
     """
     data_source: DataSource = get_data_source(data_source)
     if UpdateMethod.HTTP_PUSH not in data_source.supported_update_methods:
@@ -23,25 +24,18 @@ def push(request, data_source: str):
 
     data_source.verify_push(request)
 
-    logging.info(f"Processing push for {data_source.id}...")
-
-    body = request.body
-    if request.headers.get("Content-Encoding") == "gzip":
-        body = gzip.decompress(body)
-
-    data_source.process_push(body)
-
-    update_state, created = UpdateState.objects.get_or_create(
-        data_source=data_source.id,
-        defaults=dict(last_update=timezone.now(), push=True),
+    received_at = time.time()
+    path = spool_push(
+        data_source.id,
+        request,
+        compressed=request.headers.get("Content-Encoding") == "gzip",
+    )
+    process_push.apply_async(
+        (data_source.id, str(path), received_at), queue=data_source.queue
     )
-    if timezone.now() - update_state.last_update > timedelta(minutes=1):
-        update_state.last_update = timezone.now()
-        update_state.push = True
-        update_state.save()
-    logging.info(f"Successfully processed push for {data_source.id}")
+    logging.info(f"Queued push for {data_source.id}")
 
-    return 200, ""
+    return 202, None
 
 
 @api.api_operation(["HEAD"], "/push/{data_source}")
@@ -4,18 +4,20 @@ import re
 from dataclasses import dataclass
 from typing import Dict, Iterable, List, Optional, Tuple
 
-from django.contrib.gis.geos import Point
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
 from evmap_backend.chargers.fields import EVSEIDType, normalize_evseid, validate_evseid
-from evmap_backend.chargers.models import Chargepoint, ChargingSite, Connector, Network
-from evmap_backend.countries.models import Country
+from evmap_backend.chargers.models import Connector
 from evmap_backend.data_sources.datex2.parser.utils import find_common_part
 from evmap_backend.data_sources.sync import (
     ChargepointItem,
+    ChargepointRecord,
     ChargingSiteItem,
+    ConnectorRecord,
     RealtimeStatusItem,
+    SiteRecord,
+    StatusRecord,
 )
 from evmap_backend.helpers.database import none_to_blank
 from evmap_backend.realtime.models import RealtimeStatus
@@ -86,8 +88,8 @@ class Datex2Connector:
     max_power: float
     charging_mode: ChargingMode = None
 
-    def convert(self) -> Connector:
-        return Connector(
+    def convert(self) -> ConnectorRecord:
+        return ConnectorRecord(
             connector_type=connector_mapping.get(
                 self.connector_type, Connector.ConnectorTypes.OTHER
             ),
@@ -130,7 +132,7 @@ class Datex2RefillPoint:
     name: Datex2MultilingualString = None
 
     def convert(self) -> ChargepointItem:
-        cp = Chargepoint(
+        cp = ChargepointRecord(
             id_from_source=self.id,
             evseid=(self.get_evseid()),
             physical_reference=none_to_blank(
@@ -232,18 +234,7 @@ class Datex2EnergyInfrastructureSite:
         default_country: Optional[str],
     ) -> ChargingSiteItem:
         evseid = self.refill_points[0].get_evseid() if self.refill_points else None
-        if evseid:
-            operator_id = normalize_evseid(evseid)[:5]
-            network, created = Network.get_or_create(
-                evse_operator_id=operator_id,
-                defaults=dict(
-                    name=none_to_blank(
-                        self.operator_name.first() if self.operator_name else None
-                    )
-                ),
-            )
-        else:
-            network = None
+        operator_id = normalize_evseid(evseid)[:5] if evseid else None
 
         if self.name:
             name = self.name.first()
@@ -258,29 +249,31 @@ class Datex2EnergyInfrastructureSite:
         else:
             name = ""
 
-        site = ChargingSite(
+        site = SiteRecord(
             data_source=data_source,
             license_attribution=license_attribution,
             license_attribution_link=none_to_blank(license_attribution_link),
             id_from_source=self.id,
             name=name,
-            location=Point(*self.location),
-            network=network,
+            location=self.location,
             operator=self.operator_name.first()
             if self.operator_name is not None
             else "",
             street=none_to_blank(self.street),
             zipcode=none_to_blank(self.zipcode),
             city=none_to_blank(self.city),
-            country=(
-                self.country
-                or default_country
-                or Country.get_country_for_point(Point(*self.location))
-                or ""
-            ),
+            # missing countries are resolved for the whole batch in sync_chargers
+            country=self.country or default_country or "",
         )
         chargepoints = [rp.convert() for rp in self.refill_points]
-        return ChargingSiteItem(site, chargepoints)
+        return ChargingSiteItem(
+            site,
+            chargepoints,
+            network_operator_id=operator_id,
+            network_name=none_to_blank(
+                self.operator_name.first() if self.operator_name else None
+            ),
+        )
 
 
 @dataclass
@@ -309,8 +302,8 @@ class Datex2RefillPointStatus:
         data_source: str,
         license_attribution: str,
         license_attribution_link: Optional[str],
-    ) -> Tuple[str, RealtimeStatus]:
-        return self.refill_point_id, RealtimeStatus(
+    ) -> Tuple[str, StatusRecord]:
+        return self.refill_point_id, StatusRecord(
             status=status_map[self.status],
             timestamp=(
                 self.last_updated if self.last_updated is not None else timezone.now()
@@ -1,7 +1,9 @@
 import datetime
-import json
-from typing import Iterable, Optional, Tuple
+import io
+import re
+from typing import Iterable, Iterator, Optional, Tuple
 
+import ijson
 from tqdm import tqdm
 
 from evmap_backend.data_sources.datex2.parser import (
@@ -24,6 +26,118 @@ def get_alternatives(obj: dict, keys: Iterable[str], default=None):
     return default
 
 
+# ijson prefixes of the objects to parse. The messageContainer and payload wrappers and
+# the publication object are optional, as in the non-streaming parser.
+SITE_PREFIX = re.compile(
+    r"(messageContainer\.)?(payload\.(item\.)?)?"
+    r"(a?egiEnergyInfrastructureTablePublication\.)?"
+    r"energyInfrastructureTable\.item\.energyInfrastructureSite\.item"
+)
+SITE_STATUS_PREFIX = re.compile(
+    r"(messageContainer\.)?payload\.item\."
+    r"aegiEnergyInfrastructureStatusPublication\.energyInfrastructureSiteStatus\.item"
+)
+
+# The first object has to start within this many bytes of the document
+MAX_HEAD_SIZE = 16 * 1024 * 1024
+
+
+class _ReplayStream:
+    """Binary file object that returns already-read bytes before reading on."""
+
+    def __init__(self, head: bytes, stream):
+        self._head = head
+        self._stream = stream
+
+    def read(self, size: int = -1) -> bytes:
+        if not self._head:
+            return self._stream.read(size)
+        if size < 0:
+            result, self._head = self._head + self._stream.read(), b""
+        else:
+            result, self._head = self._head[:size], self._head[size:]
+        return result
+
+
+class _HeadTooLarge(Exception):
+    pass
+
+
+class _RecordingStream:
+    """
+    Binary file object that keeps a copy of all bytes read from the stream, up to
+    max_size bytes.
+    """
+
+    def __init__(self, stream, max_size: int):
+        self._stream = stream
+        self._max_size = max_size
+        self.recorded = bytearray()
+
+    def read(self, size: int = -1) -> bytes:
+        if len(self.recorded) >= self._max_size:
+            raise _HeadTooLarge()
+        data = self._stream.read(size)
+        self.recorded += data
+        return data
+
+
+def _find_prefix(
+    data, pattern: re.Pattern, chunk_size: int, max_head_size: int
+) -> Tuple[Optional[str], bytes]:
+    """
+    Read the document until the first object matching the pattern starts. Returns its
+    prefix, or None if the document only contains empty lists at matching prefixes,
+    and the bytes read so far.
+
+    Raises ValueError if there is no matching list within max_head_size, e.g. because
+    the document is an error response, and ijson.JSONError if it is not valid JSON.
+    """
+    stream = _RecordingStream(data, max_head_size)
+    empty_list_found = False
+    try:
+        for prefix, event, _ in ijson.parse(stream, buf_size=chunk_size):
+            if event == "start_map" and pattern.fullmatch(prefix):
+                return prefix, bytes(stream.recorded)
+            if event == "start_array" and pattern.fullmatch(f"{prefix}.item"):
+                empty_list_found = True
+    except _HeadTooLarge:
+        raise ValueError(
+            f"No objects matching {pattern.pattern} in the first "
+            f"{len(stream.recorded)} bytes"
+        )
+    if not empty_list_found:
+        raise ValueError(f"No objects matching {pattern.pattern} found")
+    return None, bytes(stream.recorded)
+
+
+def iter_objects(
+    data,
+    pattern: re.Pattern,
+    chunk_size: int = 64 * 1024,
+    max_head_size: int = MAX_HEAD_SIZE,
+) -> Iterator[dict]:
+    """
+    Incrementally parse a JSON document given as a string, bytes or binary file object
+    and yield the objects whose ijson prefix matches the given pattern, one at a time.
+
+    The prefix is determined from the beginning of the document, all further objects
+    are expected at the same prefix. This way, the actual parsing can be done entirely
+    by ijson's C backend. The beginning of the document is scanned only once, up to
+    max_head_size bytes. Documents without any matching objects raise an error (see
+    _find_prefix), unless they contain an empty list at a matching prefix.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if isinstance(data, bytes):
+        data = io.BytesIO(data)
+
+    prefix, head = _find_prefix(data, pattern, chunk_size, max_head_size)
+    if prefix is None:
+        return
+    yield from ijson.items(_ReplayStream(head, data), prefix, use_float=True)
+
+
 def parse_multilingual_string(elem) -> Datex2MultilingualString:
     if isinstance(elem, dict) and "values" in elem:
         elem = elem["values"]
@@ -256,9 +370,16 @@ class Datex2JsonParser:
 
     def parse(self, data) -> Iterable[Datex2EnergyInfrastructureSite]:
         if isinstance(data, dict):
-            root = data
+            sites = self._find_sites(data)
         else:
-            root = json.loads(data)
+            sites = iter_objects(data, SITE_PREFIX)
+
+        for site in tqdm(sites, disable=None):
+            site = parse_energy_infrastructure_site(site, self.station_as_chargepoint)
+            if site is not None:
+                yield site
+
+    def _find_sites(self, root: dict) -> Iterable[dict]:
         if "messageContainer" in root:
             root = root["messageContainer"]
         if "payload" in root:
@@ -276,23 +397,10 @@ class Datex2JsonParser:
             root,
         )
         for table in root["energyInfrastructureTable"]:
-            for site in tqdm(table["energyInfrastructureSite"], disable=None):
-                site = parse_energy_infrastructure_site(
-                    site, self.station_as_chargepoint
-                )
-                if site is not None:
-                    yield site
+            yield from table["energyInfrastructureSite"]
 
     def parse_status(
         self, data, default_timezone=None
     ) -> Iterable[Datex2EnergyInfrastructureSiteStatus]:
-        root = json.loads(data)
-        if "messageContainer" in root:
-            root = root["messageContainer"]
-        root = root["payload"]
-
-        for payload in root:
-            for site in payload["aegiEnergyInfrastructureStatusPublication"][
-                "energyInfrastructureSiteStatus"
-            ]:
-                yield parse_energy_infrastructure_site_status(site, default_timezone)
+        for site in iter_objects(data, SITE_STATUS_PREFIX):
+            yield parse_energy_infrastructure_site_status(site, default_timezone)
@@ -1,5 +1,6 @@
 import datetime
-from typing import Iterable, Optional, Tuple
+import io
+from typing import Iterable, Iterator, Optional, Tuple
 from xml.etree.ElementTree import Element
 
 from defusedxml import ElementTree
@@ -31,6 +32,13 @@ def tag(qname: str):
     return f"{{{ns[namespace]}}}{tag}"
 
 
+PAYLOAD_TAGS = {tag("con:payload"), tag("d2p:payload")}
+ROOT_TAGS = PAYLOAD_TAGS | {
+    tag("egi:EnergyInfrastructureTablePublication"),
+    tag("egi:EnergyInfrastructureStatusPublication"),
+}
+
+
 def text_if_exists(elem: Element, tag: str):
     found = elem.find(tag, ns)
     if found is not None:
@@ -39,20 +47,49 @@ def text_if_exists(elem: Element, tag: str):
         return None
 
 
-def find_payload(root: Element) -> Element:
-    if root.tag not in [
-        tag("con:payload"),
-        tag("d2p:payload"),
-        tag("egi:EnergyInfrastructureTablePublication"),
-        tag("egi:EnergyInfrastructureStatusPublication"),
-    ]:
-        if (result := root.find("con:payload", ns)) is not None:
-            root = result
-        elif (result := root.find("d2p:payload", ns)) is not None:
-            root = result
-        else:
-            raise ValueError("payload not found")
-    return root
+def iter_elements(xml, tags: Iterable[str]) -> Iterator[Element]:
+    """
+    Incrementally parse an XML document given as a string, bytes or binary file object
+    and yield each element with one of the given tags as soon as it has been closed.
+
+    Yielded elements are removed from the tree afterwards, so that memory usage is
+    bounded by the size of a single element rather than by the whole document.
+
+    Raises ValueError if the document is not a DATEX II payload or publication, or a
+    container of a payload, so that e.g. an error response is not taken for an empty
+    document.
+    """
+    if isinstance(xml, str):
+        xml = io.StringIO(xml)
+    elif isinstance(xml, bytes):
+        xml = io.BytesIO(xml)
+
+    tags = {tag(t) for t in tags}
+    parents = []
+    payload_found = False
+    for event, elem in ElementTree.iterparse(xml, events=("start", "end")):
+        if event == "start":
+            if not parents:
+                if elem.tag in ROOT_TAGS:
+                    payload_found = True
+                elif not elem.tag.startswith("{http://datex2.eu/schema/"):
+                    raise ValueError(f"payload not found, root element is {elem.tag}")
+            elif len(parents) == 1 and elem.tag in PAYLOAD_TAGS:
+                payload_found = True
+            parents.append(elem)
+            continue
+
+        parents.pop()
+        if elem.tag in tags:
+            if not payload_found:
+                raise ValueError("payload not found")
+            yield elem
+            if parents:
+                parents[-1].remove(elem)
+            elem.clear()
+
+    if not payload_found:
+        raise ValueError("payload not found")
 
 
 def parse_multilingual_string(elem: Element) -> Optional[Datex2MultilingualString]:
@@ -221,28 +258,21 @@ class Datex2XmlParser:
         self.realtime_station_as_site = realtime_station_as_site
 
     def parse(self, xml) -> Iterable[Datex2EnergyInfrastructureSite]:
-        root = ElementTree.fromstring(xml)
-        root = find_payload(root)
-
-        for table in root.findall("egi:energyInfrastructureTable", ns):
-            for site in tqdm(
-                table.findall("egi:energyInfrastructureSite", ns), disable=None
-            ):
-                yield parse_energy_infrastructure_site(site)
+        for site in tqdm(
+            iter_elements(xml, ["egi:energyInfrastructureSite"]), disable=None
+        ):
+            yield parse_energy_infrastructure_site(site)
 
     def parse_status(
         self, xml, default_timezone=None
     ) -> Iterable[Datex2EnergyInfrastructureSiteStatus]:
-        root = ElementTree.fromstring(xml)
-        root = find_payload(root)
-
-        for site in root.findall("egi:energyInfrastructureSiteStatus", ns):
-            if self.realtime_station_as_site:
-                for station in site.findall(
-                    "egi:energyInfrastructureStationStatus", ns
-                ):
-                    yield parse_energy_infrastructure_station_status(
-                        station, default_timezone
-                    )
-            else:
+        if self.realtime_station_as_site:
+            for station in iter_elements(
+                xml, ["egi:energyInfrastructureStationStatus"]
+            ):
+                yield parse_energy_infrastructure_station_status(
+                    station, default_timezone
+                )
+        else:
+            for site in iter_elements(xml, ["egi:energyInfrastructureSiteStatus"]):
                 yield parse_energy_infrastructure_site_status(site, default_timezone)
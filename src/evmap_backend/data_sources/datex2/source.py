@@ -1,14 +1,12 @@
 import datetime
-import logging
 import os
 from abc import abstractmethod
-from typing import Optional
+from functools import cache
+from typing import BinaryIO, Optional
 from urllib.parse import unquote_to_bytes
 
 import pytz
 import requests
-from cryptography.x509 import load_pem_x509_certificate, load_pem_x509_certificates
-from cryptography.x509.verification import PolicyBuilder, Store
 from django.http import HttpRequest
 from django.utils import timezone
 from django.utils.functional import classproperty
@@ -16,6 +14,7 @@ from django.utils.functional import classproperty
 from evmap_backend.data_sources import DataSource, DataType, UpdateMethod
 from evmap_backend.data_sources.datex2.parser.json import Datex2JsonParser
 from evmap_backend.data_sources.datex2.parser.xml import Datex2XmlParser
+from evmap_backend.data_sources.fetch import fetch_feed
 from evmap_backend.data_sources.models import UpdateState
 from evmap_backend.data_sources.sync import sync_chargers, sync_statuses
 from evmap_backend.settings import BASE_DIR
@@ -30,7 +29,7 @@ class BaseDatex2DataSource(DataSource):
     default_country = None
 
     @abstractmethod
-    def get_data(self) -> str:
+    def get_data(self) -> str | BinaryIO:
         """Get the data from the data source"""
         pass
 
@@ -44,17 +43,13 @@ class BaseDatex2DataSource(DataSource):
         pass
 
     def pull_data(self):
-        try:
-            root = self.get_data()
-            self._parse_data(root)
-        except NotModifiedError:
-            logging.info("Not modified")
-
-    def process_push(self, body: bytes):
-        root = body.decode("utf-8")
+        root = self.get_data()
         self._parse_data(root)
 
-    def _parse_data(self, root: str):
+    def process_push(self, body: BinaryIO):
+        self._parse_data(body)
+
+    def _parse_data(self, root: str | BinaryIO):
         if self.supported_data_types == [DataType.STATIC]:
             sites_datex = self.parser.parse(root)
             sync_chargers(
@@ -89,15 +84,14 @@ class BaseDatex2DataSource(DataSource):
             raise NotImplementedError()
 
 
-mobilithek_store = Store(
-    load_pem_x509_certificates(
-        open(BASE_DIR / "evmap_backend/certificates/mobilithek.pem", "rb").read()
-    )
-)
-
+@cache
+def get_mobilithek_store():
+    """Trust store for client certificates of Mobilithek pushes, loaded on first use"""
+    from cryptography.x509 import load_pem_x509_certificates
+    from cryptography.x509.verification import Store
 
-class NotModifiedError(Exception):
-    pass
+    with open(BASE_DIR / "evmap_backend/certificates/mobilithek.pem", "rb") as f:
+        return Store(load_pem_x509_certificates(f.read()))
 
 
 class BaseMobilithekDatex2DataSource(BaseDatex2DataSource):
@@ -109,30 +103,33 @@ class BaseMobilithekDatex2DataSource(BaseDatex2DataSource):
     def subscription_id(self):
         pass
 
-    def get_data(self) -> str:
+    def get_data(self) -> str | BinaryIO:
         try:
             update_state = UpdateState.objects.get(data_source=self.id)
             last_update = update_state.last_update.astimezone(datetime.timezone.utc)
         except UpdateState.DoesNotExist:
             last_update = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
-        response = requests.get(
+        feed = fetch_feed(
+            self.id,
             "https://mobilithek.info:8443/mobilithek/api/v1.0/subscription",
             params={
                 "subscriptionID": self.subscription_id,
             },
+            # replaced by the Last-Modified date of the last pull, if there is one
             headers={
                 "If-Modified-Since": last_update.strftime("%a, %d %b %Y %H:%M:%S GMT")
             },
             cert=os.environ["MOBILITHEK_CERTIFICATE"],
         )
-        response.raise_for_status()
-        if response.status_code == 304:
-            raise NotModifiedError()
         if self.ignore_encoding:
-            response.encoding = response.apparent_encoding
-        return response.text
+            return feed.text(detect_encoding=True)
+        # let the parser read the feed incrementally
+        return feed.file
 
     def verify_push(self, request: HttpRequest):
+        from cryptography.x509 import load_pem_x509_certificate
+        from cryptography.x509.verification import PolicyBuilder
+
         if "X-Forwarded-Client-Cert" not in request.headers:
             raise PermissionError("Client certificate missing")
 
@@ -140,7 +137,7 @@ class BaseMobilithekDatex2DataSource(BaseDatex2DataSource):
         cert = load_pem_x509_certificate(unquote_to_bytes(cert_header))
         verifier = (
             PolicyBuilder()
-            .store(mobilithek_store)
+            .store(get_mobilithek_store())
             .time(timezone.now())
             .build_client_verifier()
         )
@@ -153,8 +150,9 @@ class Datex2AustriaDataSource(BaseDatex2DataSource):
     license_attribution_link = "http://www.e-control.at/"
     # https://admin.ladestellen.at/#/api/registrieren
 
-    def get_data(self) -> str:
-        response = requests.get(
+    def get_data(self) -> str | BinaryIO:
+        feed = fetch_feed(
+            self.id,
             "https://api.e-control.at/charge/1.0/datex2/v3.5/energy-infrastructure-table-publication",
             headers={
                 "Accept": "application/xml",
@@ -162,8 +160,7 @@ class Datex2AustriaDataSource(BaseDatex2DataSource):
                 "Referer": "https://ev-map.app",
             },
         )
-        response.raise_for_status()
-        return response.text
+        return feed.file
 
 
 class Datex2AustriaRealtimeDataSource(BaseDatex2DataSource):
@@ -174,8 +171,9 @@ class Datex2AustriaRealtimeDataSource(BaseDatex2DataSource):
     static_data_source = "e-control_austria"
     # https://admin.ladestellen.at/#/api/registrieren
 
-    def get_data(self) -> str:
-        response = requests.get(
+    def get_data(self) -> str | BinaryIO:
+        feed = fetch_feed(
+            self.id,
             "https://api.e-control.at/charge/1.0/datex2/v3.5/energy-infrastructure-status-publication",
             headers={
                 "Accept": "application/xml",
@@ -183,8 +181,7 @@ class Datex2AustriaRealtimeDataSource(BaseDatex2DataSource):
                 "Referer": "https://ev-map.app",
             },
         )
-        response.raise_for_status()
-        return response.text
+        return feed.file
 
 
 class Datex2MobilithekEcoMovementDatex2DataSource(BaseMobilithekDatex2DataSource):
@@ -552,15 +549,13 @@ class BaseSpiriiDatex2DataSource(BaseDatex2DataSource):
     def customer_id(self) -> int:
         pass
 
-    def get_data(self) -> str:
+    def get_data(self) -> str | BinaryIO:
         url = (
             f"https://api.spirii.com/v2/afir/energy-infrastructure-statuses?customerIds={self.customer_id}"
             if DataType.DYNAMIC in self.supported_data_types
             else f"https://api.spirii.com/v2/afir/energy-infrastructure-tables?customerIds={self.customer_id}"
         )
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.text
+        return fetch_feed(self.id, url).file
 
 
 class Datex2AudiChargingHubDataSource(BaseSpiriiDatex2DataSource):
@@ -588,16 +583,15 @@ class BaseEcoMovementNapDatex2DataSource(BaseDatex2DataSource):
     def token(self) -> str:
         pass
 
-    def get_data(self) -> str:
-        response = requests.get(
+    def get_data(self) -> str | BinaryIO:
+        feed = fetch_feed(
+            self.id,
             "https://api.eco-movement.com/api/nap/datexii/locations",
             params={
                 "token": self.token,
             },
         )
-        response.raise_for_status()
-        response.encoding = response.apparent_encoding
-        return response.text
+        return feed.text(detect_encoding=True)
 
 
 class Datex2LuxembourgEcoMovementDataSource(BaseEcoMovementNapDatex2DataSource):
@@ -626,17 +620,16 @@ class Datex2SloveniaDataSource(BaseDatex2DataSource):
     )
     # https://nap.si/en/datasets_details?id=46963663-38dd-eb04-43a9-cca9bdc0e4ba
 
-    def get_data(self) -> str:
-        response = requests.get(
+    def get_data(self) -> str | BinaryIO:
+        feed = fetch_feed(
+            self.id,
             "https://b2b.nap.si/data/b2b.prometej.energyInfrastructureTablePublication",
             auth=(
                 os.environ["SLOVENIA_NAP_USERNAME"],
                 os.environ["SLOVENIA_NAP_PASSWORD"],
             ),
         )
-        response.raise_for_status()
-        response.encoding = response.apparent_encoding
-        return response.text
+        return feed.text(detect_encoding=True)
 
 
 class Datex2SloveniaRealtimeDataSource(BaseDatex2DataSource):
@@ -650,17 +643,16 @@ class Datex2SloveniaRealtimeDataSource(BaseDatex2DataSource):
     default_timezone = pytz.timezone("Europe/Ljubljana")
     # https://nap.si/en/datasets_details?id=acc8a643-9dac-ecad-58da-0ce20f88f4bd
 
-    def get_data(self) -> str:
-        response = requests.get(
+    def get_data(self) -> str | BinaryIO:
+        feed = fetch_feed(
+            self.id,
             "https://b2b.nap.si/data/b2b.prometej.energyInfrastructureStatusPublication",
             auth=(
                 os.environ["SLOVENIA_NAP_USERNAME"],
                 os.environ["SLOVENIA_NAP_PASSWORD"],
             ),
         )
-        response.raise_for_status()
-        response.encoding = response.apparent_encoding
-        return response.text
+        return feed.text(detect_encoding=True)
 
 
 class Datex2FinlandDataSource(BaseDatex2DataSource):
@@ -670,12 +662,12 @@ class Datex2FinlandDataSource(BaseDatex2DataSource):
     license_attribution_link = "https://www.digitraffic.fi/en/terms-of-service/"
     # https://www.digitraffic.fi/en/road-traffic/afir/
 
-    def get_data(self) -> str:
-        response = requests.get(
+    def get_data(self) -> str | BinaryIO:
+        feed = fetch_feed(
+            self.id,
             "https://afir.digitraffic.fi/api/charging-network/v1/locations/datex2-3.6",
         )
-        response.raise_for_status()
-        return response.text
+        return feed.file
 
 
 class BaseDatex2LatviaDataSource(BaseDatex2DataSource):
@@ -684,19 +676,20 @@ class BaseDatex2LatviaDataSource(BaseDatex2DataSource):
     def api_key(self) -> str:
         pass
 
-    def get_data(self) -> str:
+    def get_data(self) -> str | BinaryIO:
         response = requests.get(
             "https://www.transportdata.gov.lv/api/v1/metadata/file/info",
             headers={"x-api-key": self.api_key},
         ).json()
         file_id = response["files"][0]["file_id"]
-        response = requests.post(
+        feed = fetch_feed(
+            self.id,
             "https://www.transportdata.gov.lv/api/v1/get/file/download-file",
+            method="POST",
             headers={"x-api-key": self.api_key},
             json={"file_id": file_id, "format": "xml"},
         )
-        response.raise_for_status()
-        return response.text
+        return feed.file
 
 
 class Datex2LatviaEcoMovementDataSource(BaseDatex2LatviaDataSource):
@@ -724,12 +717,12 @@ class Datex2SpainDataSource(BaseDatex2DataSource):
     default_country = "ES"
     # https://nap.dgt.es/dataset/puntos-de-recarga-electrica-para-vehiculos
 
-    def get_data(self) -> str:
-        response = requests.get(
+    def get_data(self) -> str | BinaryIO:
+        feed = fetch_feed(
+            self.id,
             "https://infocar.dgt.es/datex2/v3/miterd/EnergyInfrastructureTablePublication/electrolineras.xml",
         )
-        response.raise_for_status()
-        return response.text
+        return feed.file
 
 
 class BaseMontaPublicDatex2DataSource(DataSource):
@@ -1,12 +1,12 @@
 import os
 from typing import Iterable
 
-import requests
 from django.contrib.gis.geos import Point
 from tqdm import tqdm
 
-from evmap_backend.chargers.models import Chargepoint, ChargingSite, Connector, Network
+from evmap_backend.chargers.models import Chargepoint, ChargingSite, Connector
 from evmap_backend.data_sources import DataSource, DataType, UpdateMethod
+from evmap_backend.data_sources.fetch import fetch_feed
 from evmap_backend.data_sources.sync import (
     ChargepointItem,
     ChargingSiteItem,
@@ -37,10 +37,6 @@ def parse_eliso_chargers(
             zipcode=item["postalCode"],
             city=item["city"],
             country=item["country_iso_3166_alpha_2"],
-            network=Network.get_or_create(
-                evse_operator_id=item["operator"],
-                defaults=dict(name=item["operator_name"]),
-            )[0],
             location=Point(
                 item["coordinates"]["longitude"], item["coordinates"]["latitude"]
             ),
@@ -60,18 +56,24 @@ def parse_eliso_chargers(
                 for connector in evse["connectors"]
             ]
             chargepoints.append(ChargepointItem(chargepoint, connectors))
-        yield ChargingSiteItem(site, chargepoints)
+        yield ChargingSiteItem(
+            site,
+            chargepoints,
+            network_operator_id=item["operator"],
+            network_name=item["operator_name"],
+        )
 
 
-def get_mobilithek_data():
-    response = requests.get(
+def get_mobilithek_data(data_source: str):
+    feed = fetch_feed(
+        data_source,
         API_URL,
         params={
             "subscriptionID": os.environ["MOBILITHEK_ELISO_STATIC_SUBSCRIPTION_ID"],
         },
         cert=os.environ["MOBILITHEK_CERTIFICATE"],
     )
-    return response.json()
+    return feed.json()
 
 
 class ElisoDataSource(DataSource):
@@ -82,6 +84,6 @@ class ElisoDataSource(DataSource):
     # https://mobilithek.info/offers/843477276990078976
 
     def pull_data(self):
-        root = get_mobilithek_data()
+        root = get_mobilithek_data(self.id)
         eliso_chargers = parse_eliso_chargers(root, self.id, self.license_attribution)
         sync_chargers(self.id, eliso_chargers)
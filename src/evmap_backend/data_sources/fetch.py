@@ -0,0 +1,288 @@
+"""
+Conditional downloads of complete feeds for PULL data sources.
+
+fetch_feed sends the ETag and Last-Modified validators of the last processed download
+of a URL and spools the response body to a temporary file while hashing it. If the
+server responds with 304 Not Modified, or the body of a static feed is identical to
+the last processed one, NotModifiedError is raised, so that parsing and syncing are
+skipped entirely. Identical bodies of DYNAMIC data sources are still processed, so
+that their statuses are refreshed.
+
+Sources that pull several feeds at once use fetch_feeds, which only raises
+NotModifiedError if every feed is unchanged. If any of them has changed, the unchanged
+ones are downloaded again without validators, so that the pull always sees all feeds.
+
+The new validators and the hash are only stored once the whole pull has succeeded:
+pull_data is run inside track_feeds, which saves the FeedState of all feeds fetched
+during the pull if no error occurred. This way, a feed whose sync failed is processed
+again on the next run, even if it has not changed. The temporary files of these feeds
+are closed at the end of the block; outside of track_feeds, the caller has to close
+the returned Feed.
+"""
+
+import hashlib
+import json
+import logging
+import tempfile
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, BinaryIO, List, Optional, Tuple
+
+import requests
+from django.utils import timezone
+from requests.compat import chardet
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from evmap_backend.data_sources import DataType
+from evmap_backend.data_sources.models import FeedState
+from evmap_backend.data_sources.registry import get_data_source_class
+from evmap_backend.data_sources.runs import record_run_stats
+from evmap_backend.helpers import metrics
+
+logger = logging.getLogger(__name__)
+
+# feeds up to this size are kept in memory, larger ones are spooled to disk
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+_pending: ContextVar[Optional[List[Tuple[FeedState, "Feed"]]]] = ContextVar(
+    "pending_feed_states", default=None
+)
+
+
+class NotModifiedError(Exception):
+    pass
+
+
+class Feed:
+    """The body of a downloaded feed, spooled to a temporary file."""
+
+    def __init__(self, file: BinaryIO, headers: CaseInsensitiveDict):
+        self.file = file
+        self.headers = headers
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def content(self) -> bytes:
+        self.file.seek(0)
+        return self.file.read()
+
+    def text(self, detect_encoding: bool = False) -> str:
+        """
+        Decode the body using the encoding given in the Content-Type header. If there
+        is none or detect_encoding is set, the encoding is guessed from the content.
+        """
+        content = self.content
+        encoding = None if detect_encoding else get_encoding_from_headers(self.headers)
+        if encoding is None:
+            encoding = chardet.detect(content)["encoding"] or "utf-8"
+        return content.decode(encoding, errors="replace")
+
+    def json(self) -> Any:
+        self.file.seek(0)
+        return json.load(self.file)
+
+
+def fetch_feed(
+    data_source: str,
+    url: str,
+    method: str = "GET",
+    session: Optional[requests.Session] = None,
+    skip_unchanged: Optional[bool] = None,
+    **kwargs,
+) -> Feed:
+    """
+    Download a feed, unless it is unchanged since it was last processed.
+
+    Additional keyword arguments are passed on to requests. Raises NotModifiedError if
+    the server responds with 304 Not Modified or, if skip_unchanged is set, the body has
+    not changed. skip_unchanged defaults to True unless the data source is DYNAMIC.
+    """
+    (feed,) = fetch_feeds(data_source, [url], method, session, skip_unchanged, **kwargs)
+    return feed
+
+
+def fetch_feeds(
+    data_source: str,
+    urls: List[str],
+    method: str = "GET",
+    session: Optional[requests.Session] = None,
+    skip_unchanged: Optional[bool] = None,
+    **kwargs,
+) -> List[Feed]:
+    """
+    Download several feeds that are processed together, unless all of them are
+    unchanged since they were last processed.
+
+    Raises NotModifiedError only if every feed is unchanged. Otherwise, the unchanged
+    feeds are downloaded again unconditionally and all feeds are returned in the order
+    of urls. See fetch_feed for the arguments.
+    """
+    if skip_unchanged is None:
+        skip_unchanged = _is_static(data_source)
+    if session is None:
+        with requests.Session() as session:
+            return fetch_feeds(
+                data_source, urls, method, session, skip_unchanged, **kwargs
+            )
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    states = [_get_state(data_source, url) for url in urls]
+    feeds: List[Optional[Feed]] = []
+    skipped = []
+    try:
+        for state in states:
+            try:
+                feeds.append(
+                    _download(
+                        state,
+                        session,
+                        method,
+                        {**headers, **_validators(state)},
+                        skip_unchanged,
+                        **kwargs,
+                    )
+                )
+            except NotModifiedError as e:
+                feeds.append(None)
+                skipped.append((state, str(e)))
+
+        if len(skipped) == len(states):
+            for state, reason in skipped:
+                _skip(state, reason)
+            raise NotModifiedError()
+
+        for i, state in enumerate(states):
+            if feeds[i] is None:
+                feeds[i] = _download(state, session, method, headers, False, **kwargs)
+    except BaseException:
+        if _pending.get() is None:
+            for feed in feeds:
+                if feed is not None:
+                    feed.close()
+        raise
+    return feeds
+
+
+def _get_state(data_source: str, url: str) -> FeedState:
+    state = FeedState.objects.filter(data_source=data_source, url=url).first()
+    if state is None:
+        state = FeedState(data_source=data_source, url=url)
+    return state
+
+
+def _validators(state: FeedState) -> dict:
+    headers = {}
+    if state.etag:
+        headers["If-None-Match"] = state.etag
+    if state.last_modified:
+        headers["If-Modified-Since"] = state.last_modified
+    return headers
+
+
+def _is_static(data_source: str) -> bool:
+    try:
+        source_class = get_data_source_class(data_source)
+    except ValueError:
+        # not a registered data source
+        return True
+    return DataType.DYNAMIC not in source_class.supported_data_types
+
+
+def _download(
+    state: FeedState,
+    session: requests.Session,
+    method: str,
+    headers: dict,
+    skip_unchanged: bool,
+    **kwargs,
+) -> Feed:
+    """
+    Download the feed of state. Raises NotModifiedError, without updating the state,
+    if it is unchanged.
+    """
+    file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    feed = None
+    try:
+        with session.request(
+            method, state.url, headers=headers, stream=True, **kwargs
+        ) as response:
+            response.raise_for_status()
+            if response.status_code == 304:
+                raise NotModifiedError("not modified")
+
+            content_hash = hashlib.sha256()
+            size = 0
+            for chunk in response.iter_content(CHUNK_SIZE):
+                content_hash.update(chunk)
+                file.write(chunk)
+                size += len(chunk)
+            file.seek(0)
+
+        metrics.incr(f"fetch.{state.data_source}.bytes_downloaded", size)
+        record_run_stats(bytes_downloaded=size)
+        state.bytes_downloaded += size
+        state.last_checked = timezone.now()
+
+        unchanged = state.content_hash == content_hash.hexdigest()
+        if unchanged and skip_unchanged:
+            raise NotModifiedError("unchanged")
+
+        state.etag = response.headers.get("ETag", "")
+        state.last_modified = response.headers.get("Last-Modified", "")
+        state.content_hash = content_hash.hexdigest()
+        state.content_length = size
+        if not unchanged:
+            state.last_changed = state.last_checked
+
+        feed = Feed(file, response.headers)
+        pending = _pending.get()
+        if pending is not None:
+            pending.append((state, feed))
+        return feed
+    finally:
+        if feed is None:
+            file.close()
+
+
+def _skip(state: FeedState, reason: str):
+    logger.info(f"{state.data_source}: {state.url} {reason}, skipping")
+    metrics.incr(f"fetch.{state.data_source}.not_modified")
+    metrics.incr(f"fetch.{state.data_source}.time_saved", state.processing_time)
+    state.not_modified_count += 1
+    state.time_saved += state.processing_time
+    state.last_checked = timezone.now()
+    state.save()
+
+
+@contextmanager
+def track_feeds():
+    """
+    Store the state of all feeds fetched within the block, if it completes without
+    error. The duration of the block is stored as the processing time of each feed,
+    which is counted as time saved whenever the feed is skipped later on.
+    """
+    pending = []
+    token = _pending.set(pending)
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        _pending.reset(token)
+        for _, feed in pending:
+            feed.close()
+
+    processing_time = time.monotonic() - start
+    for state, _ in pending:
+        state.processing_time = processing_time
+        state.save()
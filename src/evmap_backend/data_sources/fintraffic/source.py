@@ -1,28 +1,28 @@
+import asyncio
 import json
 import logging
-import time
 
 import paho.mqtt.client as mqtt
-from django.utils import timezone
 
 from evmap_backend.chargers.fields import normalize_evseid
 from evmap_backend.chargers.models import Chargepoint
-from evmap_backend.data_sources import DataSource, DataType, UpdateMethod
-from evmap_backend.data_sources.models import UpdateState
-from evmap_backend.realtime.models import RealtimeStatus
+from evmap_backend.data_sources.streaming import BaseStreamingDataSource
 
 logger = logging.getLogger(__name__)
 
 
-class FintrafficRealtimeDataSource(DataSource):
+class FintrafficRealtimeDataSource(BaseStreamingDataSource):
     id = "fintraffic_realtime"
-    supported_data_types = [DataType.DYNAMIC]
-    supported_update_methods = [UpdateMethod.STREAMING]
     license_attribution = "Fintraffic / digitraffic.fi, CC-BY 4.0"
     license_attribution_link = "https://www.digitraffic.fi/en/terms-of-service/"
+    static_data_source = "fintraffic"
 
-    def __init__(self):
-        self.updatestate_last_update = None
+    def _load_chargepoints(self):
+        return (
+            Chargepoint.objects.filter(site__data_source=self.static_data_source)
+            .exclude(evseid="")
+            .values_list("evseid", "id")
+        )
 
     def _on_connect(self, client, userdata, flags, rc, props):
         logger.info("Connected")
@@ -30,6 +30,8 @@ class FintrafficRealtimeDataSource(DataSource):
 
     def _on_disconnect(self, client, userdata, flags, rc, props):
         logger.info(f"Disconnected with reason code: {rc}")
+        # let the streaming runner handle reconnecting
+        client.disconnect()
 
     def _on_message(self, client, userdata, msg):
         logger.debug(f"Received message: {msg.topic} {msg.payload}")
@@ -40,49 +42,17 @@ class FintrafficRealtimeDataSource(DataSource):
 
         evseid = normalize_evseid(topic.split("/")[-1])
         evse_data = json.loads(msg.payload.decode("utf-8"))
+        self._handle_status(evseid, evse_data["status"])
 
-        try:
-            chargepoint = Chargepoint.objects.get(
-                site__data_source="fintraffic", evseid=evseid
-            )
-
-            current_status = (
-                RealtimeStatus.objects.filter(chargepoint=chargepoint)
-                .order_by("-timestamp")
-                .first()
-            )
-
-            if (
-                current_status is not None
-                and current_status.status == RealtimeStatus.Status[evse_data["status"]]
-            ):
-                logger.debug("ignoring update, no change")
-                return
-
-            RealtimeStatus(
-                chargepoint=chargepoint,
-                status=RealtimeStatus.Status[evse_data["status"]],
-                data_source=self.id,
-                license_attribution=self.license_attribution,
-                license_attribution_link=self.license_attribution_link,
-                timestamp=timezone.now(),
-            ).save()
-
-            now = time.perf_counter()
-            if (
-                self.updatestate_last_update is None
-                or now - self.updatestate_last_update > 60
-            ):
-                # save the update state, but only once per minute
-                UpdateState(data_source=self.id, push=True).save()
-        except Chargepoint.DoesNotExist:
-            logger.debug(f"ignoring update, chargepoint {evseid} does not exist")
-
-    def stream_data(self):
+    async def connect(self):
         client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, transport="websockets")
         client.on_connect = self._on_connect
         client.on_message = self._on_message
         client.on_disconnect = self._on_disconnect
         client.tls_set()
-        client.connect("afir.digitraffic.fi", 443, 60)
-        client.loop_forever()
+        await asyncio.to_thread(client.connect, "afir.digitraffic.fi", 443, 60)
+        try:
+            # paho runs its network loop in a worker thread, callbacks are called there
+            await asyncio.to_thread(client.loop_forever)
+        finally:
+            client.disconnect()
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class GoingelectricConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "evmap_backend.data_sources.goingelectric"
+
+    def ready(self):
+        from evmap_backend.data_sources.goingelectric.tasks import schedule_matching
+        from evmap_backend.data_sources.signals import sites_changed
+
+        sites_changed.connect(schedule_matching, dispatch_uid="goingelectric_matching")
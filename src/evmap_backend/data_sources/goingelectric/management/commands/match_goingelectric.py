@@ -1,6 +1,10 @@
 from django.core.management import BaseCommand
 
-from evmap_backend.data_sources.goingelectric.matching import match_ge_locations
+from evmap_backend.data_sources.goingelectric.matching import (
+    MATCHING_LOCK,
+    match_ge_locations,
+)
+from evmap_backend.helpers.locks import exclusive
 
 
 class Command(BaseCommand):
@@ -31,5 +35,6 @@ class Command(BaseCommand):
         }
 
         self.stdout.write(self.style.SUCCESS("Starting GoingElectric matching..."))
-        match_ge_locations(**kwargs)
+        with exclusive(MATCHING_LOCK, wait=True):
+            match_ge_locations(**kwargs)
         self.stdout.write(self.style.SUCCESS("Matching complete."))
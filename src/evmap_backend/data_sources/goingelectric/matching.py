@@ -5,12 +5,15 @@ Uses a weighted scoring algorithm (distance, network, chargepoint similarity) wi
 global greedy 1:1 assignment to ensure deterministic results.
 """
 
+import itertools
 import logging
 from collections import defaultdict
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
-from django.db import connection
+import numpy as np
+from django.db import connection, transaction
 
+from evmap_backend.chargers.conflation import power_matches, score_distance
 from evmap_backend.chargers.models import ChargingSite, Connector
 from evmap_backend.data_sources.goingelectric.models import (
     GE_CONNECTOR_TYPE_MAP,
@@ -26,12 +29,29 @@ DISTANCE_WEIGHT = 0.4
 NETWORK_WEIGHT = 0.3
 CHARGEPOINT_WEIGHT = 0.3
 
+# Bit of each connector type, and the bits of the connector types compatible with each
+# GE connector type, for the vectorized compatibility check in score_candidates
+CONNECTOR_TYPE_BITS: Dict[str, int] = {
+    connector_type.value: 1 << i
+    for i, connector_type in enumerate(Connector.ConnectorTypes)
+}
+GE_CONNECTOR_TYPE_MASKS: Dict[str, int] = {
+    ge_type: sum(CONNECTOR_TYPE_BITS[t] for t in types)
+    for ge_type, types in GE_CONNECTOR_TYPE_MAP.items()
+}
 
-def _score_distance(distance_m: float, max_distance_m: float) -> float:
-    """Linear score from 1.0 at 0m to 0.0 at max_distance_m."""
-    if distance_m >= max_distance_m:
-        return 0.0
-    return 1.0 - (distance_m / max_distance_m)
+# Above this number of changed records, or of records in the region around them,
+# incremental matching falls back to a full run, which is cheaper than expanding the
+# changed region
+FULL_MATCH_THRESHOLD = 10_000
+
+# Name of the lock that callers hold while matching, so that two runs do not
+# overwrite each other's assignments
+MATCHING_LOCK = "goingelectric_matching"
+
+# Number of candidate pairs whose chargepoints and connectors are compared at once in
+# score_candidates
+SCORE_CHUNK_SIZE = 10_000
 
 
 def _score_network(
@@ -87,21 +107,13 @@ def _score_chargepoints(
         ge_power_w = ge_cp.power * 1000  # GE power is in kW, Connector.max_power in W
 
         for site_type, site_power in site_connector_set:
-            if site_type in compatible_types and _power_matches(ge_power_w, site_power):
+            if site_type in compatible_types and power_matches(ge_power_w, site_power):
                 matched += 1
                 break
 
     return matched / total
 
 
-def _power_matches(power_a: float, power_b: float) -> bool:
-    """Check if two power values are within a factor of 2 of each other."""
-    if power_a <= 0 or power_b <= 0:
-        return True  # If either is zero/unknown, don't penalize
-    ratio = power_a / power_b
-    return 0.5 <= ratio <= 2.0
-
-
 def score_match(
     distance_m: float,
     ge_network_id: Optional[int],
@@ -114,7 +126,7 @@ def score_match(
     """
     Compute weighted match score (0-1) for a GE location / ChargingSite pair.
     """
-    dist_score = _score_distance(distance_m, max_distance_m)
+    dist_score = score_distance(distance_m, max_distance_m)
     net_score = _score_network(ge_network_id, site_network_id, network_mapping)
     cp_score = _score_chargepoints(ge_chargepoints, site_connectors)
 
@@ -125,6 +137,159 @@ def score_match(
     )
 
 
+def _expand(counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    For consecutive groups of the given sizes, return the index of the group and the
+    position within the group of each element.
+    """
+    groups = np.repeat(np.arange(len(counts)), counts)
+    starts = np.cumsum(counts) - counts
+    return groups, np.arange(len(groups)) - starts[groups]
+
+
+def score_candidates(
+    ge_ids: np.ndarray,
+    site_ids: np.ndarray,
+    distances: Sequence[float],
+    ge_network_ids: Sequence[Optional[int]],
+    site_network_ids: Sequence[Optional[int]],
+    network_mapping: Dict[int, Set[int]],
+    ge_chargepoints_by_location: Dict[int, List[GoingElectricChargepoint]],
+    connectors_by_site: Dict[int, List[Connector]],
+    max_distance_m: float = 200.0,
+) -> np.ndarray:
+    """
+    Compute score_match for all candidate pairs (ge_ids[i], site_ids[i]) at once.
+
+    The arithmetic is the same as in the scalar functions, so the scores are identical
+    to those of score_match. For the chargepoint score, every GE chargepoint of a pair
+    is compared with every connector of its site: connector types are encoded as bits,
+    so that the compatibility check is a bitwise AND with the mask of the GE type.
+    These comparisons are made for SCORE_CHUNK_SIZE pairs at a time.
+    """
+    ge_ids = np.asarray(ge_ids, dtype=np.int64)
+    site_ids = np.asarray(site_ids, dtype=np.int64)
+
+    distances = np.asarray(distances, dtype=np.float64)
+    dist_score = np.where(
+        distances >= max_distance_m, 0.0, 1.0 - (distances / max_distance_m)
+    )
+
+    ge_networks = np.array(
+        [-1 if n is None else n for n in ge_network_ids], dtype=np.int64
+    )
+    site_networks = np.array(
+        [-1 if n is None else n for n in site_network_ids], dtype=np.int64
+    )
+    has_mapping = np.isin(
+        ge_networks, [ge_net for ge_net, mapped in network_mapping.items() if mapped]
+    )
+    is_mapped = np.isin(
+        (ge_networks << 32) | site_networks,
+        [
+            (ge_net << 32) | site_net
+            for ge_net, mapped in network_mapping.items()
+            for site_net in mapped
+        ],
+    )
+    net_score = np.where(
+        (ge_networks < 0) | (site_networks < 0) | ~has_mapping,
+        0.5,
+        np.where(is_mapped, 1.0, 0.0),
+    )
+
+    # GE chargepoints and site connectors, stored consecutively per location / site
+    unique_ge_ids, ge_index = np.unique(ge_ids, return_inverse=True)
+    ge_cps = [
+        ge_chargepoints_by_location.get(ge_id, []) for ge_id in unique_ge_ids.tolist()
+    ]
+    cp_counts = np.array([len(cps) for cps in ge_cps], dtype=np.int64)
+    cp_starts = np.cumsum(cp_counts) - cp_counts
+    cp_masks = np.array(
+        [GE_CONNECTOR_TYPE_MASKS.get(cp.type, 0) for cps in ge_cps for cp in cps],
+        dtype=np.uint64,
+    )
+    # GE power is in kW, Connector.max_power in W
+    cp_powers = np.array(
+        [cp.power * 1000 for cps in ge_cps for cp in cps], dtype=np.float64
+    )
+
+    unique_site_ids, site_index = np.unique(site_ids, return_inverse=True)
+    site_conns = [
+        connectors_by_site.get(site_id, []) for site_id in unique_site_ids.tolist()
+    ]
+    conn_counts = np.array([len(conns) for conns in site_conns], dtype=np.int64)
+    conn_starts = np.cumsum(conn_counts) - conn_counts
+    conn_bits = np.array(
+        [
+            CONNECTOR_TYPE_BITS.get(c.connector_type, 0)
+            for conns in site_conns
+            for c in conns
+        ],
+        dtype=np.uint64,
+    )
+    conn_powers = np.array(
+        [c.max_power for conns in site_conns for c in conns], dtype=np.float64
+    )
+
+    # the comparisons are expanded for a chunk of pairs at a time, to bound the memory
+    # used by pairs of large locations
+    cp_scores = []
+    for chunk_start in range(0, len(ge_ids), SCORE_CHUNK_SIZE):
+        chunk = slice(chunk_start, chunk_start + SCORE_CHUNK_SIZE)
+        chunk_ge_index = ge_index[chunk]
+        chunk_site_index = site_index[chunk]
+
+        # one row per pair and GE chargepoint...
+        pair_cp_counts = cp_counts[chunk_ge_index]
+        pair_conn_counts = conn_counts[chunk_site_index]
+        row_pair, row_position = _expand(pair_cp_counts)
+        row_cp = cp_starts[chunk_ge_index[row_pair]] + row_position
+        # ...compared with each connector of the site
+        comp_row, comp_position = _expand(pair_conn_counts[row_pair])
+        comp_cp = row_cp[comp_row]
+        comp_conn = conn_starts[chunk_site_index[row_pair[comp_row]]] + comp_position
+
+        ge_power = cp_powers[comp_cp]
+        site_power = conn_powers[comp_conn]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = ge_power / site_power
+        similar_power = (
+            (ge_power <= 0) | (site_power <= 0) | ((0.5 <= ratio) & (ratio <= 2.0))
+        )
+        compatible = (cp_masks[comp_cp] & conn_bits[comp_conn]) != 0
+
+        row_matched = (
+            np.bincount(
+                comp_row,
+                weights=(compatible & similar_power).astype(np.float64),
+                minlength=len(row_pair),
+            )
+            > 0
+        )
+        matched = np.bincount(
+            row_pair,
+            weights=row_matched.astype(np.float64),
+            minlength=len(chunk_ge_index),
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = matched / pair_cp_counts
+        cp_scores.append(
+            np.where(
+                pair_cp_counts == 0,
+                0.5,
+                np.where(pair_conn_counts == 0, 0.0, fraction),
+            )
+        )
+    cp_score = np.concatenate(cp_scores) if cp_scores else np.zeros(0)
+
+    return (
+        DISTANCE_WEIGHT * dist_score
+        + NETWORK_WEIGHT * net_score
+        + CHARGEPOINT_WEIGHT * cp_score
+    )
+
+
 def _build_network_mapping() -> Dict[int, Set[int]]:
     """
     Build a lookup dict: GoingElectricNetwork.id -> set of chargers.Network.id
@@ -175,19 +340,15 @@ def match_ge_locations(
     # Build network mapping once
     network_mapping = _build_network_mapping()
 
-    # Prefetch all GE chargepoints grouped by location
+    # Prefetch the GE chargepoints of the locations to match, grouped by location
     ge_chargepoints_by_location: Dict[int, List[GoingElectricChargepoint]] = (
         defaultdict(list)
     )
-    for cp in GoingElectricChargepoint.objects.all():
+    for cp in GoingElectricChargepoint.objects.filter(
+        chargelocation__in=queryset.values("id")
+    ):
         ge_chargepoints_by_location[cp.chargelocation_id].append(cp)
 
-    # Phase 1: Candidate generation via single spatial join query
-    all_candidate_site_ids: Set[int] = set()
-    ge_candidates: Dict[
-        int, Tuple[Optional[int], List[Tuple[int, float, Optional[int]]]]
-    ] = {}  # ge_id -> (network_id, [(site_id, distance_m, site_network_id)])
-
     # Build the GE location ID filter for the queryset
     ge_ids = list(queryset.values_list("id", flat=True))
     if not ge_ids:
@@ -202,6 +363,8 @@ def match_ge_locations(
     ge_table = GoingElectricChargeLocation._meta.db_table
     site_table = ChargingSite._meta.db_table
 
+    # Phase 1: Candidate generation via single spatial join query
+    #
     # Single spatial join using ST_DWithin on geography columns.
     # With geography=True on both PointFields, PostGIS has geography GIST
     # indexes and ST_DWithin accepts meters directly.
@@ -229,11 +392,9 @@ def match_ge_locations(
 
     logger.info("Spatial join returned %d candidate pairs.", len(rows))
 
-    for ge_id, site_id, distance_m, site_network_id in rows:
-        all_candidate_site_ids.add(site_id)
-        if ge_id not in ge_candidates:
-            ge_candidates[ge_id] = (ge_network_by_id.get(ge_id), [])
-        ge_candidates[ge_id][1].append((site_id, distance_m, site_network_id))
+    pair_ge_ids = np.array([row[0] for row in rows], dtype=np.int64)
+    pair_site_ids = np.array([row[1] for row in rows], dtype=np.int64)
+    all_candidate_site_ids = set(pair_site_ids.tolist())
 
     # Prefetch connectors for all candidate sites at once
     logger.info(
@@ -241,32 +402,33 @@ def match_ge_locations(
     )
     connectors_by_site = _prefetch_site_connectors(all_candidate_site_ids)
 
-    # Score all pairs
-    logger.info("Scoring %d GE locations with candidates...", len(ge_candidates))
-    scored_pairs: List[Tuple[float, int, int]] = []  # (score, ge_id, site_id)
-
-    for ge_id, (ge_network_id, candidate_list) in ge_candidates.items():
-        ge_cps = ge_chargepoints_by_location.get(ge_id, [])
-
-        for site_id, distance_m, site_network_id in candidate_list:
-            site_connectors = connectors_by_site.get(site_id, [])
-            score = score_match(
-                distance_m=distance_m,
-                ge_network_id=ge_network_id,
-                site_network_id=site_network_id,
-                network_mapping=network_mapping,
-                ge_chargepoints=ge_cps,
-                site_connectors=site_connectors,
-                max_distance_m=max_distance_m,
-            )
-            if score >= min_confidence:
-                scored_pairs.append((score, ge_id, site_id))
+    # Score all pairs at once
+    logger.info("Scoring %d candidate pairs...", len(rows))
+    scores = score_candidates(
+        pair_ge_ids,
+        pair_site_ids,
+        distances=[row[2] for row in rows],
+        ge_network_ids=[ge_network_by_id.get(row[0]) for row in rows],
+        site_network_ids=[row[3] for row in rows],
+        network_mapping=network_mapping,
+        ge_chargepoints_by_location=ge_chargepoints_by_location,
+        connectors_by_site=connectors_by_site,
+        max_distance_m=max_distance_m,
+    )
+    accepted = scores >= min_confidence
+    pair_ge_ids = pair_ge_ids[accepted]
+    pair_site_ids = pair_site_ids[accepted]
+    scores = scores[accepted]
 
     # Phase 2: Greedy 1:1 assignment — highest scores first
-    logger.info(
-        "Phase 2: Greedy assignment of %d candidate pairs...", len(scored_pairs)
+    logger.info("Phase 2: Greedy assignment of %d candidate pairs...", len(scores))
+    # Ties are broken by ID, so that the result does not depend on the query order
+    order = np.lexsort((pair_site_ids, pair_ge_ids, -scores))
+    scored_pairs = zip(
+        scores[order].tolist(),
+        pair_ge_ids[order].tolist(),
+        pair_site_ids[order].tolist(),
     )
-    scored_pairs.sort(key=lambda x: x[0], reverse=True)
 
     claimed_ge_ids: Set[int] = set()
     claimed_site_ids: Set[int] = set()
@@ -279,24 +441,26 @@ def match_ge_locations(
         claimed_site_ids.add(site_id)
         assignments.append((ge_id, site_id, score))
 
-    # Apply assignments: clear all existing matches first, then set new ones
-    GoingElectricChargeLocation.objects.filter(
-        id__in=queryset.values_list("id", flat=True)
-    ).update(matched_site=None, match_confidence=None)
-
-    if assignments:
-        # Build lightweight model instances and bulk_update in batches
-        ge_to_update = []
-        for ge_id, site_id, confidence in assignments:
-            obj = GoingElectricChargeLocation(id=ge_id)
-            obj.matched_site_id = site_id
-            obj.match_confidence = confidence
-            ge_to_update.append(obj)
-        GoingElectricChargeLocation.objects.bulk_update(
-            ge_to_update,
-            fields=["matched_site_id", "match_confidence"],
-            batch_size=500,
-        )
+    # Apply assignments: clear all existing matches first, then set new ones, in one
+    # transaction so that readers never see the locations unmatched
+    with transaction.atomic():
+        GoingElectricChargeLocation.objects.filter(
+            id__in=queryset.values_list("id", flat=True)
+        ).update(matched_site=None, match_confidence=None)
+
+        if assignments:
+            # Build lightweight model instances and bulk_update in batches
+            ge_to_update = []
+            for ge_id, site_id, confidence in assignments:
+                obj = GoingElectricChargeLocation(id=ge_id)
+                obj.matched_site_id = site_id
+                obj.match_confidence = confidence
+                ge_to_update.append(obj)
+            GoingElectricChargeLocation.objects.bulk_update(
+                ge_to_update,
+                fields=["matched_site_id", "match_confidence"],
+                batch_size=500,
+            )
 
     matched_count = len(assignments)
     total_count = queryset.count()
@@ -308,6 +472,129 @@ def match_ge_locations(
     )
 
 
+def _expand_region(
+    ge_ids: Iterable[int],
+    site_ids: Iterable[int],
+    max_distance_m: float,
+    max_size: Optional[int] = None,
+) -> Optional[Tuple[Set[int], Set[int]]]:
+    """
+    Extend the given GE locations and ChargingSites to the smallest region that is
+    closed under the candidate relation: every site within max_distance_m of a GE
+    location in the region, every GE location within max_distance_m of a site in the
+    region and the current match partner of every member are part of the region too.
+
+    No candidate pair crosses the border of such a region, so the greedy assignment
+    inside it is the same as the one a full matching run would produce. Returns None as
+    soon as the region grows beyond max_size GE locations and sites.
+    """
+    ge_table = GoingElectricChargeLocation._meta.db_table
+    site_table = ChargingSite._meta.db_table
+    sites_near_ge_sql = f"""
+        SELECT site.id
+        FROM {ge_table} ge
+        JOIN {site_table} site
+            ON ST_DWithin(ge.coordinates, site.location, %s)
+        WHERE ge.id = ANY(%s)
+        UNION
+        SELECT matched_site_id FROM {ge_table}
+        WHERE id = ANY(%s) AND matched_site_id IS NOT NULL
+    """
+    ge_near_sites_sql = f"""
+        SELECT ge.id
+        FROM {site_table} site
+        JOIN {ge_table} ge
+            ON ST_DWithin(ge.coordinates, site.location, %s)
+        WHERE site.id = ANY(%s)
+        UNION
+        SELECT id FROM {ge_table} WHERE matched_site_id = ANY(%s)
+    """
+
+    region_ge_ids: Set[int] = set()
+    region_site_ids: Set[int] = set()
+    new_ge_ids, new_site_ids = set(ge_ids), set(site_ids)
+    with connection.cursor() as cursor:
+        while new_ge_ids or new_site_ids:
+            region_ge_ids |= new_ge_ids
+            region_site_ids |= new_site_ids
+            if (
+                max_size is not None
+                and len(region_ge_ids) + len(region_site_ids) > max_size
+            ):
+                return None
+            found_site_ids: Set[int] = set()
+            found_ge_ids: Set[int] = set()
+            if new_ge_ids:
+                ids = list(new_ge_ids)
+                cursor.execute(sites_near_ge_sql, [max_distance_m, ids, ids])
+                found_site_ids = {row[0] for row in cursor.fetchall()}
+            if new_site_ids:
+                ids = list(new_site_ids)
+                cursor.execute(ge_near_sites_sql, [max_distance_m, ids, ids])
+                found_ge_ids = {row[0] for row in cursor.fetchall()}
+            new_ge_ids = found_ge_ids - region_ge_ids
+            new_site_ids = found_site_ids - region_site_ids
+
+    return region_ge_ids, region_site_ids
+
+
+def match_ge_locations_incremental(
+    ge_ids: Iterable[int] = (),
+    site_ids: Iterable[int] = (),
+    max_distance_m: float = 200.0,
+    min_confidence: float = 0.5,
+):
+    """
+    Re-match only the GE locations and ChargingSites that changed since the last run,
+    together with their spatial neighbours.
+
+    Args:
+        ge_ids: IDs of GE locations whose coordinates, network or chargepoints changed,
+                as well as those that were deleted.
+        site_ids: IDs of ChargingSites whose location, network or connectors changed,
+                  as well as those that were deleted and the former match of deleted
+                  GE locations.
+        max_distance_m: Maximum distance in meters for candidate search.
+        min_confidence: Minimum score threshold for a match to be accepted.
+
+    The changed records are extended to a region that no candidate pair crosses (see
+    _expand_region), and only the matches within that region are recomputed. Changes
+    to the mapped networks of a GE network are not detected and require a full run of
+    match_ge_locations.
+    """
+    ge_ids, site_ids = set(ge_ids), set(site_ids)
+    if len(ge_ids) + len(site_ids) > FULL_MATCH_THRESHOLD:
+        match_ge_locations(max_distance_m=max_distance_m, min_confidence=min_confidence)
+        return
+
+    # GE locations whose matched site was deleted lost their match through SET_NULL
+    orphaned_ge_ids = GoingElectricChargeLocation.objects.filter(
+        matched_site__isnull=True, match_confidence__isnull=False
+    ).values_list("id", flat=True)
+    region = _expand_region(
+        itertools.chain(ge_ids, orphaned_ge_ids),
+        site_ids,
+        max_distance_m,
+        FULL_MATCH_THRESHOLD,
+    )
+    if region is None:
+        logger.info("Region of the changed locations is too large, matching all")
+        match_ge_locations(max_distance_m=max_distance_m, min_confidence=min_confidence)
+        return
+    region_ge_ids, region_site_ids = region
+    logger.info(
+        "Incremental matching of %d GE locations and %d sites...",
+        len(region_ge_ids),
+        len(region_site_ids),
+    )
+    if region_ge_ids:
+        match_ge_locations(
+            GoingElectricChargeLocation.objects.filter(id__in=region_ge_ids),
+            max_distance_m=max_distance_m,
+            min_confidence=min_confidence,
+        )
+
+
 def suggest_network_mappings(
     ge_network: Optional[GoingElectricNetwork] = None,
 ) -> Dict[int, Dict[int, int]]:
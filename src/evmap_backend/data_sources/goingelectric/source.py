@@ -1,20 +1,45 @@
+import logging
 import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
+from typing import Dict, Iterator, List, Set, Tuple
 
+import pgbulk
 import requests
 from django.contrib.gis.geos import Point
 from django.db import transaction
 
 from evmap_backend.data_sources import DataSource, DataType, UpdateMethod
-from evmap_backend.data_sources.goingelectric.matching import match_ge_locations
+from evmap_backend.data_sources.goingelectric.matching import (
+    MATCHING_LOCK,
+    match_ge_locations_incremental,
+)
 from evmap_backend.data_sources.goingelectric.models import (
     GoingElectricChargeLocation,
     GoingElectricChargepoint,
     GoingElectricNetwork,
 )
+from evmap_backend.data_sources.runs import db_timer, record_run_stats
+from evmap_backend.helpers.locks import exclusive
+
+logger = logging.getLogger(__name__)
 
 API_URL = "https://api.goingelectric.de"
 
+LOCATION_UPDATE_FIELDS = [
+    "name",
+    "coordinates",
+    "address_city",
+    "address_country",
+    "address_postcode",
+    "address_street",
+    "network",
+    "url",
+    "fault_report",
+    "verified",
+]
+
 
 def get_goingelectric_chargers(startkey=None):
     params = {
@@ -39,6 +64,140 @@ def get_goingelectric_chargers(startkey=None):
     return response.json()
 
 
+def iter_goingelectric_pages() -> Iterator[dict]:
+    """
+    Yield all pages of the GoingElectric chargepoint list. The next page is requested
+    in the background while the current one is being processed.
+    """
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="GoingElectric") as pool:
+        future = pool.submit(get_goingelectric_chargers)
+        while future is not None:
+            response = future.result()
+            if response["status"] != "ok":
+                raise RuntimeError("error getting data from GoingElectric API")
+
+            if "startkey" in response:
+                logger.debug(f"next startkey: {response['startkey']}")
+                future = pool.submit(get_goingelectric_chargers, response["startkey"])
+            else:
+                future = None
+            yield response
+
+
+def _resolve_networks(locations: List[dict], network_ids: Dict[str, int]):
+    """Look up the networks of a page of locations, creating missing ones in bulk."""
+    names = {data["network"] for data in locations if data["network"]}
+    names -= network_ids.keys()
+    if not names:
+        return
+
+    # if a name exists multiple times, use the oldest network
+    network_ids.update(
+        GoingElectricNetwork.objects.filter(name__in=names)
+        .order_by("-id")
+        .values_list("name", "id")
+    )
+    missing = [
+        GoingElectricNetwork(name=name) for name in names if name not in network_ids
+    ]
+    if missing:
+        created = GoingElectricNetwork.objects.bulk_create(missing)
+        network_ids.update((network.name, network.id) for network in created)
+
+
+def _sync_chargepoints(locations: List[dict]) -> Set[int]:
+    """
+    Replace the chargepoints of all locations whose set of chargepoints has changed.
+    Returns the IDs of these locations.
+    """
+    location_ids = [data["ge_id"] for data in locations]
+    existing = defaultdict(list)
+    for location_id, *chargepoint in GoingElectricChargepoint.objects.filter(
+        chargelocation_id__in=location_ids
+    ).values_list("chargelocation_id", "type", "power", "count"):
+        existing[location_id].append(tuple(chargepoint))
+
+    changed = set()
+    to_create = []
+    for data in locations:
+        new = [(cp["type"], cp["power"], cp["count"]) for cp in data["chargepoints"]]
+        if sorted(new) != sorted(existing.get(data["ge_id"], [])):
+            changed.add(data["ge_id"])
+            to_create += [
+                GoingElectricChargepoint(
+                    chargelocation_id=data["ge_id"],
+                    type=type,
+                    power=power,
+                    count=count,
+                )
+                for type, power, count in new
+            ]
+
+    if changed:
+        GoingElectricChargepoint.objects.filter(chargelocation_id__in=changed).delete()
+        GoingElectricChargepoint.objects.bulk_create(to_create)
+    return changed
+
+
+def _sync_page(
+    locations: List[dict], network_ids: Dict[str, int]
+) -> Tuple[int, Set[int], Set[int]]:
+    """
+    Upsert a page of locations with their chargepoints.
+    Returns the number of created locations, the IDs of all changed locations and the
+    IDs of those among them that need to be matched again, i.e. new locations and those
+    whose coordinates, network or chargepoints changed.
+    """
+    # the API may return a location twice; the last occurrence wins
+    locations = list({data["ge_id"]: data for data in locations}.values())
+    _resolve_networks(locations, network_ids)
+
+    # the attributes used for matching, to tell them apart from changes of other fields
+    previous = {
+        location_id: (coordinates.coords, network_id)
+        for location_id, coordinates, network_id in (
+            GoingElectricChargeLocation.objects.filter(
+                id__in=[data["ge_id"] for data in locations]
+            ).values_list("id", "coordinates", "network_id")
+        )
+    }
+    objs = [
+        GoingElectricChargeLocation(
+            id=data["ge_id"],
+            name=data["name"],
+            coordinates=Point(
+                data["coordinates"]["lng"],
+                data["coordinates"]["lat"],
+            ),
+            address_city=data["address"]["city"] or "",
+            address_country=data["address"]["country"] or "",
+            address_postcode=data["address"]["postcode"] or "",
+            address_street=data["address"]["street"] or "",
+            network_id=network_ids[data["network"]] if data["network"] else None,
+            url=data["url"],
+            fault_report=data["fault_report"],
+            verified=data["verified"],
+        )
+        for data in locations
+    ]
+    result = pgbulk.upsert(
+        GoingElectricChargeLocation,
+        objs,
+        ["id"],
+        LOCATION_UPDATE_FIELDS,
+        returning=["id"],
+        ignore_unchanged=True,
+    )
+    chargepoints_changed = _sync_chargepoints(locations)
+    changed = {row.id for row in result} | chargepoints_changed
+    rematch = chargepoints_changed | {
+        obj.id
+        for obj in objs
+        if previous.get(obj.id) != (obj.coordinates.coords, obj.network_id)
+    }
+    return len(result.created), changed, rematch
+
+
 class GoingElectricDataSource(DataSource):
     id = "goingelectric"
     supported_update_methods = [UpdateMethod.PULL]
@@ -46,109 +205,50 @@ class GoingElectricDataSource(DataSource):
     sync_interval = timedelta(days=7)
 
     def pull_data(self):
-        startkey = None
-
-        location_ids_to_delete = set(
+        existing_ids = set(
             GoingElectricChargeLocation.objects.values_list("id", flat=True)
         )
+        seen_ids = set()
+        changed_ids = set()
+        rematch_ids = set()
+        network_ids = {}
         sites_created = 0
 
-        while True:
-            response = get_goingelectric_chargers(startkey=startkey)
-
-            if response["status"] != "ok":
-                raise RuntimeError("error getting data from GoingElectric API")
-
-            for data in response["chargelocations"]:
-                with transaction.atomic():
-                    if data["network"]:
-                        network, _ = GoingElectricNetwork.objects.get_or_create(
-                            name=data["network"]
-                        )
-                    else:
-                        network = None
-                    location, created = (
-                        GoingElectricChargeLocation.objects.update_or_create(
-                            id=data["ge_id"],
-                            defaults=dict(
-                                name=data["name"],
-                                coordinates=Point(
-                                    data["coordinates"]["lng"],
-                                    data["coordinates"]["lat"],
-                                ),
-                                address_city=(
-                                    data["address"]["city"]
-                                    if data["address"]["city"]
-                                    else ""
-                                ),
-                                address_country=(
-                                    data["address"]["country"]
-                                    if data["address"]["country"]
-                                    else ""
-                                ),
-                                address_postcode=(
-                                    data["address"]["postcode"]
-                                    if data["address"]["postcode"]
-                                    else ""
-                                ),
-                                address_street=(
-                                    data["address"]["street"]
-                                    if data["address"]["street"]
-                                    else ""
-                                ),
-                                network=network,
-                                url=data["url"],
-                                fault_report=data["fault_report"],
-                                verified=data["verified"],
-                            ),
-                        )
-                    )
-
-                    if created:
-                        sites_created += 1
-
-                    chargepoints = GoingElectricChargepoint.objects.filter(
-                        chargelocation=location
-                    ).order_by("type", "power", "count")
-                    if chargepoints.count() != len(data["chargepoints"]) or any(
-                        chargepoint.type != cp["type"]
-                        or chargepoint.power != cp["power"]
-                        or chargepoint.count != cp["count"]
-                        for chargepoint, cp in zip(
-                            chargepoints,
-                            sorted(
-                                data["chargepoints"],
-                                key=lambda x: (x["type"], x["power"], x["count"]),
-                            ),
-                        )
-                    ):
-                        chargepoints.delete()
-                        for chargepoint in data["chargepoints"]:
-                            GoingElectricChargepoint.objects.create(
-                                chargelocation=location,
-                                type=chargepoint["type"],
-                                power=chargepoint["power"],
-                                count=chargepoint["count"],
-                            )
-
-                    location_ids_to_delete.discard(location.id)
-
-            if "startkey" in response:
-                startkey = response["startkey"]
-                print(startkey)
-            else:
-                break
-
-        # Delete all remaining sites that weren't in the input
+        for response in iter_goingelectric_pages():
+            locations = response["chargelocations"]
+            with db_timer(), transaction.atomic():
+                created, changed, rematch = _sync_page(locations, network_ids)
+            sites_created += created
+            changed_ids |= changed
+            rematch_ids |= rematch
+            seen_ids.update(data["ge_id"] for data in locations)
+
+        # Delete all remaining sites that weren't in the input, freeing their matches
+        location_ids_to_delete = existing_ids - seen_ids
+        freed_site_ids = set()
         if location_ids_to_delete:
-            GoingElectricChargeLocation.objects.filter(
+            to_delete = GoingElectricChargeLocation.objects.filter(
                 id__in=location_ids_to_delete
-            ).delete()
-            sites_deleted = len(location_ids_to_delete)
-        else:
-            sites_deleted = 0
+            )
+            with db_timer():
+                freed_site_ids.update(
+                    to_delete.filter(matched_site__isnull=False).values_list(
+                        "matched_site_id", flat=True
+                    )
+                )
+                to_delete.delete()
 
-        print(f"{sites_created} sites created, {sites_deleted} sites deleted")
+        logger.info(
+            f"{sites_created} sites created, {len(changed_ids) - sites_created} sites "
+            f"updated, {len(location_ids_to_delete)} sites deleted"
+        )
+        record_run_stats(
+            sites_created=sites_created,
+            sites_updated=len(changed_ids) - sites_created,
+            sites_deleted=len(location_ids_to_delete),
+            sites_unchanged=len(seen_ids) - len(changed_ids),
+        )
 
-        # Run matching after data pull
-        match_ge_locations()
+        # Re-match the changed locations and their surroundings
+        with exclusive(MATCHING_LOCK, wait=True):
+            match_ge_locations_incremental(ge_ids=rematch_ids, site_ids=freed_site_ids)
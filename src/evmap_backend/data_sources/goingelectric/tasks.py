@@ -0,0 +1,44 @@
+import logging
+from typing import List, Optional
+
+from celery import shared_task
+from django.db import transaction
+
+from evmap_backend.data_sources.goingelectric.matching import (
+    FULL_MATCH_THRESHOLD,
+    MATCHING_LOCK,
+    match_ge_locations,
+    match_ge_locations_incremental,
+)
+from evmap_backend.data_sources.goingelectric.models import GoingElectricChargeLocation
+from evmap_backend.helpers.locks import exclusive
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def match_goingelectric(site_ids: Optional[List[int]] = None):
+    """Re-match GoingElectric locations, only around the given sites if any."""
+    with exclusive(MATCHING_LOCK, wait=True):
+        if site_ids is None:
+            match_ge_locations()
+        else:
+            match_ge_locations_incremental(site_ids=site_ids)
+
+
+def schedule_matching(sender, data_source: str, site_ids: set, **kwargs):
+    """
+    Receiver for sites_changed, which re-matches the GoingElectric locations around
+    the changed sites once the sync has been committed.
+    """
+    if not GoingElectricChargeLocation.objects.exists():
+        return
+    # large changes are matched in full, instead of sending all IDs to the worker
+    if len(site_ids) > FULL_MATCH_THRESHOLD:
+        args = ()
+    else:
+        args = (sorted(site_ids),)
+    logger.info(
+        f"{len(site_ids)} sites of {data_source} changed, scheduling GoingElectric matching"
+    )
+    transaction.on_commit(lambda: match_goingelectric.delay(*args))
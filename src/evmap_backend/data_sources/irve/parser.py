@@ -9,18 +9,25 @@ The CSV has one row per point de charge (chargepoint). Rows sharing the same
 """
 
 import csv
+import heapq
+import itertools
 import logging
 import re
-from collections import defaultdict
-from typing import Dict, Iterable, List
+import tempfile
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Tuple
 
-from django.contrib.gis.geos import Point
 from django.core.exceptions import ValidationError
 
 from evmap_backend.chargers.fields import normalize_evseid, validate_evseid
-from evmap_backend.chargers.models import Chargepoint, ChargingSite, Connector, Network
-from evmap_backend.data_sources.sync import ChargepointItem, ChargingSiteItem
-from evmap_backend.helpers.database import none_to_blank
+from evmap_backend.chargers.models import Connector
+from evmap_backend.data_sources.sync import (
+    ChargepointItem,
+    ChargepointRecord,
+    ChargingSiteItem,
+    ConnectorRecord,
+    SiteRecord,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -53,12 +60,12 @@ def _parse_float(value: str) -> float:
         return 0.0
 
 
-def _parse_coordinates(row: dict) -> Point | None:
-    """Parse consolidated_longitude / consolidated_latitude into a Point."""
+def _parse_coordinates(lng: str, lat: str) -> Tuple[float, float] | None:
+    """Parse consolidated_longitude / consolidated_latitude into a (lng, lat) tuple."""
     try:
-        lng = float(row.get("consolidated_longitude", "").strip().replace(",", "."))
-        lat = float(row.get("consolidated_latitude", "").strip().replace(",", "."))
-    except (ValueError, TypeError, AttributeError):
+        lng = float(lng.strip().replace(",", "."))
+        lat = float(lat.strip().replace(",", "."))
+    except ValueError:
         return None
 
     if lat == 0 and lng == 0:
@@ -66,26 +73,56 @@ def _parse_coordinates(row: dict) -> Point | None:
     if not (-90 <= lat <= 90 and -180 <= lng <= 180):
         return None
 
-    return Point(lng, lat)
+    return lng, lat
 
 
-def _parse_connectors(row: dict) -> List[Connector]:
+class _Columns:
+    """
+    Indices of the columns used by the parser, looked up once from the CSV header.
+
+    Rows are padded to the length of the header plus one empty field, which columns
+    missing from the header point to.
+    """
+
+    def __init__(self, header: List[str]):
+        index = {name.strip(): i for i, name in enumerate(header)}
+        self.width = len(header) + 1
+        missing = len(header)
+
+        self.station_id = index.get("id_station_itinerance", missing)
+        self.pdc_id = index.get("id_pdc_itinerance", missing)
+        self.station_name = index.get("nom_station", missing)
+        self.operator = index.get("nom_operateur", missing)
+        self.address = index.get("adresse_station", missing)
+        self.longitude = index.get("consolidated_longitude", missing)
+        self.latitude = index.get("consolidated_latitude", missing)
+        self.power = index.get("puissance_nominale", missing)
+        self.cable_attached = index.get("cable_t2_attache", missing)
+        self.opening_hours = index.get("horaires", missing)
+        self.plug_types = [
+            (index[column], connector_type)
+            for column, connector_type in PLUG_TYPE_MAP.items()
+            if column in index
+        ]
+
+
+def _parse_connectors(row: List[str], columns: _Columns) -> List[ConnectorRecord]:
     """Build connectors from the prise_type_* boolean columns in a single row."""
-    power_kw = _parse_float(row.get("puissance_nominale", "0"))
+    power_kw = _parse_float(row[columns.power])
     max_power = power_kw * 1000  # convert kW to W
 
-    cable_attached = _parse_bool(row.get("cable_t2_attache", "FALSE"))
+    cable_attached = _parse_bool(row[columns.cable_attached])
 
     connectors = []
-    for column, connector_type in PLUG_TYPE_MAP.items():
-        if _parse_bool(row.get(column, "FALSE")):
+    for column, connector_type in columns.plug_types:
+        if _parse_bool(row[column]):
             if connector_type in SOCKET_CONNECTOR_TYPES and not cable_attached:
                 connector_format = Connector.ConnectorFormats.SOCKET
             else:
                 connector_format = Connector.ConnectorFormats.CABLE
 
             connectors.append(
-                Connector(
+                ConnectorRecord(
                     connector_type=connector_type,
                     connector_format=connector_format,
                     max_power=max_power,
@@ -113,54 +150,143 @@ def _parse_address(address: str) -> tuple[str, str]:
     return "", ""
 
 
+def _read_rows(lines: Iterable[str]) -> Tuple[_Columns | None, Iterator[List[str]]]:
+    """
+    Read the header and return the column indices and an iterator over the padded rows
+    that have a station ID. Station IDs are stripped of surrounding whitespace.
+    """
+    reader = csv.reader(lines, delimiter=",")
+    header = next(reader, None)
+    if header is None:
+        return None, iter(())
+    columns = _Columns(header)
+
+    def rows():
+        for row in reader:
+            if len(row) < columns.width:
+                row += [""] * (columns.width - len(row))
+            station_id = row[columns.station_id].strip()
+            if not station_id:
+                continue
+            row[columns.station_id] = station_id
+            yield row
+
+    return columns, rows()
+
+
+def _is_clustered(rows: Iterable[List[str]], key: int) -> bool:
+    """Check whether all rows of each station are adjacent."""
+    seen = set()
+    previous = None
+    for row in rows:
+        station_id = row[key]
+        if station_id != previous:
+            if station_id in seen:
+                return False
+            seen.add(station_id)
+            previous = station_id
+    return True
+
+
+def _external_sort(
+    rows: Iterable[List[str]], key: int, chunk_size: int
+) -> Iterator[List[str]]:
+    """
+    Sort rows by the given column, keeping at most chunk_size rows in memory.
+
+    Sorted chunks are written to temporary files and merged. Both steps are stable, so
+    rows with the same key keep their original order.
+    """
+    sort_key = itemgetter(key)
+    chunks = []
+    try:
+        for chunk in itertools.batched(rows, chunk_size):
+            chunk = sorted(chunk, key=sort_key)
+            file = tempfile.TemporaryFile("w+", encoding="utf-8", newline="")
+            csv.writer(file).writerows(chunk)
+            file.seek(0)
+            chunks.append(file)
+        if len(chunks) == 1:
+            # everything fit into a single chunk, no need to merge
+            yield from csv.reader(chunks[0])
+        else:
+            yield from heapq.merge(*(csv.reader(file) for file in chunks), key=sort_key)
+    finally:
+        for file in chunks:
+            file.close()
+
+
+def _group_stations(
+    lines: Iterable[str], chunk_size: int
+) -> Tuple[_Columns | None, Iterator[List[List[str]]]]:
+    """
+    Return the column indices and an iterator over the rows of each station.
+
+    If the input is a seekable file, it is checked first whether the rows of each
+    station are adjacent, which is usually the case. Then the stations are grouped while
+    streaming the file a second time. Otherwise, the rows are sorted by station ID using
+    an external sort.
+    """
+    seekable = hasattr(lines, "seekable") and lines.seekable()
+    clustered = False
+    if seekable:
+        columns, rows = _read_rows(lines)
+        clustered = columns is not None and _is_clustered(rows, columns.station_id)
+        lines.seek(0)
+
+    columns, rows = _read_rows(lines)
+    if columns is None:
+        return None, iter(())
+    if not clustered:
+        logger.info("IRVE rows are not grouped by station, sorting")
+        rows = _external_sort(rows, columns.station_id, chunk_size)
+    groups = (
+        list(group)
+        for _, group in itertools.groupby(rows, key=itemgetter(columns.station_id))
+    )
+    return columns, groups
+
+
 def parse_irve_csv(
     lines: Iterable[str],
     data_source: str,
     license_attribution: str,
     license_attribution_link: str,
+    chunk_size: int = 20_000,
 ) -> Iterable[ChargingSiteItem]:
     """
     Parse IRVE CSV data and yield ChargingSiteItem objects.
 
     Rows are grouped by ``id_station_itinerance`` to form charging sites,
-    each containing one or more chargepoints.
+    each containing one or more chargepoints. Only the rows of one station
+    are kept in memory at a time, or up to ``chunk_size`` rows if the rows
+    have to be sorted by station first.
 
-    ``lines`` should be an iterable of decoded text lines (e.g. from
-    ``response.iter_lines(decode_unicode=True)``).
+    ``lines`` should be an iterable of decoded text lines, preferably a
+    seekable text file.
     """
-    reader = csv.DictReader(lines, delimiter=",")
-
-    # Group rows by station ID
-    stations: Dict[str, List[dict]] = defaultdict(list)
-    for row in reader:
-        station_id = row.get("id_station_itinerance", "").strip()
-        if not station_id:
-            continue
-        stations[station_id].append(row)
+    columns, stations = _group_stations(lines, chunk_size)
 
-    for station_id, rows in stations.items():
+    for rows in stations:
         first_row = rows[0]
+        station_id = first_row[columns.station_id]
 
-        location = _parse_coordinates(first_row)
+        location = _parse_coordinates(
+            first_row[columns.longitude], first_row[columns.latitude]
+        )
         if location is None:
             logger.warning(
                 f"Skipping station {station_id}: invalid coordinates "
-                f"({first_row.get('consolidated_longitude')}, {first_row.get('consolidated_latitude')})"
+                f"({first_row[columns.longitude]}, {first_row[columns.latitude]})"
             )
             continue
 
         # Determine network from EVSE ID prefix
-        network = None
-        first_evseid = normalize_evseid(first_row["id_pdc_itinerance"])
+        evse_operator_id = None
+        first_evseid = normalize_evseid(first_row[columns.pdc_id])
         try:
             validate_evseid(first_evseid)
-            evse_operator_id = first_evseid[:5]
-            if evse_operator_id:
-                operator_name = none_to_blank(first_row.get("nom_operateur"))
-                network, _ = Network.get_or_create(
-                    evse_operator_id=evse_operator_id,
-                    defaults=dict(name=operator_name),
-                )
+            evse_operator_id = first_evseid[:5] or None
         except ValidationError:
             # Station IDs may not always be valid EVSEIDs
             pass
@@ -175,29 +301,28 @@ def parse_irve_csv(
 
         # The adresse_station field often contains "Street PostalCode City"
         # Try to extract zipcode and city from it
-        address_raw = none_to_blank(first_row.get("adresse_station"))
+        address_raw = first_row[columns.address]
         zipcode, city = _parse_address(address_raw)
 
-        site = ChargingSite(
+        site = SiteRecord(
             data_source=data_source,
             license_attribution=license_attribution,
             license_attribution_link=license_attribution_link,
             id_from_source=station_id,
-            name=none_to_blank(first_row.get("nom_station")),
+            name=first_row[columns.station_name],
             location=location,
             site_evseid=site_evseid,
-            network=network,
-            operator=none_to_blank(first_row.get("nom_operateur")),
+            operator=first_row[columns.operator],
             street=address_raw,
             zipcode=zipcode,
             city=city,
             country="FR",
-            opening_hours=none_to_blank(first_row.get("horaires")),
+            opening_hours=first_row[columns.opening_hours],
         )
 
         chargepoints = []
         for row in rows:
-            pdc_id = row.get("id_pdc_itinerance", "").strip()
+            pdc_id = row[columns.pdc_id].strip()
             if not pdc_id:
                 continue
 
@@ -207,16 +332,21 @@ def parse_irve_csv(
             except ValidationError:
                 evseid_normalized = ""
 
-            chargepoint = Chargepoint(
+            chargepoint = ChargepointRecord(
                 id_from_source=pdc_id,
                 evseid=evseid_normalized,
             )
 
-            connectors = _parse_connectors(row)
+            connectors = _parse_connectors(row, columns)
             chargepoints.append(ChargepointItem(chargepoint, connectors))
 
         if not chargepoints:
             logger.warning(f"Skipping station {station_id}: no valid chargepoints")
             continue
 
-        yield ChargingSiteItem(site, chargepoints)
+        yield ChargingSiteItem(
+            site,
+            chargepoints,
+            network_operator_id=evse_operator_id,
+            network_name=first_row[columns.operator],
+        )
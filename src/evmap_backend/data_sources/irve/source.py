@@ -1,6 +1,7 @@
-import requests
+import io
 
 from evmap_backend.data_sources import DataSource, DataType, UpdateMethod
+from evmap_backend.data_sources.fetch import fetch_feed
 from evmap_backend.data_sources.irve.parser import parse_irve_csv
 from evmap_backend.data_sources.sync import sync_chargers
 
@@ -15,10 +16,8 @@ class IrveFranceDataSource(DataSource):
     license_attribution_link = "https://www.data.gouv.fr/datasets/beta-base-nationale-des-points-de-recharge-pour-vehicules-electriques-en-france-irve"
 
     def pull_data(self):
-        with requests.get(DATA_URL, stream=True) as response:
-            response.raise_for_status()
-            lines = response.iter_lines(decode_unicode=True)
-
+        feed = fetch_feed(self.id, DATA_URL)
+        with io.TextIOWrapper(feed.file, encoding="utf-8", newline="") as lines:
             sites = parse_irve_csv(
                 lines,
                 self.id,
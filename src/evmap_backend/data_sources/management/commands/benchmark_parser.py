@@ -0,0 +1,79 @@
+import gzip
+import io
+import resource
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from evmap_backend.data_sources import DataType
+from evmap_backend.data_sources.datex2.source import BaseDatex2DataSource
+from evmap_backend.data_sources.irve.parser import parse_irve_csv
+from evmap_backend.data_sources.irve.source import IrveFranceDataSource
+from evmap_backend.data_sources.registry import get_data_source
+from evmap_backend.data_sources.sync import to_models
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure throughput and peak memory of a DATEX II or IRVE data source's parser "
+        "on a local file, without writing anything to the database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("source_id", help="ID of a DATEX II or IRVE data source")
+        parser.add_argument("file", help="Path to the (optionally gzipped) payload")
+        parser.add_argument(
+            "--retain",
+            action="store_true",
+            help="Keep all parsed items in memory, to measure their footprint",
+        )
+        parser.add_argument(
+            "--models",
+            action="store_true",
+            help="Convert IRVE items to model instances, as done during sync",
+        )
+
+    def handle(self, *args, **options):
+        data_source = get_data_source(options["source_id"])
+        if not isinstance(data_source, (BaseDatex2DataSource, IrveFranceDataSource)):
+            raise CommandError(
+                f"{data_source.id} is not a DATEX II or IRVE data source"
+            )
+
+        path = options["file"]
+        opener = gzip.open if path.endswith(".gz") else open
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+
+        with opener(path, "rb") as f:
+            if isinstance(data_source, IrveFranceDataSource):
+                items = parse_irve_csv(
+                    io.TextIOWrapper(f, encoding="utf-8"),
+                    data_source.id,
+                    data_source.license_attribution,
+                    data_source.license_attribution_link,
+                )
+                if options["models"]:
+                    items = (to_models(item) for item in items)
+            elif DataType.DYNAMIC in data_source.supported_data_types:
+                items = data_source.parser.parse_status(
+                    f, default_timezone=data_source.default_timezone
+                )
+            else:
+                items = data_source.parser.parse(f)
+
+            if options["retain"]:
+                retained = list(items)
+                count = len(retained)
+            else:
+                count = sum(1 for _ in items)
+
+        elapsed = time.perf_counter() - start
+        # ru_maxrss is given in kilobytes on Linux
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        self.stdout.write(f"items:        {count}")
+        self.stdout.write(f"elapsed:      {elapsed:.2f} s")
+        self.stdout.write(f"throughput:   {count / elapsed:.0f} items/s")
+        self.stdout.write(f"peak RSS:     {rss_after / 1024:.0f} MB")
+        self.stdout.write(f"RSS increase: {(rss_after - rss_before) / 1024:.0f} MB")
@@ -1,8 +1,11 @@
 from django.core.management import BaseCommand
 
 from evmap_backend.data_sources import UpdateMethod
-from evmap_backend.data_sources.models import UpdateState
+from evmap_backend.data_sources.fetch import NotModifiedError, track_feeds
+from evmap_backend.data_sources.models import SyncRun
 from evmap_backend.data_sources.registry import get_data_source, list_available_sources
+from evmap_backend.data_sources.runs import track_run
+from evmap_backend.data_sources.schedule import record_pull
 
 
 class Command(BaseCommand):
@@ -28,8 +31,13 @@ class Command(BaseCommand):
                 self.style.SUCCESS(f"Starting data load for source: {source_id}")
             )
 
-            data_source.pull_data()
-            UpdateState(data_source=data_source.id, push=False).save()
+            with track_run(data_source.id, SyncRun.Kind.PULL) as run:
+                try:
+                    with track_feeds():
+                        data_source.pull_data()
+                except NotModifiedError:
+                    self.stdout.write(f"Data from source {source_id} not modified")
+            record_pull(data_source, run.changes, run.processed)
 
             self.stdout.write(
                 self.style.SUCCESS(f"Successfully loaded data from source: {source_id}")
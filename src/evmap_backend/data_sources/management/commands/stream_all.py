@@ -0,0 +1,40 @@
+import asyncio
+
+from django.core.management import BaseCommand, CommandError
+
+from evmap_backend.data_sources import UpdateMethod
+from evmap_backend.data_sources.registry import iter_data_source_classes
+from evmap_backend.data_sources.streaming import run_streaming_sources
+
+
+class Command(BaseCommand):
+    help = "Stream data from all streaming data sources in a single process"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "source_ids",
+            nargs="*",
+            help="IDs of the data sources to stream (default: all streaming sources)",
+        )
+
+    def handle(self, *args, **options):
+        classes = [
+            cls
+            for cls in iter_data_source_classes()
+            if UpdateMethod.STREAMING in cls.supported_update_methods
+        ]
+        if options["source_ids"]:
+            unknown = set(options["source_ids"]) - {cls.id for cls in classes}
+            if unknown:
+                raise CommandError(
+                    f"Not a streaming data source: {', '.join(sorted(unknown))}"
+                )
+            classes = [cls for cls in classes if cls.id in options["source_ids"]]
+
+        sources = [cls() for cls in classes]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Starting data streaming for sources: {', '.join(s.id for s in sources)}"
+            )
+        )
+        asyncio.run(run_streaming_sources(sources))
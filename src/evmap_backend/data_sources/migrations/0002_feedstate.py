@@ -0,0 +1,57 @@
+# Generated by Django 6.0.9 on 2026-10-19 10:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("data_sources", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FeedState",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("data_source", models.CharField(max_length=255)),
+                ("url", models.TextField()),
+                ("etag", models.CharField(blank=True, max_length=255)),
+                ("last_modified", models.CharField(blank=True, max_length=255)),
+                ("content_hash", models.CharField(blank=True, max_length=64)),
+                ("content_length", models.BigIntegerField(default=0)),
+                (
+                    "processing_time",
+                    models.FloatField(
+                        default=0,
+                        help_text="Duration of the last pull that processed the feed [s]",
+                    ),
+                ),
+                ("last_checked", models.DateTimeField(blank=True, null=True)),
+                ("last_changed", models.DateTimeField(blank=True, null=True)),
+                ("bytes_downloaded", models.BigIntegerField(default=0)),
+                ("not_modified_count", models.IntegerField(default=0)),
+                (
+                    "time_saved",
+                    models.FloatField(
+                        default=0,
+                        help_text="Processing time saved by skipping unchanged feeds [s]",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("data_source", "url"), name="unique_feed_per_source"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.9 on 2026-10-19 10:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("data_sources", "0002_feedstate"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="updatestate",
+            name="last_changes",
+            field=models.IntegerField(
+                blank=True,
+                help_text="Number of sites and statuses changed by the last pull",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="updatestate",
+            name="sync_interval",
+            field=models.DurationField(
+                blank=True, help_text="Effective interval between pulls", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="updatestate",
+            name="unchanged_pulls",
+            field=models.IntegerField(
+                default=0, help_text="Number of consecutive pulls without changes"
+            ),
+        ),
+    ]
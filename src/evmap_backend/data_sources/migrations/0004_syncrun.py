@@ -0,0 +1,85 @@
+# Generated by Django 6.0.9 on 2026-10-19 10:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("data_sources", "0003_updatestate_sync_interval"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("data_source", models.CharField(max_length=255)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("pull", "Pull"),
+                            ("push", "Push"),
+                            ("stream", "Stream"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                ("started_at", models.DateTimeField(db_index=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                ("duration", models.FloatField(default=0, help_text="[s]")),
+                ("bytes_downloaded", models.BigIntegerField(default=0)),
+                (
+                    "parse_time",
+                    models.FloatField(
+                        default=0,
+                        help_text="Time spent outside of database writes, i.e. downloading and parsing [s]",
+                    ),
+                ),
+                (
+                    "db_time",
+                    models.FloatField(
+                        default=0, help_text="Time spent writing to the DB [s]"
+                    ),
+                ),
+                ("sites_created", models.IntegerField(default=0)),
+                ("sites_updated", models.IntegerField(default=0)),
+                ("sites_deleted", models.IntegerField(default=0)),
+                ("sites_unchanged", models.IntegerField(default=0)),
+                ("statuses_created", models.IntegerField(default=0)),
+                (
+                    "statuses_suppressed",
+                    models.IntegerField(
+                        default=0,
+                        help_text="Statuses skipped because they did not change",
+                    ),
+                ),
+                (
+                    "peak_rss",
+                    models.BigIntegerField(
+                        blank=True,
+                        help_text="Peak resident set size of the process [B]",
+                        null=True,
+                    ),
+                ),
+                ("error", models.TextField(blank=True)),
+            ],
+            options={
+                "ordering": ["-started_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["data_source", "-started_at"],
+                        name="data_source_data_so_909d11_idx",
+                    )
+                ],
+            },
+        ),
+    ]
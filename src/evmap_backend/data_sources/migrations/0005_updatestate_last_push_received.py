@@ -0,0 +1,21 @@
+# Generated by Django 6.0.9 on 2026-10-19 10:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("data_sources", "0004_syncrun"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="updatestate",
+            name="last_push_received",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Time of receipt of the last applied push, older pushes are skipped",
+                null=True,
+            ),
+        ),
+    ]
@@ -7,3 +7,101 @@ class UpdateState(models.Model):
     )
     last_update = models.DateTimeField(auto_now=True)
     push = models.BooleanField(blank=False, null=False)
+    sync_interval = models.DurationField(
+        null=True, blank=True, help_text="Effective interval between pulls"
+    )
+    last_changes = models.IntegerField(
+        null=True,
+        blank=True,
+        help_text="Number of sites and statuses changed by the last pull",
+    )
+    unchanged_pulls = models.IntegerField(
+        default=0, help_text="Number of consecutive pulls without changes"
+    )
+    last_push_received = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Time of receipt of the last applied push, older pushes are skipped",
+    )
+
+
+class FeedState(models.Model):
+    """HTTP validators and content hash of the last processed download of a feed"""
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["data_source", "url"],
+                name="unique_feed_per_source",
+            ),
+        ]
+
+    data_source = models.CharField(max_length=255)
+    url = models.TextField()
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=255, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True)
+    content_length = models.BigIntegerField(default=0)
+    processing_time = models.FloatField(
+        default=0, help_text="Duration of the last pull that processed the feed [s]"
+    )
+    last_checked = models.DateTimeField(null=True, blank=True)
+    last_changed = models.DateTimeField(null=True, blank=True)
+    bytes_downloaded = models.BigIntegerField(default=0)
+    not_modified_count = models.IntegerField(default=0)
+    time_saved = models.FloatField(
+        default=0, help_text="Processing time saved by skipping unchanged feeds [s]"
+    )
+
+
+class SyncRun(models.Model):
+    """Timings and row counts of a single pull, push or streaming window"""
+
+    class Kind(models.TextChoices):
+        PULL = "pull"
+        PUSH = "push"
+        STREAM = "stream"
+
+    class Meta:
+        indexes = [models.Index(fields=["data_source", "-started_at"])]
+        ordering = ["-started_at"]
+
+    data_source = models.CharField(max_length=255)
+    kind = models.CharField(max_length=16, choices=Kind.choices)
+    started_at = models.DateTimeField(db_index=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration = models.FloatField(default=0, help_text="[s]")
+    bytes_downloaded = models.BigIntegerField(default=0)
+    parse_time = models.FloatField(
+        default=0,
+        help_text="Time spent outside of database writes, i.e. downloading and "
+        "parsing [s]",
+    )
+    db_time = models.FloatField(default=0, help_text="Time spent writing to the DB [s]")
+    sites_created = models.IntegerField(default=0)
+    sites_updated = models.IntegerField(default=0)
+    sites_deleted = models.IntegerField(default=0)
+    sites_unchanged = models.IntegerField(default=0)
+    statuses_created = models.IntegerField(default=0)
+    statuses_suppressed = models.IntegerField(
+        default=0, help_text="Statuses skipped because they did not change"
+    )
+    peak_rss = models.BigIntegerField(
+        null=True, blank=True, help_text="Peak resident set size of the process [B]"
+    )
+    error = models.TextField(blank=True)
+
+    @property
+    def changes(self) -> int:
+        """Number of sites and statuses changed by the run"""
+        return (
+            self.sites_created
+            + self.sites_updated
+            + self.sites_deleted
+            + self.statuses_created
+        )
+
+    @property
+    def processed(self) -> int:
+        """Number of sites and statuses processed by the run, whether changed or not"""
+        return self.changes + self.sites_unchanged + self.statuses_suppressed
@@ -6,13 +6,18 @@ from typing import Iterable, List, Optional
 
 import dateutil
 import pytz
-from django.contrib.gis.geos import Point
 from django.core.exceptions import ValidationError
 from tqdm import tqdm
 
 from evmap_backend.chargers.fields import EVSEIDType, normalize_evseid, validate_evseid
-from evmap_backend.chargers.models import Chargepoint, ChargingSite, Connector, Network
-from evmap_backend.data_sources.sync import ChargepointItem, ChargingSiteItem
+from evmap_backend.chargers.models import Connector
+from evmap_backend.data_sources.sync import (
+    ChargepointItem,
+    ChargepointRecord,
+    ChargingSiteItem,
+    ConnectorRecord,
+    SiteRecord,
+)
 from evmap_backend.helpers.database import none_to_blank
 
 TIMEZONE = pytz.timezone("Europe/Berlin")
@@ -154,7 +159,7 @@ class NobilConnector:
     reservable: Optional[bool]
     manufacturer: Optional[str]
 
-    def convert(self) -> List[Connector]:
+    def convert(self) -> List[ConnectorRecord]:
         if self.connector in [
             NobilConnector.Connector.BIOGAS,
             NobilConnector.Connector.HYDROGEN,
@@ -165,29 +170,29 @@ class NobilConnector:
         power = charging_capacity_mapping.get(self.charging_capacity, 0)
         if self.connector == NobilConnector.Connector.TYPE_2_SCHUKO:
             return [
-                Connector(
+                ConnectorRecord(
                     connector_type=Connector.ConnectorTypes.SCHUKO,
                     max_power=2300,
                 ),
-                Connector(
+                ConnectorRecord(
                     connector_type=Connector.ConnectorTypes.TYPE_2,
                     max_power=power,
                 ),
             ]
         if self.connector == NobilConnector.Connector.TYPE_1_TYPE_2:
             return [
-                Connector(
+                ConnectorRecord(
                     connector_type=Connector.ConnectorTypes.TYPE_1,
                     max_power=power,
                 ),
-                Connector(
+                ConnectorRecord(
                     connector_type=Connector.ConnectorTypes.TYPE_2,
                     max_power=power,
                 ),
             ]
 
         return [
-            Connector(
+            ConnectorRecord(
                 connector_type=connector_mapping.get(
                     self.connector, Connector.ConnectorTypes.OTHER
                 ),
@@ -318,15 +323,7 @@ class NobilChargerStation:
             except ValidationError:
                 pass
 
-        if operator_id:
-            network, _ = Network.get_or_create(
-                evse_operator_id=none_to_blank(operator_id),
-                defaults=dict(name=none_to_blank(self.operator)),
-            )
-        else:
-            network = None
-
-        site = ChargingSite(
+        site = SiteRecord(
             data_source=data_source,
             license_attribution=license_attribution,
             license_attribution_link=(
@@ -334,8 +331,7 @@ class NobilChargerStation:
             ),
             id_from_source=str(self.id),
             name=self.name,
-            location=Point(*self.location),
-            network=network,
+            location=self.location,
             operator=none_to_blank(self.owned_by),
             street=none_to_blank(self.street),
             zipcode=none_to_blank(self.zip_code),
@@ -347,8 +343,7 @@ class NobilChargerStation:
             # no EVSE IDs available, create one chargepoint per connector
             chargepoints = [
                 ChargepointItem(
-                    Chargepoint(
-                        site=site,
+                    ChargepointRecord(
                         id_from_source=str(
                             i
                         ),  # connector_id is unusable (duplicates and empty values)
@@ -375,12 +370,17 @@ class NobilChargerStation:
 
             chargepoints = [
                 ChargepointItem(
-                    Chargepoint(site=site, id_from_source=evse_uid, evseid=evseid),
+                    ChargepointRecord(id_from_source=evse_uid, evseid=evseid),
                     [c for con in connectors for c in con.convert()],
                 )
                 for (evse_uid, evseid), connectors in evse_dict.items()
             ]
-        return ChargingSiteItem(site, chargepoints)
+        return ChargingSiteItem(
+            site,
+            chargepoints,
+            network_operator_id=operator_id,
+            network_name=none_to_blank(self.operator),
+        )
 
 
 @dataclass
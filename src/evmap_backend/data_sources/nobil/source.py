@@ -1,20 +1,20 @@
 import asyncio
 import datetime
+import logging
 import os
-import time
 from typing import Optional
 
 import aiohttp
 import requests
-from asgiref.sync import sync_to_async
-from django.utils import timezone
 
 from evmap_backend.chargers.models import Chargepoint
 from evmap_backend.data_sources import DataSource, DataType, UpdateMethod
 from evmap_backend.data_sources.models import UpdateState
 from evmap_backend.data_sources.nobil.parser import parse_nobil_chargers
+from evmap_backend.data_sources.streaming import BaseStreamingDataSource
 from evmap_backend.data_sources.sync import sync_chargers
-from evmap_backend.realtime.models import RealtimeStatus
+
+logger = logging.getLogger(__name__)
 
 
 class NobilDataSource(DataSource):
@@ -55,10 +55,8 @@ class NobilDataSource(DataSource):
         )
 
 
-class NobilRealtimeDataSource(DataSource):
+class NobilRealtimeDataSource(BaseStreamingDataSource):
     id = "nobil_realtime"
-    supported_data_types = [DataType.DYNAMIC]
-    supported_update_methods = [UpdateMethod.STREAMING]
     license_attribution = "NOBIL by Enova"
     license_attribution_link = "https://nobil.no/"
 
@@ -69,55 +67,28 @@ class NobilRealtimeDataSource(DataSource):
         )
         return response.json()["accessToken"]
 
-    async def _stream_data_async(self, url):
-        updatestate_last_update = None
-        async with aiohttp.ClientSession() as session:
-            async with session.ws_connect(url) as ws:
-                while True:
-                    msg = await asyncio.wait_for(ws.receive(), timeout=300)
-                    if msg.type in (
-                        aiohttp.WSMsgType.CLOSE,
-                        aiohttp.WSMsgType.CLOSING,
-                        aiohttp.WSMsgType.CLOSED,
-                        aiohttp.WSMsgType.ERROR,
-                    ):
-                        break
-                    elif msg.type == aiohttp.WSMsgType.TEXT:
-                        evse_data = msg.json()
-                        print(evse_data)
-
-                        nobil_id_without_country = str(
-                            int(evse_data["nobilId"].split("_")[1])
-                        )
-                        try:
-                            chargepoint = await sync_to_async(Chargepoint.objects.get)(
-                                site__data_source="nobil",
-                                site__id_from_source=nobil_id_without_country,
-                                id_from_source=evse_data["evseUId"],
-                            )
-
-                            obj = RealtimeStatus(
-                                chargepoint=chargepoint,
-                                status=RealtimeStatus.Status[evse_data["status"]],
-                                data_source=self.id,
-                                license_attribution=self.license_attribution,
-                                license_attribution_link=self.license_attribution_link,
-                                timestamp=timezone.now(),
-                            )
-                            await sync_to_async(obj.save)()
+    def _load_chargepoints(self):
+        return (
+            ((site_id, evse_uid), id)
+            for site_id, evse_uid, id in Chargepoint.objects.filter(
+                site__data_source=NobilDataSource.id
+            ).values_list("site__id_from_source", "id_from_source", "id")
+        )
 
-                            now = time.perf_counter()
-                            if (
-                                updatestate_last_update is None
-                                or now - updatestate_last_update > 60
-                            ):
-                                # save the update state, but only once per minute
-                                await sync_to_async(
-                                    UpdateState(data_source=self.id, push=True).save
-                                )()
-                        except Chargepoint.DoesNotExist:
-                            print("ignoring update")
+    def _on_message(self, evse_data: dict):
+        logger.debug(evse_data)
+        nobil_id_without_country = str(int(evse_data["nobilId"].split("_")[1]))
+        self._handle_status(
+            (nobil_id_without_country, evse_data["evseUId"]), evse_data["status"]
+        )
 
-    def stream_data(self):
-        url = self._get_realtime_websocket_url()
-        asyncio.run(self._stream_data_async(url))
+    async def connect(self):
+        url = await asyncio.to_thread(self._get_realtime_websocket_url)
+        async with aiohttp.ClientSession() as session:
+            async with session.ws_connect(url) as ws:
+                logger.info("Connected")
+                async for msg in ws:
+                    if msg.type == aiohttp.WSMsgType.TEXT:
+                        self._on_message(msg.json())
+                    elif msg.type == aiohttp.WSMsgType.ERROR:
+                        raise ws.exception()
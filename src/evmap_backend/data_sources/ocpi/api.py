@@ -207,7 +207,9 @@ def patch_evse(
             license_attribution_link=none_to_blank(source.license_attribution_link),
         ).save()
 
-        UpdateState(data_source=source.id, push=True).save()
+        UpdateState.objects.update_or_create(
+            data_source=source.id, defaults={"push": True}
+        )
 
     except Chargepoint.DoesNotExist:
         raise BadRequest("received evse patch for non-existing evse")
@@ -4,17 +4,21 @@ import logging
 from math import sqrt
 from typing import Generic, Iterable, List, Optional, TypeVar
 
-from django.contrib.gis.geos import Point
 from ninja import Schema
+from pydantic import BaseModel
 from pytz import timezone
 
 from evmap_backend import settings
 from evmap_backend.chargers.fields import normalize_evseid
-from evmap_backend.chargers.models import Chargepoint, ChargingSite, Connector, Network
+from evmap_backend.chargers.models import Connector
 from evmap_backend.data_sources.sync import (
     ChargepointItem,
+    ChargepointRecord,
     ChargingSiteItem,
+    ConnectorRecord,
     RealtimeStatusItem,
+    SiteRecord,
+    StatusRecord,
 )
 from evmap_backend.helpers.database import none_to_blank
 from evmap_backend.realtime.models import RealtimeStatus
@@ -216,8 +220,8 @@ class OcpiConnector(Schema):
         amperage = self.max_amperage or self.amperage
         return voltage * amperage * power_factor
 
-    def convert(self) -> Connector:
-        return Connector(
+    def convert(self) -> ConnectorRecord:
+        return ConnectorRecord(
             id_from_source=str(self.id),
             connector_type=connector_mapping[self.standard],
             connector_format=format_mapping[self.format],
@@ -251,7 +255,13 @@ format_mapping = {
 }
 
 
-class OcpiEvse(Schema):
+# The status-only models are plain pydantic models, as the validator that ninja's
+# Schema wraps around every object makes validating large status responses much slower.
+
+
+class OcpiEvseStatusOnly(BaseModel):
+    """EVSE with only the fields needed for realtime status updates"""
+
     class OcpiEvseStatus(enum.StrEnum):
         AVAILABLE = "AVAILABLE"
         BLOCKED = "BLOCKED"
@@ -268,31 +278,17 @@ class OcpiEvse(Schema):
             return cls.UNKNOWN
 
     uid: str | int
-    evse_id: Optional[str] = None
-    physical_reference: Optional[str] = None
     status: OcpiEvseStatus
-    # TODO: status_schedule
-    connectors: Optional[List[OcpiConnector]] = None
-
     last_updated: datetime.datetime
 
-    def convert(self, ignore_evseid: bool = False) -> Chargepoint:
-        return Chargepoint(
-            id_from_source=str(self.uid),
-            evseid=normalize_evseid(self.evse_id)
-            if self.evse_id is not None and not ignore_evseid
-            else "",
-            physical_reference=none_to_blank(self.physical_reference),
-        )
-
     def convert_status(
         self,
         data_source: str,
         license_attribution: str,
         license_attribution_link: Optional[str] = None,
         time_zone: Optional[str] = None,
-    ) -> RealtimeStatus:
-        return RealtimeStatus(
+    ) -> StatusRecord:
+        return StatusRecord(
             status=status_mapping[self.status],
             timestamp=(
                 timezone(time_zone).localize(self.last_updated)
@@ -307,6 +303,22 @@ class OcpiEvse(Schema):
         )
 
 
+class OcpiEvse(Schema, OcpiEvseStatusOnly):
+    evse_id: Optional[str] = None
+    physical_reference: Optional[str] = None
+    # TODO: status_schedule
+    connectors: Optional[List[OcpiConnector]] = None
+
+    def convert(self, ignore_evseid: bool = False) -> ChargepointRecord:
+        return ChargepointRecord(
+            id_from_source=str(self.uid),
+            evseid=normalize_evseid(self.evse_id)
+            if self.evse_id is not None and not ignore_evseid
+            else "",
+            physical_reference=none_to_blank(self.physical_reference),
+        )
+
+
 INVALID_STATUSES = [OcpiEvse.OcpiEvseStatus.REMOVED, OcpiEvse.OcpiEvseStatus.PLANNED]
 
 
@@ -337,8 +349,37 @@ class OcpiOperator(Schema):
     name: str
 
 
-class OcpiLocation(Schema):
+class OcpiLocationStatusOnly(BaseModel):
+    """Location with only the fields needed for realtime status updates"""
+
     id: str | int
+    evses: Optional[List[OcpiEvseStatusOnly]] = None
+    time_zone: Optional[str] = None
+
+    def convert_status(
+        self,
+        data_source: str,
+        license_attribution: str,
+        license_attribution_link: Optional[str] = None,
+    ) -> Iterable[RealtimeStatusItem]:
+        for evse in self.evses:
+            yield RealtimeStatusItem(
+                site_id_from_source=self.id,
+                chargepoint_id_from_source=evse.uid,
+                status=evse.convert_status(
+                    data_source,
+                    license_attribution,
+                    license_attribution_link,
+                    self.time_zone,
+                ),
+            )
+
+
+class OcpiStatusesResponse(BaseModel):
+    data: List[OcpiLocationStatusOnly]
+
+
+class OcpiLocation(Schema, OcpiLocationStatusOnly):
     country: Optional[str] = None
     country_code: Optional[str] = None
     name: Optional[str] = None
@@ -350,7 +391,6 @@ class OcpiLocation(Schema):
     evses: Optional[List[OcpiEvse]] = None
     operator: Optional[OcpiOperator] = None
     suboperator: Optional[OcpiOperator] = None
-    time_zone: Optional[str] = None
 
     # TODO: opening_times
 
@@ -367,18 +407,10 @@ class OcpiLocation(Schema):
         evse_id = next((evse.evse_id for evse in self.evses if evse.evse_id), None)
         if evse_id and not ignore_evseids:
             operator_id = normalize_evseid(evse_id)[:5]
-            network, _ = Network.get_or_create(
-                evse_operator_id=none_to_blank(operator_id),
-                defaults=dict(
-                    name=none_to_blank(
-                        self.operator.name if self.operator is not None else None
-                    )
-                ),
-            )
         else:
-            network = None
+            operator_id = None
 
-        site = ChargingSite(
+        site = SiteRecord(
             data_source=data_source,
             license_attribution=license_attribution,
             license_attribution_link=(
@@ -386,8 +418,7 @@ class OcpiLocation(Schema):
             ),
             id_from_source=str(self.id),
             name=none_to_blank(self.name if self.name is not None else self.address),
-            location=Point(self.coordinates.longitude, self.coordinates.latitude),
-            network=network,
+            location=(self.coordinates.longitude, self.coordinates.latitude),
             operator=(
                 none_to_blank(self.suboperator.name)
                 if self.suboperator is not None
@@ -428,27 +459,16 @@ class OcpiLocation(Schema):
                         evse.convert(ignore_evseid=ignore_evseids), connectors, status
                     )
                 )
-        return ChargingSiteItem(site, chargepoints)
+        return ChargingSiteItem(
+            site,
+            chargepoints,
+            network_operator_id=operator_id,
+            network_name=none_to_blank(
+                self.operator.name if self.operator is not None else None
+            ),
+        )
 
     def is_valid(self):
         return self.evses is not None and any(
             evse.status != OcpiEvse.OcpiEvseStatus.REMOVED for evse in self.evses
         )
-
-    def convert_status(
-        self,
-        data_source: str,
-        license_attribution: str,
-        license_attribution_link: Optional[str] = None,
-    ) -> Iterable[RealtimeStatusItem]:
-        for evse in self.evses:
-            yield RealtimeStatusItem(
-                site_id_from_source=self.id,
-                chargepoint_id_from_source=evse.uid,
-                status=evse.convert_status(
-                    data_source,
-                    license_attribution,
-                    license_attribution_link,
-                    self.time_zone,
-                ),
-            )
@@ -1,15 +1,28 @@
-from typing import Iterable
+from typing import Iterable, List
 
+from pydantic import TypeAdapter
 from tqdm import tqdm
 
-from evmap_backend.data_sources.ocpi.model import OcpiLocation
+from evmap_backend.data_sources.ocpi.model import (
+    OcpiLocation,
+    OcpiLocationStatusOnly,
+    OcpiStatusesResponse,
+)
+
+statuses_adapter = TypeAdapter(OcpiStatusesResponse)
 
 
 class OcpiParser:
     def parse_locations(
         self, data: Iterable, status_only: bool = False
-    ) -> Iterable[OcpiLocation]:
+    ) -> Iterable[OcpiLocation | OcpiLocationStatusOnly]:
+        model = OcpiLocationStatusOnly if status_only else OcpiLocation
         for site in tqdm(data, disable=None):
-            loc = OcpiLocation.model_validate(site)
-            if loc is not None:
-                yield loc
+            yield model.model_validate(site)
+
+    def parse_statuses(self, body: bytes) -> List[OcpiLocationStatusOnly]:
+        """
+        Parse the locations from a raw OCPI response body, reading only the fields
+        needed for status updates.
+        """
+        return statuses_adapter.validate_json(body).data
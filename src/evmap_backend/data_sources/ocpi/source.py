@@ -1,27 +1,35 @@
 import gzip
 import json
+import logging
 import os
 from abc import abstractmethod
-from typing import Iterable, Optional
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Type
 
 import requests
 from django.utils.functional import classproperty
 from requests.auth import HTTPBasicAuth
 
 from evmap_backend.data_sources import DataSource, DataType, UpdateMethod
+from evmap_backend.data_sources.fetch import fetch_feed
+from evmap_backend.data_sources.models import UpdateState
 from evmap_backend.data_sources.ocpi import SUPPORTED_OCPI_VERSIONS
 from evmap_backend.data_sources.ocpi.model import (
+    OcpiLocationStatusOnly,
     build_ocpi_credentials,
 )
 from evmap_backend.data_sources.ocpi.models import OcpiConnection, generate_token
 from evmap_backend.data_sources.ocpi.parser import OcpiLocation, OcpiParser
 from evmap_backend.data_sources.ocpi.utils import (
+    OcpiClient,
     ocpi_get,
     ocpi_get_paginated,
     ocpi_post,
 )
 from evmap_backend.data_sources.sync import sync_chargers, sync_statuses
 
+logger = logging.getLogger(__name__)
+
 
 def deduplicate_chargers(chargers: Iterable[OcpiLocation]) -> Iterable[OcpiLocation]:
     chargers_by_id = {}
@@ -58,7 +66,9 @@ class BaseOcpiDataSource(DataSource):
 
     def pull_data(self):
         root = self.get_locations_data()
-        locations = OcpiParser().parse_locations(root)
+        self.sync_locations(OcpiParser().parse_locations(root))
+
+    def sync_locations(self, locations: Iterable[OcpiLocation]):
         locations = self.postprocess_locations(locations)
 
         with_status = DataType.DYNAMIC in self.supported_data_types
@@ -89,8 +99,8 @@ class BaseOcpiRealtimeDataSource(DataSource):
         pass
 
     @abstractmethod
-    def get_statuses_data(self) -> Iterable[dict]:
-        """Get the data from the data source"""
+    def get_statuses_data(self) -> bytes:
+        """Get the raw OCPI response body with the locations from the data source"""
         pass
 
     @property
@@ -99,8 +109,10 @@ class BaseOcpiRealtimeDataSource(DataSource):
         pass
 
     def pull_data(self):
-        root = self.get_statuses_data()
-        locations = OcpiParser().parse_locations(root, status_only=True)
+        body = self.get_statuses_data()
+        self.sync_location_statuses(OcpiParser().parse_statuses(body))
+
+    def sync_location_statuses(self, locations: Iterable[OcpiLocationStatusOnly]):
         sync_statuses(
             self.id,
             self.locations_data_source,
@@ -271,6 +283,8 @@ class BaseEcoMovementUkOcpiDataSource(BaseOcpiDataSource):
     supported_data_types = [DataType.STATIC]
     supported_update_methods = [UpdateMethod.PULL]
     license_attribution = "Eco-Movement BV"
+    # pulled together with the other operators by EcoMovementUkOcpiDataSource
+    sync_interval = None
 
     @property
     @abstractmethod
@@ -278,21 +292,11 @@ class BaseEcoMovementUkOcpiDataSource(BaseOcpiDataSource):
         pass
 
     def get_locations_data(self):
-        offset = 0
-        limit = 1000
-        while True:
-            response = requests.get(
-                self.locations_url,
-                params={"limit": limit, "offset": offset},
-                headers={"Authorization": f"Token {self.token}"},
-            )
-            response.raise_for_status()
-            result = json.loads(response.text)["data"]
-            for item in result:
-                yield item
-            if len(result) < limit:
-                break
-            offset += limit
+        return self.fetch_locations_data(self.token)
+
+    def fetch_locations_data(self, token: str) -> Iterable[dict]:
+        with OcpiClient(token, encode_token=False) as client:
+            yield from client.get_paginated(self.locations_url, limit=1000)
 
 
 class BaseEcoMovementUkOcpiRealtimeDataSource(BaseOcpiRealtimeDataSource):
@@ -305,19 +309,121 @@ class BaseEcoMovementUkOcpiRealtimeDataSource(BaseOcpiRealtimeDataSource):
     supported_data_types = [DataType.DYNAMIC]
     supported_update_methods = [UpdateMethod.PULL]
     license_attribution = "Eco-Movement BV"
+    # pulled together with the other operators by EcoMovementUkOcpiRealtimeDataSource
+    sync_interval = None
 
     @property
     @abstractmethod
     def token(self) -> str:
         pass
 
-    def get_statuses_data(self) -> Iterable[dict]:
+    def get_statuses_data(self) -> bytes:
+        return self.fetch_statuses_data(self.token)
+
+    def fetch_statuses_data(self, token: str) -> bytes:
         response = requests.get(
             self.statuses_url,
-            headers={"Authorization": f"Token {self.token}"},
+            headers={"Authorization": f"Token {token}"},
         )
         response.raise_for_status()
-        return json.loads(response.text)["data"]
+        return response.content
+
+
+def group_by_token(members: Iterable[DataSource]) -> Dict[str, List[DataSource]]:
+    """
+    Group data sources by the token used to fetch their data, so that each dataset is
+    only fetched once.
+    """
+    groups = defaultdict(list)
+    for member in members:
+        if member.token:
+            groups[member.token].append(member)
+        else:
+            logger.warning(f"{member.id}: no token configured, skipping")
+    return groups
+
+
+class BaseEcoMovementUkGroupDataSource(DataSource):
+    """
+    Base class for data sources that pull the data of all Eco-Movement UK operators in
+    one job. The data is fetched once per distinct token and then synced to each
+    operator's data source, keeping their IDs and license attribution.
+    """
+
+    supported_update_methods = [UpdateMethod.PULL]
+
+    @property
+    @abstractmethod
+    def member_class(self) -> Type[DataSource]:
+        pass
+
+    @abstractmethod
+    def fetch(self, member: DataSource, token: str) -> List[OcpiLocationStatusOnly]:
+        pass
+
+    @abstractmethod
+    def sync(self, member: DataSource, locations: List[OcpiLocationStatusOnly]):
+        pass
+
+    def get_members(self) -> List[DataSource]:
+        from evmap_backend.data_sources.registry import iter_data_source_classes
+
+        return [
+            cls()
+            for cls in iter_data_source_classes()
+            if issubclass(cls, self.member_class)
+        ]
+
+    def pull_data(self):
+        failed = []
+        for token, members in group_by_token(self.get_members()).items():
+            try:
+                locations = self.fetch(members[0], token)
+            except Exception:
+                # the other groups are still synced
+                logger.exception(
+                    f"Failed to fetch data for {', '.join(m.id for m in members)}"
+                )
+                failed.extend(member.id for member in members)
+                continue
+            for member in members:
+                try:
+                    logger.info(f"Syncing {member.id}")
+                    self.sync(member, locations)
+                    UpdateState.objects.update_or_create(
+                        data_source=member.id, defaults={"push": False}
+                    )
+                except Exception:
+                    logger.exception(f"Failed to sync {member.id}")
+                    failed.append(member.id)
+        if failed:
+            raise Exception(f"Failed to sync {', '.join(failed)}")
+
+
+class EcoMovementUkOcpiDataSource(BaseEcoMovementUkGroupDataSource):
+    id = "ecomovement_uk"
+    supported_data_types = [DataType.STATIC]
+    license_attribution = "Eco-Movement BV"
+    member_class = BaseEcoMovementUkOcpiDataSource
+
+    def fetch(self, member, token):
+        return list(OcpiParser().parse_locations(member.fetch_locations_data(token)))
+
+    def sync(self, member, locations):
+        member.sync_locations(locations)
+
+
+class EcoMovementUkOcpiRealtimeDataSource(BaseEcoMovementUkGroupDataSource):
+    id = "ecomovement_uk_realtime"
+    supported_data_types = [DataType.DYNAMIC]
+    license_attribution = "Eco-Movement BV"
+    member_class = BaseEcoMovementUkOcpiRealtimeDataSource
+
+    def fetch(self, member, token):
+        return OcpiParser().parse_statuses(member.fetch_statuses_data(token))
+
+    def sync(self, member, locations):
+        member.sync_location_statuses(locations)
 
 
 class NdwNetherlandsOcpiDataSource(BaseOcpiDataSource):
@@ -330,9 +436,9 @@ class NdwNetherlandsOcpiDataSource(BaseOcpiDataSource):
     id = "ndw_netherlands"
 
     def get_locations_data(self):
-        response = requests.get(self.locations_url)
-        unzipped = gzip.decompress(response.content).decode("utf-8")
-        return json.loads(unzipped)
+        feed = fetch_feed(self.id, self.locations_url)
+        with gzip.open(feed.file) as unzipped:
+            return json.load(unzipped)
 
     def postprocess_locations(
         self, locations: Iterable[OcpiLocation]
@@ -523,7 +629,7 @@ class ChargyUkOcpiDataSource(BaseOcpiDataSource):
     id = "chargy_uk"
 
     def get_locations_data(self):
-        return json.loads(requests.get(self.locations_url).text)["data"]
+        return fetch_feed(self.id, self.locations_url).json()["data"]
 
 
 class MfgUkOcpiDataSource(BaseOcpiDataSource):
@@ -536,9 +642,8 @@ class MfgUkOcpiDataSource(BaseOcpiDataSource):
     # https://www.motorfuelgroup.com/ev-power/ -> Open data
 
     def get_locations_data(self):
-        response = requests.get(self.locations_url)
-        response.raise_for_status()
-        return json.loads(response.text)["data"]
+        feed = fetch_feed(self.id, self.locations_url)
+        return feed.json()["data"]
 
 
 class GeniepointUkOcpiDataSource(BaseOcpiDataSource):
@@ -551,9 +656,8 @@ class GeniepointUkOcpiDataSource(BaseOcpiDataSource):
     # https://www.equans.co.uk/drivers-geniepoint/open-data
 
     def get_locations_data(self):
-        response = requests.get(self.locations_url)
-        response.raise_for_status()
-        return json.loads(response.text)["data"]
+        feed = fetch_feed(self.id, self.locations_url)
+        return feed.json()["data"]
 
 
 class ClenergyUkOcpiDataSource(BaseOcpiDataSource):
@@ -566,9 +670,8 @@ class ClenergyUkOcpiDataSource(BaseOcpiDataSource):
     # https://www.clenergy-ev.com/open-data/
 
     def get_locations_data(self):
-        response = requests.get(self.locations_url)
-        response.raise_for_status()
-        return json.loads(response.text)["data"]
+        feed = fetch_feed(self.id, self.locations_url)
+        return feed.json()["data"]
 
 
 class GoZeroUkOcpiDataSource(BaseOcpiDataSource):
@@ -581,9 +684,8 @@ class GoZeroUkOcpiDataSource(BaseOcpiDataSource):
     # https://domestic.gozerocharge.com/public-charge-point-open-data/
 
     def get_locations_data(self):
-        response = requests.get(self.locations_url)
-        response.raise_for_status()
-        return json.loads(response.text)["data"]
+        feed = fetch_feed(self.id, self.locations_url)
+        return feed.json()["data"]
 
 
 class FastnedUkOcpiDataSource(BaseOcpiDataSource):
@@ -598,12 +700,12 @@ class FastnedUkOcpiDataSource(BaseOcpiDataSource):
     # https://www.fastnedcharging.com/en-gb/uk-open-data
 
     def get_locations_data(self):
-        response = requests.get(
+        feed = fetch_feed(
+            self.id,
             self.locations_url,
             headers={"x-api-key": self.api_key},
         )
-        response.raise_for_status()
-        return json.loads(response.text)["data"]
+        return feed.json()["data"]
 
 
 class OspreyUkOcpiDataSource(BaseOcpiDataSource):
@@ -617,12 +719,12 @@ class OspreyUkOcpiDataSource(BaseOcpiDataSource):
     # support@ospreycharging.co.uk
 
     def get_locations_data(self):
-        response = requests.get(
+        feed = fetch_feed(
+            self.id,
             self.locations_url,
             auth=HTTPBasicAuth(self.username, self.password),
         )
-        response.raise_for_status()
-        return json.loads(response.text)["locations"]
+        return feed.json()["locations"]
 
 
 class MerUkOcpiDataSource(BaseOcpiDataSource):
@@ -634,9 +736,8 @@ class MerUkOcpiDataSource(BaseOcpiDataSource):
     # https://uk.mer.eco/live-charge-point-data/
 
     def get_locations_data(self):
-        response = requests.get(self.url)
-        response.raise_for_status()
-        return json.loads(response.text)["data"]["locations"]["data"]
+        feed = fetch_feed(self.id, self.url)
+        return feed.json()["data"]["locations"]["data"]
 
 
 class ScottishPowerUkOcpiDataSource(BaseOcpiDataSource):
@@ -654,9 +755,8 @@ class ScottishPowerUkOcpiDataSource(BaseOcpiDataSource):
     # https://www.scottishpower.co.uk/blog/public-ev-charging
 
     def get_locations_data(self):
-        response = requests.get(self.locations_url)
-        response.raise_for_status()
-        return json.loads(response.text)["data"]
+        feed = fetch_feed(self.id, self.locations_url)
+        return feed.json()["data"]
 
 
 class LithuaniaOcpiDataSource(BaseOcpiDataSource):
@@ -668,9 +768,8 @@ class LithuaniaOcpiDataSource(BaseOcpiDataSource):
     # https://ev.lakd.lt/en/open_source
 
     def get_locations_data(self):
-        response = requests.get(self.locations_url)
-        response.raise_for_status()
-        return json.loads(response.text)["data"]
+        feed = fetch_feed(self.id, self.locations_url)
+        return feed.json()["data"]
 
 
 class RoadBelgiumOcpiDataSource(BaseOcpiDataSource):
@@ -681,9 +780,8 @@ class RoadBelgiumOcpiDataSource(BaseOcpiDataSource):
     # https://transportdata.be/en/dataset/road-public-charging-network
 
     def get_locations_data(self):
-        response = requests.get(self.locations_url)
-        response.raise_for_status()
-        return json.loads(response.text)
+        feed = fetch_feed(self.id, self.locations_url)
+        return feed.json()
 
 
 class TeslaBelgiumOcpiDataSource(BaseOcpiDataSource):
@@ -695,12 +793,12 @@ class TeslaBelgiumOcpiDataSource(BaseOcpiDataSource):
     # https://transportdata.be/en/dataset/tesla-api
 
     def get_locations_data(self):
-        response = requests.get(
+        feed = fetch_feed(
+            self.id,
             self.locations_url,
             headers={"Authorization": f"Token {self.token}"},
         )
-        response.raise_for_status()
-        return json.loads(response.text)["data"]
+        return feed.json()["data"]
 
 
 class TeslaUkOcpiDataSource(BaseOcpiConnectionDataSource):
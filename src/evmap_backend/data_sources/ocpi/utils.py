@@ -1,10 +1,15 @@
 import base64
 import re
-from typing import Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 import requests
 from ninja import Schema
 from requests import Response
+from requests.adapters import HTTPAdapter
+from urllib3 import Retry
 
 link_regex = re.compile('<([^>]+)>; rel="next"')
 
@@ -16,69 +21,193 @@ def auth_header(token: str, encode: bool = True) -> str:
         return f"Token {token}"
 
 
-def _ocpi_request(
-    url: str, token: str, method: str, body: str = None, extra_auth_header: str = None
-) -> tuple[Any, Response]:
-    headers = {"Authorization": auth_header(token, encode=True)}
-    if body is not None:
-        headers["Content-Type"] = "application/json"
-    if extra_auth_header is not None:
-        # add extra auth header (Instavolt requires x-api-key)
-        headers[extra_auth_header] = auth_header(token, encode=True)
-
-    response = requests.request(
-        method,
-        url,
-        data=body,
-        headers=headers,
-    )
-    if response.status_code == 401:
-        # retry with unencoded token
-        headers["Authorization"] = auth_header(token, encode=False)
-        if extra_auth_header is not None:
-            headers[extra_auth_header] = auth_header(token, encode=False)
-        response = requests.request(
-            method,
-            url,
-            data=body,
-            headers=headers,
+def _get_offset(url: str) -> Optional[int]:
+    offset = dict(parse_qsl(urlsplit(url).query)).get("offset")
+    return int(offset) if offset is not None else None
+
+
+def _with_offset(url: str, offset: int, limit: int) -> str:
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query["offset"] = str(offset)
+    query["limit"] = str(limit)
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class OcpiClient:
+    """
+    Client for OCPI APIs, using a connection-pooled session for all requests.
+
+    Requests failing with 429 or 5xx status codes are retried with exponential backoff,
+    respecting the Retry-After header. If encode_token is None, the Base64-encoded token
+    (OCPI 2.2) is tried first, falling back to the plain token (OCPI 2.1) if the server
+    responds with 401.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        extra_auth_header: Optional[str] = None,
+        encode_token: Optional[bool] = None,
+        prefetch: int = 4,
+        retries: int = 5,
+        backoff_factor: float = 1.0,
+        timeout: float = 60,
+    ):
+        self.token = token
+        self.extra_auth_header = extra_auth_header
+        self.encode_token = encode_token
+        self.prefetch = prefetch
+        self.timeout = timeout
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False,
         )
-    response.raise_for_status()
-    json = response.json()
-
-    if json["status_code"] != 1000:
-        raise Exception(f"OCPI error {json['status_code']}: {json['status_message']}")
-    return response, json
+        adapter = HTTPAdapter(max_retries=retry, pool_maxsize=max(prefetch, 1))
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _headers(self, encode: bool) -> dict:
+        headers = {"Authorization": auth_header(self.token, encode=encode)}
+        if self.extra_auth_header is not None:
+            # add extra auth header (Instavolt requires x-api-key)
+            headers[self.extra_auth_header] = auth_header(self.token, encode=encode)
+        return headers
+
+    def request(
+        self, url: str, method: str = "GET", body: str = None
+    ) -> tuple[Response, Any]:
+        encode = self.encode_token if self.encode_token is not None else True
+        headers = self._headers(encode)
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+
+        response = self.session.request(
+            method, url, data=body, headers=headers, timeout=self.timeout
+        )
+        if response.status_code == 401 and self.encode_token is None:
+            # retry with unencoded token
+            headers.update(self._headers(encode=False))
+            response = self.session.request(
+                method, url, data=body, headers=headers, timeout=self.timeout
+            )
+            if response.ok:
+                self.encode_token = False
+        response.raise_for_status()
+        json = response.json()
+
+        # some OCPI-based APIs do not include a status code
+        if json.get("status_code", 1000) != 1000:
+            raise Exception(
+                f"OCPI error {json['status_code']}: {json['status_message']}"
+            )
+        return response, json
+
+    def get(self, url: str):
+        response, json = self.request(url)
+        return json["data"]
+
+    def post(self, url: str, body: Schema):
+        response, json = self.request(url, "POST", body.model_dump_json())
+        return json["data"]
+
+    def _get_page(self, url: str) -> tuple[Response, List]:
+        response, json = self.request(url)
+        if not isinstance(json["data"], list):
+            raise Exception("OCPI paginated response data is not a list")
+        return response, json["data"]
+
+    def get_paginated(self, url: str, limit: Optional[int] = None) -> Iterator:
+        """
+        Yield all items of a paginated OCPI endpoint.
+
+        If the server reports the total number of items (X-Total-Count) and uses offset
+        pagination, the following pages are requested concurrently, up to prefetch pages
+        ahead of the page being consumed. Otherwise, Link headers are followed one page
+        at a time. If a limit is given and the server sends neither header, pages are
+        requested by offset until a page has fewer than limit items.
+        """
+        if limit is not None:
+            url = _with_offset(url, 0, limit)
+        response, items = self._get_page(url)
+        yield from items
+
+        match = link_regex.search(response.headers.get("Link", ""))
+        next_url = match.group(1) if match else None
+
+        # the URL of the following pages, with the offset of the second page
+        template, start = None, None
+        if next_url is not None and _get_offset(next_url) is not None:
+            template, start = next_url, _get_offset(next_url)
+        elif next_url is None and limit is not None:
+            template, start = url, len(items)
+
+        total = response.headers.get("X-Total-Count")
+        page_size = int(response.headers.get("X-Limit", len(items)))
+        if total is not None and template is not None and page_size > 0:
+            yield from self._get_pages_concurrently(
+                [
+                    _with_offset(template, offset, page_size)
+                    for offset in range(start, int(total), page_size)
+                ]
+            )
+        elif next_url is not None:
+            while next_url is not None:
+                response, items = self._get_page(next_url)
+                yield from items
+                match = link_regex.search(response.headers.get("Link", ""))
+                next_url = match.group(1) if match else None
+        elif limit is not None:
+            offset = len(items)
+            while len(items) == limit:
+                response, items = self._get_page(_with_offset(url, offset, limit))
+                yield from items
+                offset += len(items)
+
+    def _get_pages_concurrently(self, urls: List[str]) -> Iterator:
+        executor = ThreadPoolExecutor(
+            max_workers=max(self.prefetch, 1), thread_name_prefix="OcpiClient"
+        )
+        pending = deque()
+        urls = iter(urls)
+        try:
+            for url in urls:
+                pending.append(executor.submit(self._get_page, url))
+                if len(pending) >= self.prefetch:
+                    break
+            while pending:
+                response, items = pending.popleft().result()
+                next_url = next(urls, None)
+                if next_url is not None:
+                    pending.append(executor.submit(self._get_page, next_url))
+                yield from items
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
 
 
 def ocpi_get(url: str, token: str, extra_auth_header: str = None):
-    response, json = _ocpi_request(
-        url, token, "GET", extra_auth_header=extra_auth_header
-    )
-    return json["data"]
+    with OcpiClient(token, extra_auth_header=extra_auth_header) as client:
+        return client.get(url)
 
 
 def ocpi_get_paginated(url: str, token: str, extra_auth_header: str = None):
-    response, json = _ocpi_request(
-        url, token, "GET", extra_auth_header=extra_auth_header
-    )
-
-    if not isinstance(json["data"], list):
-        raise Exception("OCPI paginated response data is not a list")
-
-    for item in json["data"]:
-        yield item
-
-    if "Link" in response.headers:
-        # paginated response
-        link = link_regex.match(response.headers["Link"]).group(1)
-        for item in ocpi_get_paginated(
-            link, token, extra_auth_header=extra_auth_header
-        ):
-            yield item
+    with OcpiClient(token, extra_auth_header=extra_auth_header) as client:
+        yield from client.get_paginated(url)
 
 
 def ocpi_post(url: str, token: str, body: Schema):
-    dump_json = body.model_dump_json()
-    response, json = _ocpi_request(url, token, "POST", dump_json)
-    return json["data"]
+    with OcpiClient(token) as client:
+        return client.post(url, body)
@@ -14,20 +14,24 @@ positions for chargers at the same location.
 """
 
 import logging
+import math
 from collections import defaultdict
 from typing import Dict, Iterable, List, Optional, Tuple
 
-from django.contrib.gis.geos import Point
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from opening_hours import OpeningHours
 
 from evmap_backend.chargers.fields import normalize_evseid, validate_evseid
-from evmap_backend.chargers.models import Chargepoint, ChargingSite, Connector, Network
+from evmap_backend.chargers.models import Connector
 from evmap_backend.data_sources.sync import (
     ChargepointItem,
+    ChargepointRecord,
     ChargingSiteItem,
+    ConnectorRecord,
     RealtimeStatusItem,
+    SiteRecord,
+    StatusRecord,
 )
 from evmap_backend.helpers.database import none_to_blank
 from evmap_backend.realtime.models import RealtimeStatus
@@ -81,8 +85,8 @@ DAY_ABBREVIATIONS = {
 }
 
 
-def _parse_coordinates(geo_coordinates: dict) -> Optional[Point]:
-    """Parse GeoCoordinates in Google format ('lat lng') to a Point."""
+def _parse_coordinates(geo_coordinates: dict) -> Optional[Tuple[float, float]]:
+    """Parse GeoCoordinates in Google format ('lat lng') to a (lng, lat) tuple."""
     google = geo_coordinates.get("Google", "")
     parts = google.split()
     if len(parts) != 2:
@@ -92,7 +96,7 @@ def _parse_coordinates(geo_coordinates: dict) -> Optional[Point]:
         lng = float(parts[1])
         if lat == 0 and lng == 0:
             return None
-        return Point(lng, lat)
+        return lng, lat
     except (ValueError, TypeError):
         return None
 
@@ -119,16 +123,26 @@ class _SiteClusterer:
 
     For each operator the first record at a new location becomes a cluster leader.
     Subsequent records within ``_CLUSTER_THRESHOLD`` degrees of an existing leader
-    join that cluster.
+    join that cluster. If several leaders are within the threshold, the one that was
+    created first wins.
 
     The cluster key is the formatted coordinate of the leader (first record seen).
+
+    Leaders are indexed in a grid of cells that are ``_CLUSTER_THRESHOLD`` degrees
+    wide, so a lookup only has to check the leaders in the 3x3 cells around a record.
     """
 
     def __init__(self):
-        # (operator_id, operator_name) -> list of (leader_lat, leader_lng, key_str)
-        self._leaders: Dict[Tuple[str, str], List[Tuple[float, float, str]]] = (
-            defaultdict(list)
-        )
+        # (operator_id, operator_name, cell_lat, cell_lng)
+        #   -> list of (leader index, leader_lat, leader_lng, key_str)
+        self._cells: Dict[
+            Tuple[str, str, int, int], List[Tuple[int, float, float, str]]
+        ] = defaultdict(list)
+        self._count = 0
+
+    @staticmethod
+    def _cell(value: float) -> int:
+        return math.floor(value / _CLUSTER_THRESHOLD)
 
     def get_cluster_key(
         self, operator_id: str, operator_name: str, google_coords: str
@@ -139,17 +153,30 @@ class _SiteClusterer:
             return google_coords  # unparseable – use raw string
 
         lat, lng = parsed
-        op_key = (operator_id, operator_name)
-        for leader_lat, leader_lng, key_str in self._leaders[op_key]:
-            if (
-                abs(lat - leader_lat) < _CLUSTER_THRESHOLD
-                and abs(lng - leader_lng) < _CLUSTER_THRESHOLD
-            ):
-                return key_str
+        cell_lat, cell_lng = self._cell(lat), self._cell(lng)
+        best = None
+        for i in (cell_lat - 1, cell_lat, cell_lat + 1):
+            for j in (cell_lng - 1, cell_lng, cell_lng + 1):
+                for leader in self._cells.get((operator_id, operator_name, i, j), ()):
+                    index, leader_lat, leader_lng, key_str = leader
+                    if best is not None and index > best[0]:
+                        # leaders in a cell are ordered by creation
+                        break
+                    if (
+                        abs(lat - leader_lat) < _CLUSTER_THRESHOLD
+                        and abs(lng - leader_lng) < _CLUSTER_THRESHOLD
+                    ):
+                        best = leader
+                        break
+        if best is not None:
+            return best[3]
 
         # No nearby leader found – start a new cluster
         key_str = f"{lat:.6f} {lng:.6f}"
-        self._leaders[op_key].append((lat, lng, key_str))
+        self._cells[(operator_id, operator_name, cell_lat, cell_lng)].append(
+            (self._count, lat, lng, key_str)
+        )
+        self._count += 1
         return key_str
 
 
@@ -218,7 +245,7 @@ def _convert_opening_hours(record: dict) -> str:
     return str(OpeningHours(raw).normalize())
 
 
-def _parse_connectors(record: dict) -> List[Connector]:
+def _parse_connectors(record: dict) -> List[ConnectorRecord]:
     """Parse connectors from an EVSE data record.
 
     Each EVSE record has a list of Plugs and a list of ChargingFacilities.
@@ -255,7 +282,7 @@ def _parse_connectors(record: dict) -> List[Connector]:
                     pass
 
         connectors.append(
-            Connector(
+            ConnectorRecord(
                 connector_type=connector_type,
                 connector_format=connector_format,
                 max_power=max_power,
@@ -309,26 +336,20 @@ def parse_oicp_data(
         country = COUNTRY_CODE_MAP[country_raw]
 
         first_evseid = normalize_evseid(first_record.get("EvseID", ""))
-        network = None
+        evse_operator_id = None
         try:
             validate_evseid(first_evseid)
-            evse_operator_id = first_evseid[:5]
-            if evse_operator_id:
-                network, _ = Network.get_or_create(
-                    evse_operator_id=evse_operator_id,
-                    defaults=dict(name=none_to_blank(operator_name)),
-                )
+            evse_operator_id = first_evseid[:5] or None
         except ValidationError:
             logger.warning(f"invalid evseid: {first_evseid}")
 
-        site = ChargingSite(
+        site = SiteRecord(
             data_source=data_source,
             license_attribution=license_attribution,
             license_attribution_link=license_attribution_link,
             id_from_source=cluster_key,
             name=_get_station_name(first_record),
             location=location,
-            network=network,
             operator=none_to_blank(operator_name),
             street=none_to_blank(address.get("Street")),
             zipcode=none_to_blank(address.get("PostalCode")),
@@ -346,7 +367,7 @@ def parse_oicp_data(
             except ValidationError:
                 evseid_normalized = ""
 
-            chargepoint = Chargepoint(
+            chargepoint = ChargepointRecord(
                 id_from_source=evse_id,
                 evseid=evseid_normalized,
             )
@@ -354,7 +375,12 @@ def parse_oicp_data(
             connectors = _parse_connectors(record)
             chargepoints.append(ChargepointItem(chargepoint, connectors))
 
-        yield ChargingSiteItem(site, chargepoints)
+        yield ChargingSiteItem(
+            site,
+            chargepoints,
+            network_operator_id=evse_operator_id,
+            network_name=none_to_blank(operator_name),
+        )
 
 
 def parse_oicp_status(
@@ -382,7 +408,7 @@ def parse_oicp_status(
             evse_status = record.get("EVSEStatus", "Unknown")
             status = STATUS_MAP.get(evse_status, RealtimeStatus.Status.UNKNOWN)
 
-            realtime_status = RealtimeStatus(
+            realtime_status = StatusRecord(
                 status=status,
                 timestamp=now,
                 data_source=data_source,
@@ -1,6 +1,5 @@
-import requests
-
 from evmap_backend.data_sources import DataSource, DataType, UpdateMethod
+from evmap_backend.data_sources.fetch import fetch_feed
 from evmap_backend.data_sources.opendata_swiss.parser import (
     parse_oicp_data,
     parse_oicp_status,
@@ -21,9 +20,7 @@ class OpendataSwissDataSource(DataSource):
     )
 
     def pull_data(self):
-        response = requests.get(DATA_URL)
-        response.raise_for_status()
-        data = response.json()
+        data = fetch_feed(self.id, DATA_URL).json()
 
         sites = parse_oicp_data(
             data,
@@ -44,9 +41,7 @@ class OpendataSwissRealtimeDataSource(DataSource):
     )
 
     def pull_data(self):
-        response = requests.get(STATUS_URL)
-        response.raise_for_status()
-        status_data = response.json()
+        status_data = fetch_feed(self.id, STATUS_URL).json()
 
         statuses = parse_oicp_status(
             status_data,
@@ -0,0 +1,92 @@
+"""
+Spooling of HTTP push payloads.
+
+The push endpoint only verifies the request and writes the body (still compressed, if
+it was sent with Content-Encoding: gzip) to a spool directory below DATA_DIR. The
+payload is then processed by the process_push Celery task, so that large pushes do not
+block a web worker for the duration of the sync.
+
+Pushes are coalesced per data source: if a newer payload has already arrived by the
+time a queued payload is processed, the older one is skipped (unless the data source
+sets coalesce_pushes = False). The same applies to payloads received before the last
+applied one, which is stored in UpdateState.last_push_received.
+
+Payloads are deleted once they have been processed or skipped, or if they cannot be
+parsed. If processing fails for any other reason (e.g. the database is unavailable),
+the payload is kept in the spool directory so that it can be processed again.
+"""
+
+import gzip
+import os
+import time
+import zlib
+from pathlib import Path
+from typing import BinaryIO
+from xml.etree.ElementTree import ParseError
+
+import ijson
+from django.conf import settings
+
+CHUNK_SIZE = 1024 * 1024
+
+# errors caused by an invalid payload, which would fail again if it was reprocessed
+INVALID_PAYLOAD_ERRORS = (
+    ValueError,
+    ijson.JSONError,
+    ParseError,
+    EOFError,
+    gzip.BadGzipFile,
+    zlib.error,
+)
+
+
+def get_spool_dir(data_source: str) -> Path:
+    path = Path(settings.DATA_DIR) / "push" / data_source
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def spool_push(data_source: str, stream: BinaryIO, compressed: bool) -> Path:
+    """
+    Write a push payload to the spool directory of the data source.
+
+    The payload is written to a temporary file first and renamed afterwards, so that
+    the spool directory only ever contains complete payloads. File names start with
+    the time of receipt in nanoseconds, so they sort in the order of arrival.
+    """
+    spool_dir = get_spool_dir(data_source)
+    name = f"{time.time_ns()}.{'gz' if compressed else 'raw'}"
+    tmp_path = spool_dir / f".{name}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            while chunk := stream.read(CHUNK_SIZE):
+                f.write(chunk)
+        path = spool_dir / name
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return path
+
+
+def _received_at_ns(path: Path) -> int:
+    return int(path.name.split(".")[0])
+
+
+def newer_push_exists(path: Path) -> bool:
+    """Check whether a payload newer than path is waiting in the same spool directory."""
+    received = _received_at_ns(path)
+    return any(
+        not other.name.startswith(".") and _received_at_ns(other) > received
+        for other in path.parent.iterdir()
+    )
+
+
+def open_push(path: Path) -> BinaryIO:
+    """
+    Open a spooled payload for reading. Compressed payloads are decompressed
+    incrementally while reading, so the payload is never held in memory as a whole.
+    """
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    return open(path, "rb")
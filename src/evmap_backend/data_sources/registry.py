@@ -1,257 +1,176 @@
-from typing import Dict, List, Type
+"""
+Registry of all data sources.
+
+Data sources are registered by ID with the dotted path of their class, and the source
+modules are only imported when a class is first used. This way, processes which only
+handle a few sources (e.g. the web server or a single management command) do not pay
+for importing all of them and their dependencies.
+"""
+
+from functools import cache
+from typing import Dict, Iterator, List, Type
+
+from django.utils.module_loading import import_string
 
 from evmap_backend.data_sources import DataSource
-from evmap_backend.data_sources.datex2.source import (
-    Datex2AudiChargingHubDataSource,
-    Datex2AudiChargingHubRealtimeDataSource,
-    Datex2AustriaDataSource,
-    Datex2AustriaRealtimeDataSource,
-    Datex2BelgiumEcoMovementDataSource,
-    Datex2BelgiumMontaDataSource,
-    Datex2DenmarkEcoMovementDataSource,
-    Datex2DenmarkMontaDataSource,
-    Datex2FinlandDataSource,
-    Datex2LatviaEcoMovementDataSource,
-    Datex2LatviaEcoMovementRealtimeDataSource,
-    Datex2LuxembourgEcoMovementDataSource,
-    Datex2MobilithekChargecloudDataSource,
-    Datex2MobilithekChargecloudRealtimeDataSource,
-    Datex2MobilithekEcoMovementDatex2DataSource,
-    Datex2MobilithekEcoMovementRealtimeDataSource,
-    Datex2MobilithekEnbwDataSource,
-    Datex2MobilithekEnbwRealtimeDataSource,
-    Datex2MobilithekEonDriveDataSource,
-    Datex2MobilithekEonDriveRealtimeDataSource,
-    Datex2MobilithekEroundDataSource,
-    Datex2MobilithekEroundRealtimeDataSource,
-    Datex2MobilithekEulektroDataSource,
-    Datex2MobilithekEulektroRealtimeDataSource,
-    Datex2MobilithekGlsMobilityDataSource,
-    Datex2MobilithekGlsMobilityRealtimeDataSource,
-    Datex2MobilithekGridAndCoDataSource,
-    Datex2MobilithekGridAndCoRealtimeDataSource,
-    Datex2MobilithekLadebusinessDataSource,
-    Datex2MobilithekLadebusinessRealtimeDataSource,
-    Datex2MobilithekLadenetzDataSource,
-    Datex2MobilithekLadenetzRealtimeDataSource,
-    Datex2MobilithekM8MitDataSource,
-    Datex2MobilithekM8MitRealtimeDataSource,
-    Datex2MobilithekMontaDataSource,
-    Datex2MobilithekMontaRealtimeDataSource,
-    Datex2MobilithekPumpDataSource,
-    Datex2MobilithekQwelloDataSource,
-    Datex2MobilithekQwelloRealtimeDataSource,
-    Datex2MobilithekSmatricsDataSource,
-    Datex2MobilithekSmatricsRealtimeDataSource,
-    Datex2MobilithekTeslaDataSource,
-    Datex2MobilithekTeslaRealtimeDataSource,
-    Datex2MobilithekUlmDataSource,
-    Datex2MobilithekUlmRealtimeDataSource,
-    Datex2MobilithekVaylensDataSource,
-    Datex2MobilithekVaylensRealtimeDataSource,
-    Datex2MobilithekWirelaneDataSource,
-    Datex2MobilithekWirelaneRealtimeDataSource,
-    Datex2SloveniaDataSource,
-    Datex2SloveniaRealtimeDataSource,
-    Datex2SpainDataSource,
-)
-from evmap_backend.data_sources.fintraffic.source import FintrafficRealtimeDataSource
-from evmap_backend.data_sources.goingelectric.source import GoingElectricDataSource
-from evmap_backend.data_sources.irve.source import IrveFranceDataSource
-from evmap_backend.data_sources.nobil.source import (
-    NobilDataSource,
-    NobilRealtimeDataSource,
-)
-from evmap_backend.data_sources.ocpi.source import (
-    BlinkUkOcpiDataSource,
-    BlinkUkOcpiRealtimeDataSource,
-    BpPulseUkOcpiDataSource,
-    BpPulseUkOcpiRealtimeDataSource,
-    ChargePointUkOcpiDataSource,
-    ChargePointUkOcpiRealtimeDataSource,
-    ChargyUkOcpiDataSource,
-    ClenergyUkOcpiDataSource,
-    CommunityByShellRechargeUkOcpiDataSource,
-    CommunityByShellRechargeUkOcpiRealtimeDataSource,
-    EsbUkOcpiDataSource,
-    EsbUkOcpiRealtimeDataSource,
-    EvPointUkOcpiDataSource,
-    EvPointUkOcpiRealtimeDataSource,
-    EvyeUkOcpiDataSource,
-    EvyeUkOcpiRealtimeDataSource,
-    FastnedUkOcpiDataSource,
-    GeniepointUkOcpiDataSource,
-    GoZeroUkOcpiDataSource,
-    InstavoltUkOcpiDataSource,
-    IonityUkOcpiDataSource,
-    IonityUkOcpiRealtimeDataSource,
-    LidlUkOcpiDataSource,
-    LidlUkOcpiRealtimeDataSource,
-    MerUkOcpiDataSource,
-    MfgUkOcpiDataSource,
-    NdwNetherlandsOcpiDataSource,
-    OspreyUkOcpiDataSource,
-    RawChargingUkOcpiDataSource,
-    RawChargingUkOcpiRealtimeDataSource,
-    RoadBelgiumOcpiDataSource,
-    ScottishPowerUkOcpiDataSource,
-    ShellRechargeUkOcpiDataSource,
-    ShellRechargeUkOcpiRealtimeDataSource,
-    SourceEvUkOcpiDataSource,
-    SourceEvUkOcpiRealtimeDataSource,
-    TeslaBelgiumOcpiDataSource,
-    TeslaUkOcpiDataSource,
-    UbitricityUkOcpiDataSource,
-    UbitricityUkOcpiRealtimeDataSource,
-)
-from evmap_backend.data_sources.opendata_swiss.source import (
-    OpendataSwissDataSource,
-    OpendataSwissRealtimeDataSource,
-)
 
-DATA_SOURCE_CLASSES: List[Type[DataSource]] = [
+DATA_SOURCES: Dict[str, str] = {
     # multiple countries
-    GoingElectricDataSource,
+    "goingelectric": "evmap_backend.data_sources.goingelectric.source.GoingElectricDataSource",
     # Austria
-    Datex2AustriaDataSource,
-    Datex2AustriaRealtimeDataSource,
+    "e-control_austria": "evmap_backend.data_sources.datex2.source.Datex2AustriaDataSource",
+    "e-control_austria_realtime": "evmap_backend.data_sources.datex2.source.Datex2AustriaRealtimeDataSource",
     # Germany
-    # ElisoDataSource,  # Eliso is already included in the Eco-Movement data
-    Datex2MobilithekEcoMovementDatex2DataSource,
-    Datex2MobilithekEcoMovementRealtimeDataSource,
-    Datex2MobilithekEnbwDataSource,
-    Datex2MobilithekEnbwRealtimeDataSource,
-    Datex2MobilithekLadenetzDataSource,
-    Datex2MobilithekLadenetzRealtimeDataSource,
-    Datex2MobilithekLadebusinessDataSource,
-    Datex2MobilithekLadebusinessRealtimeDataSource,
-    Datex2MobilithekUlmDataSource,
-    Datex2MobilithekUlmRealtimeDataSource,
-    Datex2MobilithekWirelaneDataSource,
-    Datex2MobilithekWirelaneRealtimeDataSource,
-    Datex2MobilithekTeslaDataSource,
-    Datex2MobilithekTeslaRealtimeDataSource,
-    Datex2MobilithekSmatricsDataSource,
-    Datex2MobilithekSmatricsRealtimeDataSource,
-    Datex2MobilithekChargecloudDataSource,
-    Datex2MobilithekChargecloudRealtimeDataSource,
-    Datex2MobilithekEulektroDataSource,
-    Datex2MobilithekEulektroRealtimeDataSource,
-    Datex2MobilithekEroundDataSource,
-    Datex2MobilithekEroundRealtimeDataSource,
-    Datex2MobilithekMontaDataSource,
-    Datex2MobilithekMontaRealtimeDataSource,
-    Datex2MobilithekGridAndCoDataSource,
-    Datex2MobilithekGridAndCoRealtimeDataSource,
-    # Datex2MobilithekEnioDataSource,  # no data uploaded yet
-    Datex2MobilithekPumpDataSource,
-    Datex2MobilithekM8MitDataSource,
-    Datex2MobilithekM8MitRealtimeDataSource,
-    Datex2MobilithekVaylensDataSource,
-    Datex2MobilithekVaylensRealtimeDataSource,
-    # Datex2MobilithekEluMobilityDataSource,  # data not valid (missing coordinates)
-    # Datex2MobilithekEluMobilityRealtimeDataSource,  # no data uploaded yet
-    Datex2MobilithekQwelloDataSource,
-    Datex2MobilithekQwelloRealtimeDataSource,
-    Datex2MobilithekEonDriveDataSource,
-    Datex2MobilithekEonDriveRealtimeDataSource,
-    Datex2MobilithekGlsMobilityDataSource,
-    Datex2MobilithekGlsMobilityRealtimeDataSource,
-    Datex2AudiChargingHubDataSource,
-    Datex2AudiChargingHubRealtimeDataSource,
+    # "mobilithek_eliso": "evmap_backend.data_sources.eliso.source.ElisoDataSource",  # Eliso is already included in the Eco-Movement data
+    "mobilithek_ecomovement": "evmap_backend.data_sources.datex2.source.Datex2MobilithekEcoMovementDatex2DataSource",
+    "mobilithek_ecomovement_realtime": "evmap_backend.data_sources.datex2.source.Datex2MobilithekEcoMovementRealtimeDataSource",
+    "mobilithek_enbw": "evmap_backend.data_sources.datex2.source.Datex2MobilithekEnbwDataSource",
+    "mobilithek_enbw_realtime": "evmap_backend.data_sources.datex2.source.Datex2MobilithekEnbwRealtimeDataSource",
+    "mobilithek_ladenetz": "evmap_backend.data_sources.datex2.source.Datex2MobilithekLadenetzDataSource",
+    "mobilithek_ladenetz_realtime": "evmap_backend.data_sources.datex2.source.Datex2MobilithekLadenetzRealtimeDataSource",
+    "mobilithek_ladebusiness": "evmap_backend.data_sources.datex2.source.Datex2MobilithekLadebusinessDataSource",
+    "mobilithek_ladebusiness_realtime": "evmap_backend.data_sources.datex2.source.Datex2MobilithekLadebusinessRealtimeDataSource",
+    "mobilithek_ulm": "evmap_backend.data_sources.datex2.source.Datex2MobilithekUlmDataSource",
+    "mobilithek_ulm_realtime": "evmap_backend.data_sources.datex2.source.Datex2MobilithekUlmRealtimeDataSource",
+    "mobilithek_wirelane": "evmap_backend.data_sources.datex2.source.Datex2MobilithekWirelaneDataSource",
+    "mobilithek_wirelane_realtime": "evmap_backend.data_sources.datex2.source.Datex2MobilithekWirelaneRealtimeDataSource",
+    "mobilithek_tesla": "evmap_backend.data_sources.datex2.source.Datex2MobilithekTeslaDataSource",
+    "mobilithek_tesla_realtime": "evmap_backend.data_sources.datex2.source.Datex2MobilithekTeslaRealtimeDataSource",
+    "mobilithek_smatrics": "evmap_backend.data_sources.datex2.source.Datex2MobilithekSmatricsDataSource",
+    "mobilithek_smatrics_realtime": "evmap_backend.data_sources.datex2.source.Datex2MobilithekSmatricsRealtimeDataSource",
+    "mobilithek_chargecloud": "evmap_backend.data_sources.datex2.source.Datex2MobilithekChargecloudDataSource",
+    "mobilithek_chargecloud_realtime": "evmap_backend.data_sources.datex2.source.Datex2MobilithekChargecloudRealtimeDataSource",
+    "mobilithek_eulektro": "evmap_backend.data_sources.datex2.source.Datex2MobilithekEulektroDataSource",
+    "mobilithek_eulektro_realtime": "evmap_backend.data_sources.datex2.source.Datex2MobilithekEulektroRealtimeDataSource",
+    "mobilithek_eround": "evmap_backend.data_sources.datex2.source.Datex2MobilithekEroundDataSource",
+    "mobilithek_eround_realtime": "evmap_backend.data_sources.datex2.source.Datex2MobilithekEroundRealtimeDataSource",
+    "mobilithek_monta": "evmap_backend.data_sources.datex2.source.Datex2MobilithekMontaDataSource",
+    "mobilithek_monta_realtime": "evmap_backend.data_sources.datex2.source.Datex2MobilithekMontaRealtimeDataSource",
+    "mobilithek_gridandco": "evmap_backend.data_sources.datex2.source.Datex2MobilithekGridAndCoDataSource",
+    "mobilithek_gridandco_realtime": "evmap_backend.data_sources.datex2.source.Datex2MobilithekGridAndCoRealtimeDataSource",
+    # "mobilithek_enio": "evmap_backend.data_sources.datex2.source.Datex2MobilithekEnioDataSource",  # no data uploaded yet
+    "mobilithek_pump": "evmap_backend.data_sources.datex2.source.Datex2MobilithekPumpDataSource",
+    "mobilithek_m8mit": "evmap_backend.data_sources.datex2.source.Datex2MobilithekM8MitDataSource",
+    "mobilithek_m8mit_realtime": "evmap_backend.data_sources.datex2.source.Datex2MobilithekM8MitRealtimeDataSource",
+    "mobilithek_vaylens": "evmap_backend.data_sources.datex2.source.Datex2MobilithekVaylensDataSource",
+    "mobilithek_vaylens_realtime": "evmap_backend.data_sources.datex2.source.Datex2MobilithekVaylensRealtimeDataSource",
+    # "mobilithek_elumobility": "evmap_backend.data_sources.datex2.source.Datex2MobilithekEluMobilityDataSource",  # data not valid (missing coordinates)
+    # "mobilithek_elumobility_realtime": "evmap_backend.data_sources.datex2.source.Datex2MobilithekEluMobilityRealtimeDataSource",  # no data uploaded yet
+    "mobilithek_qwello": "evmap_backend.data_sources.datex2.source.Datex2MobilithekQwelloDataSource",
+    "mobilithek_qwello_realtime": "evmap_backend.data_sources.datex2.source.Datex2MobilithekQwelloRealtimeDataSource",
+    "mobilithek_eon_drive": "evmap_backend.data_sources.datex2.source.Datex2MobilithekEonDriveDataSource",
+    "mobilithek_eon_drive_realtime": "evmap_backend.data_sources.datex2.source.Datex2MobilithekEonDriveRealtimeDataSource",
+    "mobilithek_glsmobility": "evmap_backend.data_sources.datex2.source.Datex2MobilithekGlsMobilityDataSource",
+    "mobilithek_glsmobility_realtime": "evmap_backend.data_sources.datex2.source.Datex2MobilithekGlsMobilityRealtimeDataSource",
+    "audi_charging_hub": "evmap_backend.data_sources.datex2.source.Datex2AudiChargingHubDataSource",
+    "audi_charging_hub_realtime": "evmap_backend.data_sources.datex2.source.Datex2AudiChargingHubRealtimeDataSource",
     # Luxembourg
-    Datex2LuxembourgEcoMovementDataSource,
+    "luxembourg_ecomovement": "evmap_backend.data_sources.datex2.source.Datex2LuxembourgEcoMovementDataSource",
     # Netherlands
-    NdwNetherlandsOcpiDataSource,
+    "ndw_netherlands": "evmap_backend.data_sources.ocpi.source.NdwNetherlandsOcpiDataSource",
     # Sweden and Norway
-    NobilDataSource,
-    NobilRealtimeDataSource,
+    "nobil": "evmap_backend.data_sources.nobil.source.NobilDataSource",
+    "nobil_realtime": "evmap_backend.data_sources.nobil.source.NobilRealtimeDataSource",
     # United Kingdom
-    BpPulseUkOcpiDataSource,
-    BpPulseUkOcpiRealtimeDataSource,
-    IonityUkOcpiDataSource,
-    IonityUkOcpiRealtimeDataSource,
-    BlinkUkOcpiDataSource,
-    BlinkUkOcpiRealtimeDataSource,
-    EsbUkOcpiDataSource,
-    EsbUkOcpiRealtimeDataSource,
-    ShellRechargeUkOcpiDataSource,
-    ShellRechargeUkOcpiRealtimeDataSource,
-    CommunityByShellRechargeUkOcpiDataSource,
-    CommunityByShellRechargeUkOcpiRealtimeDataSource,
-    UbitricityUkOcpiDataSource,
-    UbitricityUkOcpiRealtimeDataSource,
-    RawChargingUkOcpiDataSource,
-    RawChargingUkOcpiRealtimeDataSource,
-    LidlUkOcpiDataSource,
-    LidlUkOcpiRealtimeDataSource,
-    EvPointUkOcpiDataSource,
-    EvPointUkOcpiRealtimeDataSource,
-    ChargePointUkOcpiDataSource,
-    ChargePointUkOcpiRealtimeDataSource,
-    ChargyUkOcpiDataSource,
-    MfgUkOcpiDataSource,
-    TeslaUkOcpiDataSource,
-    InstavoltUkOcpiDataSource,
-    GeniepointUkOcpiDataSource,
-    ClenergyUkOcpiDataSource,
-    GoZeroUkOcpiDataSource,
-    EvyeUkOcpiDataSource,
-    EvyeUkOcpiRealtimeDataSource,
-    SourceEvUkOcpiDataSource,
-    SourceEvUkOcpiRealtimeDataSource,
-    FastnedUkOcpiDataSource,
-    OspreyUkOcpiDataSource,
-    MerUkOcpiDataSource,
-    ScottishPowerUkOcpiDataSource,
+    "ecomovement_uk": "evmap_backend.data_sources.ocpi.source.EcoMovementUkOcpiDataSource",
+    "ecomovement_uk_realtime": "evmap_backend.data_sources.ocpi.source.EcoMovementUkOcpiRealtimeDataSource",
+    "bp_pulse_uk": "evmap_backend.data_sources.ocpi.source.BpPulseUkOcpiDataSource",
+    "bp_pulse_uk_realtime": "evmap_backend.data_sources.ocpi.source.BpPulseUkOcpiRealtimeDataSource",
+    "ionity_uk": "evmap_backend.data_sources.ocpi.source.IonityUkOcpiDataSource",
+    "ionity_uk_realtime": "evmap_backend.data_sources.ocpi.source.IonityUkOcpiRealtimeDataSource",
+    "blink_uk": "evmap_backend.data_sources.ocpi.source.BlinkUkOcpiDataSource",
+    "blink_uk_realtime": "evmap_backend.data_sources.ocpi.source.BlinkUkOcpiRealtimeDataSource",
+    "esb_uk": "evmap_backend.data_sources.ocpi.source.EsbUkOcpiDataSource",
+    "esb_uk_realtime": "evmap_backend.data_sources.ocpi.source.EsbUkOcpiRealtimeDataSource",
+    "shellrecharge_uk": "evmap_backend.data_sources.ocpi.source.ShellRechargeUkOcpiDataSource",
+    "shellrecharge_uk_realtime": "evmap_backend.data_sources.ocpi.source.ShellRechargeUkOcpiRealtimeDataSource",
+    "shellrecharge_community_uk": "evmap_backend.data_sources.ocpi.source.CommunityByShellRechargeUkOcpiDataSource",
+    "shellrecharge_community_uk_realtime": "evmap_backend.data_sources.ocpi.source.CommunityByShellRechargeUkOcpiRealtimeDataSource",
+    "ubitricity_uk": "evmap_backend.data_sources.ocpi.source.UbitricityUkOcpiDataSource",
+    "ubitricity_uk_realtime": "evmap_backend.data_sources.ocpi.source.UbitricityUkOcpiRealtimeDataSource",
+    "raw_charging_uk": "evmap_backend.data_sources.ocpi.source.RawChargingUkOcpiDataSource",
+    "raw_charging_uk_realtime": "evmap_backend.data_sources.ocpi.source.RawChargingUkOcpiRealtimeDataSource",
+    "lidl_uk": "evmap_backend.data_sources.ocpi.source.LidlUkOcpiDataSource",
+    "lidl_uk_realtime": "evmap_backend.data_sources.ocpi.source.LidlUkOcpiRealtimeDataSource",
+    "ev_point_uk": "evmap_backend.data_sources.ocpi.source.EvPointUkOcpiDataSource",
+    "ev_point_uk_realtime": "evmap_backend.data_sources.ocpi.source.EvPointUkOcpiRealtimeDataSource",
+    "chargepoint_uk": "evmap_backend.data_sources.ocpi.source.ChargePointUkOcpiDataSource",
+    "chargepoint_uk_realtime": "evmap_backend.data_sources.ocpi.source.ChargePointUkOcpiRealtimeDataSource",
+    "chargy_uk": "evmap_backend.data_sources.ocpi.source.ChargyUkOcpiDataSource",
+    "mfg_uk": "evmap_backend.data_sources.ocpi.source.MfgUkOcpiDataSource",
+    "tesla_uk": "evmap_backend.data_sources.ocpi.source.TeslaUkOcpiDataSource",
+    "instavolt_uk": "evmap_backend.data_sources.ocpi.source.InstavoltUkOcpiDataSource",
+    "geniepoint_uk": "evmap_backend.data_sources.ocpi.source.GeniepointUkOcpiDataSource",
+    "clenergy_uk": "evmap_backend.data_sources.ocpi.source.ClenergyUkOcpiDataSource",
+    "gozero_uk": "evmap_backend.data_sources.ocpi.source.GoZeroUkOcpiDataSource",
+    "evye_uk": "evmap_backend.data_sources.ocpi.source.EvyeUkOcpiDataSource",
+    "evye_uk_realtime": "evmap_backend.data_sources.ocpi.source.EvyeUkOcpiRealtimeDataSource",
+    "source_ev_uk": "evmap_backend.data_sources.ocpi.source.SourceEvUkOcpiDataSource",
+    "source_ev_uk_realtime": "evmap_backend.data_sources.ocpi.source.SourceEvUkOcpiRealtimeDataSource",
+    "fastned_uk": "evmap_backend.data_sources.ocpi.source.FastnedUkOcpiDataSource",
+    "osprey_uk": "evmap_backend.data_sources.ocpi.source.OspreyUkOcpiDataSource",
+    "mer_uk": "evmap_backend.data_sources.ocpi.source.MerUkOcpiDataSource",
+    "scottish_power_uk": "evmap_backend.data_sources.ocpi.source.ScottishPowerUkOcpiDataSource",
     # Latvia
-    Datex2LatviaEcoMovementDataSource,
-    Datex2LatviaEcoMovementRealtimeDataSource,
+    "latvia_ecomovement": "evmap_backend.data_sources.datex2.source.Datex2LatviaEcoMovementDataSource",
+    "latvia_ecomovement_realtime": "evmap_backend.data_sources.datex2.source.Datex2LatviaEcoMovementRealtimeDataSource",
     # Lithuania
-    # LithuaniaOcpiDataSource,  # Data is malformed (duplicate IDs)
+    # "lithuania": "evmap_backend.data_sources.ocpi.source.LithuaniaOcpiDataSource",  # Data is malformed (duplicate IDs)
     # Slovenia
-    Datex2SloveniaDataSource,
-    Datex2SloveniaRealtimeDataSource,
+    "slovenia": "evmap_backend.data_sources.datex2.source.Datex2SloveniaDataSource",
+    "slovenia_realtime": "evmap_backend.data_sources.datex2.source.Datex2SloveniaRealtimeDataSource",
     # Denmark
-    Datex2DenmarkEcoMovementDataSource,
-    Datex2DenmarkMontaDataSource,
+    "denmark_ecomovement": "evmap_backend.data_sources.datex2.source.Datex2DenmarkEcoMovementDataSource",
+    "denmark_monta": "evmap_backend.data_sources.datex2.source.Datex2DenmarkMontaDataSource",
     # Belgium
-    Datex2BelgiumEcoMovementDataSource,
-    Datex2BelgiumMontaDataSource,
-    RoadBelgiumOcpiDataSource,
-    TeslaBelgiumOcpiDataSource,
+    "belgium_ecomovement": "evmap_backend.data_sources.datex2.source.Datex2BelgiumEcoMovementDataSource",
+    "belgium_monta": "evmap_backend.data_sources.datex2.source.Datex2BelgiumMontaDataSource",
+    "road_belgium": "evmap_backend.data_sources.ocpi.source.RoadBelgiumOcpiDataSource",
+    "tesla_belgium": "evmap_backend.data_sources.ocpi.source.TeslaBelgiumOcpiDataSource",
     # Switzerland
-    OpendataSwissDataSource,
-    OpendataSwissRealtimeDataSource,
+    "opendata_swiss": "evmap_backend.data_sources.opendata_swiss.source.OpendataSwissDataSource",
+    "opendata_swiss_realtime": "evmap_backend.data_sources.opendata_swiss.source.OpendataSwissRealtimeDataSource",
     # Finland
-    Datex2FinlandDataSource,
-    FintrafficRealtimeDataSource,
+    "fintraffic": "evmap_backend.data_sources.datex2.source.Datex2FinlandDataSource",
+    "fintraffic_realtime": "evmap_backend.data_sources.fintraffic.source.FintrafficRealtimeDataSource",
     # Spain
-    Datex2SpainDataSource,
+    "spain": "evmap_backend.data_sources.datex2.source.Datex2SpainDataSource",
     # France
-    IrveFranceDataSource,
-]
-DATA_SOURCE_REGISTRY: Dict[str, Type[DataSource]] = {
-    cls.id: cls for cls in DATA_SOURCE_CLASSES
+    "irve_france": "evmap_backend.data_sources.irve.source.IrveFranceDataSource",
 }
 
 
+@cache
+def get_data_source_class(source_id: str) -> Type[DataSource]:
+    """Get a data source class by ID, importing its module on first use"""
+    if source_id not in DATA_SOURCES:
+        raise ValueError(
+            f"Unknown data source: {source_id}. Available sources: {', '.join(DATA_SOURCES.keys())}"
+        )
+
+    cls = import_string(DATA_SOURCES[source_id])
+    if cls.id != source_id:
+        raise ValueError(f"Data source {DATA_SOURCES[source_id]} has ID {cls.id}")
+    return cls
+
+
+def iter_data_source_classes() -> Iterator[Type[DataSource]]:
+    """Iterate over all data source classes. This imports all source modules."""
+    for source_id in DATA_SOURCES:
+        yield get_data_source_class(source_id)
+
+
 def setup_data_sources():
     """Perform initialization needed for all data sources"""
-    for source_id, source_class in DATA_SOURCE_REGISTRY.items():
+    for source_class in iter_data_source_classes():
         source_class().setup()
 
 
 def get_data_source(source_id: str) -> DataSource:
     """Get a data source instance by ID"""
-    if source_id not in DATA_SOURCE_REGISTRY:
-        raise ValueError(
-            f"Unknown data source: {source_id}. Available sources: {', '.join(DATA_SOURCE_REGISTRY.keys())}"
-        )
-
-    return DATA_SOURCE_REGISTRY[source_id]()
+    return get_data_source_class(source_id)()
 
 
 def list_available_sources() -> List[str]:
     """List all available data source IDs"""
-    return list(DATA_SOURCE_REGISTRY.keys())
+    return list(DATA_SOURCES.keys())
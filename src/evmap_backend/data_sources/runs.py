@@ -0,0 +1,103 @@
+"""
+History of sync runs.
+
+Each pull and push is recorded as a SyncRun by running it within track_run. The sync
+functions report their row counts, bytes downloaded and database time through
+record_run_stats and db_timer, which add to the run tracked in the current context,
+if any. Everything outside of database writes is counted as parse time.
+
+Streaming sources write statuses continuously, so StatusWriter records one SyncRun
+per source for each window in which it saves the source's UpdateState.
+"""
+
+import logging
+import time
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from typing import Iterator, Optional
+
+from django.db import DatabaseError
+from django.utils import timezone
+
+from evmap_backend.data_sources.models import SyncRun
+
+logger = logging.getLogger(__name__)
+
+# Runs older than this are deleted by prune_sync_runs
+SYNC_RUN_RETENTION = timedelta(days=90)
+
+_current: ContextVar[Optional[SyncRun]] = ContextVar("current_sync_run", default=None)
+
+
+def _reset_peak_rss():
+    # Linux only: reset the peak RSS of the process, so that each run reports its own
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def get_peak_rss() -> Optional[int]:
+    """Peak resident set size of the process in bytes, if available (Linux only)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def save_run(run: SyncRun):
+    """Save a run without raising, so that it never hides the result of the sync."""
+    try:
+        run.save()
+    except DatabaseError:
+        logger.exception("Failed to save sync run for %s", run.data_source)
+
+
+@contextmanager
+def track_run(data_source: str, kind: SyncRun.Kind) -> Iterator[SyncRun]:
+    """
+    Record the block as a SyncRun of the given data source. If the block raises an
+    exception, it is stored in the run and re-raised.
+    """
+    run = SyncRun(data_source=data_source, kind=kind, started_at=timezone.now())
+    token = _current.set(run)
+    _reset_peak_rss()
+    start = time.monotonic()
+    try:
+        yield run
+    except Exception as e:
+        run.error = "".join(traceback.format_exception_only(e)).strip()
+        raise
+    finally:
+        _current.reset(token)
+        run.finished_at = timezone.now()
+        run.duration = time.monotonic() - start
+        run.parse_time = max(run.duration - run.db_time, 0)
+        run.peak_rss = get_peak_rss()
+        save_run(run)
+
+
+def record_run_stats(**counts: float):
+    """Add to the counters of the current run, e.g. record_run_stats(sites_created=1)."""
+    run = _current.get()
+    if run is None:
+        return
+    for field, value in counts.items():
+        setattr(run, field, getattr(run, field) + value)
+
+
+@contextmanager
+def db_timer():
+    """Count the duration of the block as database time of the current run."""
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        record_run_stats(db_time=time.monotonic() - start)
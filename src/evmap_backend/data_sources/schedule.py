@@ -0,0 +1,76 @@
+"""
+Adaptive sync intervals of PULL data sources.
+
+Celery beat triggers each source at its min_sync_interval, and pull_data_source skips
+the run unless the effective interval stored in the source's UpdateState has passed
+since the last pull. After each pull, the effective interval is halved if the pull
+changed a large share of the sites and statuses in the feed, extended by half if it
+changed few or none of them, and kept otherwise, within the bounds of
+min_sync_interval and max_sync_interval. As the share of changes grows with the
+interval, a feed with a steady rate of changes settles at an interval in between,
+while a large feed with only a trickle of changes is not pulled more often just
+because every pull sees a few of them.
+
+The numbers of changed and processed records are taken from the SyncRun recorded for
+the pull.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from evmap_backend.data_sources.models import UpdateState
+
+BACKOFF_FACTOR = 1.5
+SPEEDUP_FACTOR = 0.5
+# Share of the processed records changed by a pull above which the interval is
+# shortened, and below which it is extended
+SPEEDUP_CHANGE_SHARE = 0.01
+BACKOFF_CHANGE_SHARE = 0.001
+
+
+def next_sync_interval(
+    current: timedelta,
+    changes: int,
+    processed: int,
+    min_interval: timedelta,
+    max_interval: timedelta,
+) -> timedelta:
+    """Adapt the sync interval to the share of records changed by the last pull."""
+    share = changes / processed if processed else 0
+    if share >= SPEEDUP_CHANGE_SHARE:
+        interval = current * SPEEDUP_FACTOR
+    elif share < BACKOFF_CHANGE_SHARE:
+        interval = current * BACKOFF_FACTOR
+    else:
+        interval = current
+    return min(max(interval, min_interval), max_interval)
+
+
+def is_due(source, state: Optional[UpdateState], now: datetime) -> bool:
+    """Check whether the effective sync interval of a source has passed."""
+    if state is None or state.sync_interval is None:
+        return True
+    # beat only triggers the pull every min_sync_interval, so a run that is due
+    # slightly later would otherwise be delayed by a whole min_sync_interval
+    tolerance = source.min_sync_interval / 2
+    return now - state.last_update >= state.sync_interval - tolerance
+
+
+def record_pull(source, changes: int, processed: int):
+    """Store the result of a successful pull and adapt the source's sync interval."""
+    state = UpdateState.objects.filter(data_source=source.id).first()
+    if state is None:
+        state = UpdateState(data_source=source.id)
+    state.push = False
+    state.last_changes = changes
+    state.unchanged_pulls = 0 if changes else state.unchanged_pulls + 1
+    current = state.sync_interval or source.sync_interval
+    if current is not None:
+        state.sync_interval = next_sync_interval(
+            current,
+            changes,
+            processed,
+            source.min_sync_interval,
+            source.max_sync_interval,
+        )
+    state.save()
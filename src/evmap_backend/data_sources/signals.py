@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent by sync_chargers within its transaction, with the arguments data_source and
+# site_ids: the set of IDs of all ChargingSites that were created, changed or deleted.
+sites_changed = Signal()
@@ -0,0 +1,478 @@
+"""
+Helpers for STREAMING data sources, which receive individual status updates over a
+long-lived connection (MQTT, websockets) instead of pulling complete snapshots.
+
+Message handlers should not touch the database: chargepoints are resolved using an
+in-memory ChargepointIndex, unchanged statuses are suppressed using the last known
+status per chargepoint, and new statuses are handed to a StatusWriter, which writes
+them in batches from a background thread. The writer records one SyncRun per source
+for each window in which it saves the source's UpdateState, including the number of
+suppressed statuses.
+
+All streaming sources are hosted in a single asyncio event loop by
+run_streaming_sources, which reconnects each source independently with exponential
+backoff and shares one StatusWriter between them.
+"""
+
+import asyncio
+import logging
+import queue
+import random
+import threading
+import time
+from abc import abstractmethod
+from collections import defaultdict
+from datetime import timedelta
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import pgbulk
+from django.db import IntegrityError, close_old_connections
+from django.utils import timezone
+
+from evmap_backend.chargers.models import Chargepoint
+from evmap_backend.data_sources import DataSource, DataType, UpdateMethod
+from evmap_backend.data_sources.models import SyncRun, UpdateState
+from evmap_backend.data_sources.runs import get_peak_rss, save_run
+from evmap_backend.helpers import metrics
+from evmap_backend.helpers.database import distinct_on
+from evmap_backend.realtime.models import RealtimeStatus
+
+logger = logging.getLogger(__name__)
+
+
+class ChargepointIndex:
+    """
+    In-memory mapping from a source-specific key (e.g. the EVSEID) to Chargepoint IDs.
+
+    The mapping is loaded once on start and then refreshed periodically from a
+    background thread, so that chargepoints added by the static data source are picked
+    up without blocking the thread that handles incoming messages.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[], Iterable[Tuple[Hashable, int]]],
+        refresh_interval: timedelta = timedelta(minutes=15),
+    ):
+        self._load = load
+        self._refresh_interval = refresh_interval
+        self._map: Dict[Hashable, int] = {}
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self):
+        try:
+            # build a new dict and swap it in, so readers never see a partial mapping
+            self._map = dict(self._load())
+        finally:
+            close_old_connections()
+        logger.debug("Loaded %d chargepoints into index", len(self._map))
+
+    def start(self):
+        self.refresh()
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="ChargepointIndex", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(self._refresh_interval.total_seconds()):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh chargepoint index")
+
+    def get(self, key: Hashable) -> Optional[int]:
+        return self._map.get(key)
+
+    def __len__(self):
+        return len(self._map)
+
+
+def load_latest_statuses(data_source: str) -> Dict[int, str]:
+    """Return the latest status per chargepoint ID for a realtime data source."""
+    try:
+        return dict(
+            distinct_on(
+                RealtimeStatus.objects.filter(data_source=data_source),
+                distinct_fields=["chargepoint_id"],
+                order_field="timestamp",
+            ).values_list("chargepoint_id", "status")
+        )
+    finally:
+        close_old_connections()
+
+
+class StatusWriter:
+    """
+    Writes RealtimeStatus objects to the database in batches from a background thread.
+
+    put() never blocks: if the queue is full (e.g. because the database is slow or
+    unavailable), the status is dropped and counted in the metrics. Statuses that fail
+    to be written are passed to the failure handler registered for their source.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+        max_queue_size: int = 100_000,
+        update_state_interval: float = 60.0,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.update_state_interval = update_state_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._update_state_saved: Dict[str, float] = {}
+        self._runs: Dict[str, SyncRun] = {}
+        self._failure_handlers: Dict[str, Callable[[List[RealtimeStatus]], None]] = {}
+        self._suppressed: Dict[str, int] = defaultdict(int)
+        self._suppressed_lock = threading.Lock()
+
+    def on_failure(
+        self, data_source: str, handler: Callable[[List[RealtimeStatus]], None]
+    ):
+        """Register a handler called with the statuses of a source that failed to be
+        written. It runs in the writer thread."""
+        self._failure_handlers[data_source] = handler
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="StatusWriter", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Flush all pending statuses and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def put(self, status: RealtimeStatus) -> bool:
+        try:
+            self._queue.put_nowait(status)
+        except queue.Full:
+            metrics.incr(f"streaming.{status.data_source}.dropped")
+            return False
+        return True
+
+    def record_suppressed(self, data_source: str):
+        """Count a status that was not written because it did not change."""
+        with self._suppressed_lock:
+            self._suppressed[data_source] += 1
+
+    @property
+    def queue_size(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            if stopping:
+                # drain what is left without waiting
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not self._STOP:
+                        batch.append(item)
+
+            suppressed = self._drain_suppressed()
+            if batch:
+                self._flush(batch)
+            if suppressed:
+                # sources that only sent unchanged statuses are still up to date
+                try:
+                    close_old_connections()
+                    self._save_update_states(suppressed)
+                except Exception:
+                    logger.exception("Failed to save update states")
+            metrics.gauge("streaming.queue_size", self.queue_size)
+
+        self._drain_suppressed()
+        for data_source in list(self._runs):
+            self._save_run(data_source)
+
+    def _drain_suppressed(self) -> Set[str]:
+        """Add the suppressed statuses counted since the last call to the runs of their
+        sources, and return those sources."""
+        with self._suppressed_lock:
+            counts, self._suppressed = self._suppressed, defaultdict(int)
+        for data_source, count in counts.items():
+            self._get_run(data_source).statuses_suppressed += count
+        return set(counts)
+
+    def _get_run(self, data_source: str) -> SyncRun:
+        run = self._runs.get(data_source)
+        if run is None:
+            run = SyncRun(
+                data_source=data_source,
+                kind=SyncRun.Kind.STREAM,
+                started_at=timezone.now(),
+            )
+            self._runs[data_source] = run
+        return run
+
+    def _save_run(self, data_source: str):
+        run = self._runs.pop(data_source)
+        run.finished_at = timezone.now()
+        run.duration = (run.finished_at - run.started_at).total_seconds()
+        run.peak_rss = get_peak_rss()
+        save_run(run)
+
+    def _flush(self, batch: List[RealtimeStatus]):
+        close_old_connections()
+        start = time.monotonic()
+        try:
+            try:
+                pgbulk.copy(RealtimeStatus, batch)
+            except IntegrityError:
+                # chargepoints may have been deleted by a static sync in the meantime
+                existing = set(
+                    Chargepoint.objects.filter(
+                        id__in={s.chargepoint_id for s in batch}
+                    ).values_list("id", flat=True)
+                )
+                batch = [s for s in batch if s.chargepoint_id in existing]
+                if not batch:
+                    return
+                pgbulk.copy(RealtimeStatus, batch)
+
+            # the database time of the batch is split among its sources
+            db_time = (time.monotonic() - start) / len(batch)
+            for status in batch:
+                metrics.incr(f"streaming.{status.data_source}.written")
+                run = self._get_run(status.data_source)
+                run.statuses_created += 1
+                run.db_time += db_time
+            self._save_update_states({s.data_source for s in batch})
+        except Exception as e:
+            logger.exception("Failed to write %d statuses", len(batch))
+            metrics.incr("streaming.write_errors")
+            failed = defaultdict(list)
+            for status in batch:
+                failed[status.data_source].append(status)
+            for data_source, statuses in failed.items():
+                self._get_run(data_source).error = str(e)
+                handler = self._failure_handlers.get(data_source)
+                if handler is not None:
+                    handler(statuses)
+
+    def _save_update_states(self, data_sources: Iterable[str]):
+        now = time.monotonic()
+        for data_source in data_sources:
+            last_saved = self._update_state_saved.get(data_source)
+            if last_saved is None or now - last_saved > self.update_state_interval:
+                # save the update state, but only once per minute
+                UpdateState.objects.update_or_create(
+                    data_source=data_source, defaults={"push": True}
+                )
+                self._update_state_saved[data_source] = now
+                self._save_run(data_source)
+
+
+class BaseStreamingDataSource(DataSource):
+    """
+    Base class for realtime data sources that receive status updates over a
+    long-lived connection.
+
+    Subclasses implement _load_chargepoints to build the ChargepointIndex and connect,
+    which runs a single connection until it is closed or fails. Incoming messages
+    should be passed to _handle_status. Reconnecting is taken care of by
+    run_streaming_sources.
+    """
+
+    supported_data_types = [DataType.DYNAMIC]
+    supported_update_methods = [UpdateMethod.STREAMING]
+
+    def __init__(self):
+        self.chargepoints = ChargepointIndex(self._load_chargepoints)
+        self.latest_statuses: Dict[int, str] = {}
+        self.writer: Optional[StatusWriter] = None
+        self.last_message: Optional[float] = None
+
+    @abstractmethod
+    def _load_chargepoints(self) -> Iterable[Tuple[Hashable, int]]:
+        """Return (key, chargepoint ID) pairs for the ChargepointIndex."""
+        pass
+
+    @abstractmethod
+    async def connect(self):
+        """Receive messages until the connection is closed."""
+        pass
+
+    def start_streaming(self, writer: "StatusWriter"):
+        """Load the chargepoint index and latest statuses. Called once on startup."""
+        self.writer = writer
+        writer.on_failure(self.id, self._forget_statuses)
+        self.chargepoints.start()
+        self.latest_statuses = load_latest_statuses(self.id)
+
+    def stop_streaming(self):
+        self.chargepoints.stop()
+
+    def _handle_status(self, key: Hashable, status_name: str):
+        self.last_message = time.monotonic()
+        metrics.incr(f"streaming.{self.id}.received")
+
+        chargepoint_id = self.chargepoints.get(key)
+        if chargepoint_id is None:
+            logger.debug(f"ignoring update, chargepoint {key} does not exist")
+            metrics.incr(f"streaming.{self.id}.ignored_unknown")
+            return
+
+        try:
+            status = RealtimeStatus.Status[status_name]
+        except KeyError:
+            logger.warning(f"ignoring update with invalid status: {status_name}")
+            metrics.incr(f"streaming.{self.id}.ignored_invalid")
+            return
+
+        if self.latest_statuses.get(chargepoint_id) == status:
+            logger.debug("ignoring update, no change")
+            metrics.incr(f"streaming.{self.id}.ignored_unchanged")
+            self.writer.record_suppressed(self.id)
+            return
+
+        queued = self.writer.put(
+            RealtimeStatus(
+                chargepoint_id=chargepoint_id,
+                status=status,
+                data_source=self.id,
+                license_attribution=self.license_attribution,
+                license_attribution_link=self.license_attribution_link,
+                timestamp=timezone.now(),
+            )
+        )
+        # a dropped status must not suppress its repetitions
+        if queued:
+            self.latest_statuses[chargepoint_id] = status
+
+    def _forget_statuses(self, statuses: List[RealtimeStatus]):
+        """Remove statuses that failed to be written from the latest statuses, so that
+        they are written again when they are repeated."""
+        for status in statuses:
+            if self.latest_statuses.get(status.chargepoint_id) == status.status:
+                self.latest_statuses.pop(status.chargepoint_id, None)
+
+    def stream_data(self):
+        asyncio.run(run_streaming_sources([self]))
+
+
+async def _run_with_reconnect(
+    source: BaseStreamingDataSource,
+    stale_timeout: float,
+    min_backoff: float,
+    max_backoff: float,
+):
+    backoff = min_backoff
+    while True:
+        started = time.monotonic()
+        task = asyncio.create_task(source.connect())
+        try:
+            # watchdog: reconnect if the connection stays open but no messages arrive
+            while not task.done():
+                await asyncio.wait({task}, timeout=min(stale_timeout, 30))
+                last = source.last_message or started
+                if not task.done() and time.monotonic() - last > stale_timeout:
+                    logger.warning(
+                        f"{source.id}: no messages for {stale_timeout:.0f}s, reconnecting"
+                    )
+                    task.cancel()
+                    await asyncio.wait({task})
+            if not task.cancelled() and task.exception() is not None:
+                exc = task.exception()
+                logger.error(f"{source.id}: connection failed", exc_info=exc)
+            else:
+                logger.info(f"{source.id}: connection closed")
+        finally:
+            if not task.done():
+                task.cancel()
+
+        metrics.incr(f"streaming.{source.id}.reconnects")
+        if source.last_message is not None and source.last_message > started:
+            # the connection was working, so start over with the minimum backoff
+            backoff = min_backoff
+        delay = backoff * random.uniform(0.5, 1.0)
+        logger.info(f"{source.id}: reconnecting in {delay:.1f}s")
+        await asyncio.sleep(delay)
+        backoff = min(backoff * 2, max_backoff)
+
+
+async def _report_health(
+    sources: List[BaseStreamingDataSource], writer: StatusWriter, interval: float
+):
+    while True:
+        await asyncio.sleep(interval)
+        now = time.monotonic()
+        for source in sources:
+            if source.last_message is None:
+                logger.info(f"{source.id}: no messages received yet")
+            else:
+                lag = now - source.last_message
+                metrics.gauge(f"streaming.{source.id}.seconds_since_message", lag)
+                logger.info(
+                    f"{source.id}: last message {lag:.0f}s ago, "
+                    f"{len(source.chargepoints)} chargepoints indexed"
+                )
+        metrics.gauge("streaming.queue_size", writer.queue_size)
+        metrics.log_metrics("streaming.")
+
+
+async def run_streaming_sources(
+    sources: List[BaseStreamingDataSource],
+    stale_timeout: float = 300,
+    min_backoff: float = 1,
+    max_backoff: float = 300,
+    health_interval: float = 60,
+):
+    """
+    Run the given streaming data sources in the current event loop until cancelled.
+
+    Each source runs its own connection, which is reestablished with exponential
+    backoff whenever it fails, is closed or has not received any messages for
+    stale_timeout seconds. All sources share one StatusWriter.
+    """
+    writer = StatusWriter()
+    writer.start()
+    started = []
+    try:
+        for source in sources:
+            await asyncio.to_thread(source.start_streaming, writer)
+            started.append(source)
+
+        async with asyncio.TaskGroup() as tg:
+            for source in sources:
+                tg.create_task(
+                    _run_with_reconnect(source, stale_timeout, min_backoff, max_backoff)
+                )
+            tg.create_task(_report_health(sources, writer, health_interval))
+    finally:
+        for source in started:
+            source.stop_streaming()
+        await asyncio.to_thread(writer.stop)
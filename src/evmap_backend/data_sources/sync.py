@@ -1,40 +1,160 @@
+import datetime
 import logging
 from collections import defaultdict
 from dataclasses import dataclass
 from itertools import batched
-from typing import Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 import pgbulk
+from django.contrib.gis.geos import Point
 from django.db import transaction
 from django.db.models import Q
 from django.forms import model_to_dict
 from tqdm import tqdm
 
-from evmap_backend.chargers.models import Chargepoint, ChargingSite, Connector
+from evmap_backend.chargers.fields import normalize_evseid
+from evmap_backend.chargers.models import Chargepoint, ChargingSite, Connector, Network
+from evmap_backend.countries.resolver import get_country_resolver
+from evmap_backend.data_sources.runs import db_timer, record_run_stats
+from evmap_backend.data_sources.signals import sites_changed
 from evmap_backend.helpers.database import distinct_on
 from evmap_backend.realtime.models import RealtimeStatus
 
+# Parsers emit the following slotted records instead of Django model instances. They
+# only hold the field values, and are converted to model instances batch by batch in
+# sync_chargers and sync_statuses, right before they are written.
+
+
+@dataclass(slots=True)
+class SiteRecord:
+    id_from_source: str
+    name: str
+    location: Tuple[float, float]
+    """(longitude, latitude) in WGS84"""
+    data_source: str = ""
+    site_evseid: str = ""
+    street: str = ""
+    zipcode: str = ""
+    city: str = ""
+    country: str = ""
+    operator: str = ""
+    opening_hours: str = ""
+    license_attribution: str = ""
+    license_attribution_link: str = ""
+
+    def to_model(self) -> ChargingSite:
+        return ChargingSite(
+            id_from_source=self.id_from_source,
+            name=self.name,
+            location=Point(*self.location),
+            data_source=self.data_source,
+            site_evseid=self.site_evseid,
+            street=self.street,
+            zipcode=self.zipcode,
+            city=self.city,
+            country=self.country,
+            operator=self.operator,
+            opening_hours=self.opening_hours,
+            license_attribution=self.license_attribution,
+            license_attribution_link=self.license_attribution_link,
+        )
+
+
+@dataclass(slots=True)
+class ChargepointRecord:
+    id_from_source: str
+    evseid: str = ""
+    physical_reference: str = ""
+
+    def to_model(self) -> Chargepoint:
+        return Chargepoint(
+            id_from_source=self.id_from_source,
+            evseid=self.evseid,
+            physical_reference=self.physical_reference,
+        )
+
+
+@dataclass(slots=True)
+class ConnectorRecord:
+    connector_type: str
+    max_power: float
+    connector_format: str = ""
+    id_from_source: Optional[str] = None
+
+    def to_model(self) -> Connector:
+        return Connector(
+            connector_type=self.connector_type,
+            max_power=self.max_power,
+            connector_format=self.connector_format,
+            id_from_source=self.id_from_source,
+        )
+
+
+@dataclass(slots=True)
+class StatusRecord:
+    status: str
+    timestamp: datetime.datetime
+    data_source: str = ""
+    license_attribution: str = ""
+    license_attribution_link: str = ""
+
+    def to_model(self) -> RealtimeStatus:
+        return RealtimeStatus(
+            status=self.status,
+            timestamp=self.timestamp,
+            data_source=self.data_source,
+            license_attribution=self.license_attribution,
+            license_attribution_link=self.license_attribution_link,
+        )
+
+
+_RECORD_TYPES = (SiteRecord, ChargepointRecord, ConnectorRecord, StatusRecord)
 
-@dataclass
+
+def _to_model(obj):
+    """Convert a record to a model instance. Model instances are returned as is."""
+    return obj.to_model() if isinstance(obj, _RECORD_TYPES) else obj
+
+
+# The item classes group the records of a site. For compatibility, they may also hold
+# model instances instead of records.
+
+
+@dataclass(slots=True)
 class ChargepointItem:
-    chargepoint: Chargepoint
-    connectors: List[Connector]
-    status: Optional[RealtimeStatus] = None
+    chargepoint: ChargepointRecord | Chargepoint
+    connectors: List[ConnectorRecord | Connector]
+    status: Optional[StatusRecord | RealtimeStatus] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ChargingSiteItem:
-    site: ChargingSite
+    site: SiteRecord | ChargingSite
     chargepoints: List[ChargepointItem]
+    network_operator_id: Optional[str] = None
+    """EVSE operator ID of the site's network, resolved to a Network during sync"""
+    network_name: str = ""
+    """Name used if the network does not exist yet"""
 
 
-@dataclass
+@dataclass(slots=True)
 class RealtimeStatusItem:
     chargepoint_id_from_source: str
-    status: RealtimeStatus
+    status: StatusRecord | RealtimeStatus
     site_id_from_source: Optional[str] = None
 
 
+def to_models(item: ChargingSiteItem) -> ChargingSiteItem:
+    """Replace the records of a site item with model instances, in place."""
+    item.site = _to_model(item.site)
+    for cp_item in item.chargepoints:
+        cp_item.chargepoint = _to_model(cp_item.chargepoint)
+        cp_item.connectors = [_to_model(con) for con in cp_item.connectors]
+        if cp_item.status is not None:
+            cp_item.status = _to_model(cp_item.status)
+    return item
+
+
 def _get_update_fields(model, exclude_fields):
     """Get all updatable field names for a model, excluding specified fields."""
     return [
@@ -54,7 +174,14 @@ def _get_cached_update_fields():
     global SITE_UPDATE_FIELDS, CP_UPDATE_FIELDS, CONN_UPDATE_FIELDS
     if SITE_UPDATE_FIELDS is None:
         SITE_UPDATE_FIELDS = _get_update_fields(
-            ChargingSite, {"id", "data_source", "id_from_source", "location_mercator"}
+            ChargingSite,
+            {
+                "id",
+                "data_source",
+                "id_from_source",
+                "location_mercator",
+                "duplicate_of",
+            },
         )
         CP_UPDATE_FIELDS = _get_update_fields(
             Chargepoint, {"id", "site", "id_from_source"}
@@ -70,25 +197,34 @@ def _sync_batch(
     batch: Tuple[ChargingSiteItem, ...],
     seen_site_ids: set,
     existing_site_ids: set,
+    network_ids: Dict[str, int],
+    changed_site_ids: set,
 ) -> int:
     """
     Sync a batch of sites with their chargepoints and connectors using pgbulk.upsert.
-    Returns the number of sites created in this batch.
+    Returns the number of sites created in this batch. The IDs of sites that were
+    created or whose data, chargepoints or connectors changed are added to
+    changed_site_ids.
     """
     site_fields, cp_fields, conn_fields = _get_cached_update_fields()
 
     # Prepare sites
     for item in batch:
+        to_models(item)
         item.site.data_source = data_source
+    _resolve_missing_countries([item.site for item in batch])
+    _resolve_networks(batch, network_ids)
 
     # Upsert sites
-    pgbulk.upsert(
+    result = pgbulk.upsert(
         ChargingSite,
         [item.site for item in batch],
         ["data_source", "id_from_source"],
         site_fields,
+        returning=["id"],
         ignore_unchanged=True,
     )
+    changed_site_ids.update(row.id for row in result)
 
     # Fetch IDs of the inserted sites
     source_ids = [item.site.id_from_source for item in batch]
@@ -113,13 +249,15 @@ def _sync_batch(
 
     if all_chargepoints:
         # Upsert chargepoints
-        pgbulk.upsert(
+        result = pgbulk.upsert(
             Chargepoint,
             all_chargepoints,
             ["site", "id_from_source"],
             cp_fields,
+            returning=["site_id"],
             ignore_unchanged=True,
         )
+        changed_site_ids.update(row.site_id for row in result)
 
         # Fetch ID mapping
         cp_qs = Chargepoint.objects.filter(site_id__in=batch_site_ids).values_list(
@@ -132,32 +270,99 @@ def _sync_batch(
         # Delete chargepoints not in input
         expected_keys = {(cp.site_id, cp.id_from_source) for cp in all_chargepoints}
         batch_cp_ids = [cp_map[k] for k in expected_keys if k in cp_map]
-        Chargepoint.objects.filter(site_id__in=batch_site_ids).exclude(
-            id__in=batch_cp_ids
-        ).delete()
+        _delete_chargepoints(
+            Chargepoint.objects.filter(site_id__in=batch_site_ids).exclude(
+                id__in=batch_cp_ids
+            ),
+            changed_site_ids,
+        )
 
         # Process connectors
-        _sync_connectors(
+        changed_cp_ids = _sync_connectors(
             all_chargepoints,
             cp_connectors,
             cp_map,
             batch_cp_ids,
             conn_fields,
         )
+        site_by_cp = {id: site_id for (site_id, _), id in cp_map.items()}
+        changed_site_ids.update(site_by_cp[cp_id] for cp_id in changed_cp_ids)
     else:
         # No chargepoints — delete all existing ones for these sites
-        Chargepoint.objects.filter(site_id__in=batch_site_ids).delete()
+        _delete_chargepoints(
+            Chargepoint.objects.filter(site_id__in=batch_site_ids), changed_site_ids
+        )
 
     return sites_created
 
 
+def _delete_chargepoints(queryset, changed_site_ids: set):
+    """Delete chargepoints, adding the IDs of the affected sites to changed_site_ids."""
+    changed_site_ids.update(queryset.values_list("site_id", flat=True).distinct())
+    queryset.delete()
+
+
+def _resolve_networks(batch: Tuple[ChargingSiteItem, ...], network_ids: Dict[str, int]):
+    """
+    Assign the networks of a batch of sites, creating missing networks in bulk.
+
+    network_ids maps EVSE operator IDs to Network IDs. It is only valid within the
+    transaction of a single sync run, so that networks deleted in the meantime are
+    never assigned to new sites.
+    """
+    # operator IDs are stored normalized, so they are looked up normalized as well
+    operator_ids = [
+        normalize_evseid(item.network_operator_id) if item.network_operator_id else ""
+        for item in batch
+    ]
+    names = {}
+    for item, operator_id in zip(batch, operator_ids):
+        if operator_id and operator_id not in network_ids:
+            names.setdefault(operator_id, item.network_name)
+
+    if names:
+        network_ids.update(
+            Network.objects.filter(evse_operator_id__in=names).values_list(
+                "evse_operator_id", "id"
+            )
+        )
+        missing = [
+            Network(evse_operator_id=operator_id, name=name)
+            for operator_id, name in names.items()
+            if operator_id not in network_ids
+        ]
+        if missing:
+            # networks may be created concurrently by other syncs
+            Network.objects.bulk_create(missing, ignore_conflicts=True)
+            network_ids.update(
+                Network.objects.filter(
+                    evse_operator_id__in=[n.evse_operator_id for n in missing]
+                ).values_list("evse_operator_id", "id")
+            )
+
+    for item, operator_id in zip(batch, operator_ids):
+        if operator_id:
+            item.site.network_id = network_ids[operator_id]
+
+
+def _resolve_missing_countries(sites: List[ChargingSite]):
+    """Fill in the country of sites where the data source did not provide one."""
+    missing = [site for site in sites if not site.country]
+    if not missing:
+        return
+    countries = get_country_resolver().resolve_many([site.location for site in missing])
+    for site, country in zip(missing, countries):
+        if country is not None:
+            site.country = country
+
+
 def _sync_connectors(
     original_cps: List[Chargepoint],
     cp_connectors: List[List[Connector]],
     cp_map: dict,
     batch_cp_ids: List[int],
     conn_update_fields: List[str],
-):
+) -> Set[int]:
     """
     Sync connectors for all chargepoints in the batch.
 
@@ -165,6 +370,8 @@ def _sync_connectors(
     Connectors without an id_from_source use a fallback: if the set of
     connectors hasn't changed, existing rows are kept; otherwise they are
     replaced wholesale.
+
+    Returns the IDs of the chargepoints whose connectors changed.
     """
     connectors_with_ids = []
     connectors_without_ids_data = []  # list of (resolved_cp, connectors)
@@ -181,14 +388,17 @@ def _sync_connectors(
 
     # Upsert connectors that have IDs
     upserted_connector_ids = set()
+    changed_cp_ids = set()
     if connectors_with_ids:
-        pgbulk.upsert(
+        result = pgbulk.upsert(
             Connector,
             connectors_with_ids,
             ["chargepoint", "id_from_source"],
             conn_update_fields,
+            returning=["chargepoint_id"],
             ignore_unchanged=True,
         )
+        changed_cp_ids.update(row.chargepoint_id for row in result)
 
         with_id_cp_ids = {con.chargepoint_id for con in connectors_with_ids}
         con_qs = Connector.objects.filter(
@@ -241,13 +451,16 @@ def _sync_connectors(
     if connectors_to_create:
         created = Connector.objects.bulk_create(connectors_to_create)
         keep_connector_ids.update(c.id for c in created)
+        changed_cp_ids.update(c.chargepoint_id for c in created)
 
     # Delete connectors not accounted for
     all_valid_ids = upserted_connector_ids | keep_connector_ids
     delete_qs = Connector.objects.filter(chargepoint_id__in=batch_cp_ids)
     if all_valid_ids:
         delete_qs = delete_qs.exclude(id__in=all_valid_ids)
+    changed_cp_ids.update(delete_qs.values_list("chargepoint_id", flat=True).distinct())
     delete_qs.delete()
+    return changed_cp_ids
 
 
 def _deduplicate_sites(
@@ -264,7 +477,7 @@ def _deduplicate_sites(
                 f"Duplicate site ID '{item.site.id_from_source}' — ignoring duplicate"
             )
             continue
-        if item.site.location.y in [-90.0, 90.0]:
+        if item.site.location[1] in [-90.0, 90.0]:
             logging.warning(
                 f"Site '{item.site.id_from_source}' with invalid location {item.site.location} — ignoring"
             )
@@ -282,6 +495,9 @@ def sync_chargers(
     Sync charging sites from a data source using pgbulk upsert.
     Processes sites in batches of 1000 for efficiency.
     Inline realtime statuses from ChargepointItems will also be synced, if existing.
+
+    Afterwards, sites_changed is sent with the IDs of all sites that were created,
+    changed or deleted.
     """
     with transaction.atomic():
         existing_site_ids = set(
@@ -290,6 +506,8 @@ def sync_chargers(
             )
         )
         seen_site_ids = set()
+        changed_site_ids = set()
+        network_ids = {}
         total_sites_created = 0
         total_statuses_created = 0
 
@@ -297,9 +515,15 @@ def sync_chargers(
         with tqdm(desc="Syncing sites", disable=None) as progress_bar:
             for batch in batched(_deduplicate_sites(sites), batch_size):
                 # sync charging sites + related chargepoints/connectors
-                created = _sync_batch(
-                    data_source, batch, seen_site_ids, existing_site_ids
-                )
+                with db_timer():
+                    created = _sync_batch(
+                        data_source,
+                        batch,
+                        seen_site_ids,
+                        existing_site_ids,
+                        network_ids,
+                        changed_site_ids,
+                    )
                 total_sites_created += created
 
                 # sync statuses
@@ -313,17 +537,34 @@ def sync_chargers(
                     for cp_item in item.chargepoints
                     if cp_item.status is not None
                 ]
-                total_statuses_created += _sync_statuses_batch(
-                    data_source, data_source, tuple(inline_statuses)
-                )
+                with db_timer():
+                    total_statuses_created += _sync_statuses_batch(
+                        data_source, data_source, tuple(inline_statuses)
+                    )
                 progress_bar.update(len(batch))
 
+        sites_changed_count = len(changed_site_ids)
+        record_run_stats(
+            sites_created=total_sites_created,
+            sites_updated=sites_changed_count - total_sites_created,
+            sites_unchanged=len(seen_site_ids) - sites_changed_count,
+        )
+
         # Delete sites that weren't in the input
         sites_to_delete = existing_site_ids - seen_site_ids
         total_sites_deleted = 0
         if sites_to_delete and delete_missing:
-            ChargingSite.objects.filter(id__in=sites_to_delete).delete()
+            with db_timer():
+                # duplicates of deleted sites need a new representative
+                changed_site_ids.update(
+                    ChargingSite.objects.filter(
+                        duplicate_of__in=sites_to_delete
+                    ).values_list("id", flat=True)
+                )
+                ChargingSite.objects.filter(id__in=sites_to_delete).delete()
             total_sites_deleted = len(sites_to_delete)
+            record_run_stats(sites_deleted=total_sites_deleted)
+            changed_site_ids |= sites_to_delete
 
         logging.info(
             f"{total_sites_created} sites created, {total_sites_deleted} sites deleted"
@@ -331,6 +572,13 @@ def sync_chargers(
         if total_statuses_created:
             logging.info(f"{total_statuses_created} statuses created")
 
+        if changed_site_ids:
+            sites_changed.send(
+                sender=sync_chargers,
+                data_source=data_source,
+                site_ids=changed_site_ids,
+            )
+
 
 def sync_statuses(
     realtime_data_source: str,
@@ -347,9 +595,10 @@ def sync_statuses(
     with transaction.atomic():
         with tqdm(desc="Syncing statuses", disable=None) as progress_bar:
             for batch in batched(statuses, batch_size):
-                statuses_created = _sync_statuses_batch(
-                    realtime_data_source, chargepoint_data_source, batch
-                )
+                with db_timer():
+                    statuses_created = _sync_statuses_batch(
+                        realtime_data_source, chargepoint_data_source, batch
+                    )
                 total_statuses_created += statuses_created
                 progress_bar.update(len(batch))
 
@@ -408,6 +657,7 @@ def _sync_statuses_batch(
 
     # Collect statuses to create
     statuses_to_create = []
+    statuses_suppressed = 0
 
     for item in batch:
         try:
@@ -440,12 +690,19 @@ def _sync_statuses_batch(
             item.status.timestamp > latest_status.timestamp
             and item.status.status != latest_status.status
         ):
-            item.status.chargepoint_id = cp_id
-            item.status.data_source = realtime_data_source
-            statuses_to_create.append(item.status)
+            status = _to_model(item.status)
+            status.chargepoint_id = cp_id
+            status.data_source = realtime_data_source
+            statuses_to_create.append(status)
+        else:
+            statuses_suppressed += 1
 
     # Bulk insert new statuses using COPY for speed
     if statuses_to_create:
         pgbulk.copy(RealtimeStatus, statuses_to_create)
 
+    record_run_stats(
+        statuses_created=len(statuses_to_create),
+        statuses_suppressed=statuses_suppressed,
+    )
     return len(statuses_to_create)
@@ -1,21 +1,138 @@
 import logging
+import time
+from datetime import UTC, datetime
+from pathlib import Path
 
 from celery import shared_task
+from django.utils import timezone
 
-from evmap_backend.data_sources.models import UpdateState
+from evmap_backend.data_sources.fetch import NotModifiedError, track_feeds
+from evmap_backend.data_sources.models import SyncRun, UpdateState
+from evmap_backend.data_sources.push import (
+    INVALID_PAYLOAD_ERRORS,
+    newer_push_exists,
+    open_push,
+)
 from evmap_backend.data_sources.registry import get_data_source
+from evmap_backend.data_sources.runs import SYNC_RUN_RETENTION, track_run
+from evmap_backend.data_sources.schedule import is_due, record_pull
+from evmap_backend.helpers import metrics
+from evmap_backend.helpers.locks import exclusive
 
 logger = logging.getLogger(__name__)
 
 
 @shared_task
 def pull_data_source(source_id: str):
+    """
+    Pull data for a source. If a pull of the same source is still running on any
+    worker, this one is skipped instead of waiting for it.
+    """
+    with exclusive(f"pull:{source_id}") as acquired:
+        if not acquired:
+            logger.info("Skipping pull for source %s, still running", source_id)
+            metrics.incr(f"pull.{source_id}.skipped")
+            metrics.log_metrics(f"pull.{source_id}.")
+            return
+        _pull_data_source(source_id)
+
+
+def _pull_data_source(source_id: str):
     try:
         source = get_data_source(source_id)
+        state = UpdateState.objects.filter(data_source=source_id).first()
+        if not is_due(source, state, timezone.now()):
+            logger.debug("Skipping pull for source %s, not due yet", source_id)
+            metrics.incr(f"pull.{source_id}.not_due")
+            return
+
         logger.info("Pulling data for source %s", source_id)
-        source.pull_data()
-        UpdateState(data_source=source_id, push=False).save()
+        with track_run(source_id, SyncRun.Kind.PULL) as run:
+            try:
+                with track_feeds():
+                    source.pull_data()
+            except NotModifiedError:
+                logger.info("Data for source %s not modified", source_id)
+        record_pull(source, run.changes, run.processed)
+        metrics.gauge(f"pull.{source_id}.changes", run.changes)
         logger.info("Successfully pulled data for source %s", source_id)
     except Exception:
         logger.exception("Failed to pull data for source %s", source_id)
         raise
+
+
+@shared_task
+def process_push(source_id: str, path: str, received_at: float):
+    """
+    Process a push payload that was spooled by the push endpoint.
+
+    received_at is the UNIX timestamp at which the push was received, used to measure
+    how long the payload waited in the queue and the total push latency.
+
+    Pushes of a source are processed one at a time. If the source coalesces pushes,
+    payloads received before the last applied one are skipped, so that a push that
+    was delayed in the queue never overwrites newer data.
+
+    The payload is deleted afterwards unless processing failed for a reason other than
+    an invalid payload, in which case it is kept for reprocessing.
+    """
+    path = Path(path)
+    keep_payload = False
+    metrics.timing(f"push.{source_id}.queue_age", time.time() - received_at)
+    try:
+        source = get_data_source(source_id)
+        if source.coalesce_pushes and newer_push_exists(path):
+            logger.info("Skipping push for source %s, newer push pending", source_id)
+            metrics.incr(f"push.{source_id}.skipped")
+            return
+
+        received = datetime.fromtimestamp(received_at, tz=UTC)
+        with exclusive(f"push:{source_id}", wait=True):
+            update_state = UpdateState.objects.filter(data_source=source_id).first()
+            if (
+                source.coalesce_pushes
+                and update_state is not None
+                and update_state.last_push_received is not None
+                and update_state.last_push_received >= received
+            ):
+                logger.info(
+                    "Skipping push for source %s, newer push already applied",
+                    source_id,
+                )
+                metrics.incr(f"push.{source_id}.skipped")
+                return
+
+            logger.info("Processing push for source %s", source_id)
+            with track_run(source_id, SyncRun.Kind.PUSH), open_push(path) as body:
+                source.process_push(body)
+
+            UpdateState.objects.update_or_create(
+                data_source=source_id,
+                defaults={"push": True, "last_push_received": received},
+            )
+
+        metrics.timing(f"push.{source_id}.latency", time.time() - received_at)
+        logger.info("Successfully processed push for source %s", source_id)
+    except Exception as e:
+        metrics.incr(f"push.{source_id}.errors")
+        keep_payload = not isinstance(e, INVALID_PAYLOAD_ERRORS)
+        if keep_payload:
+            logger.exception(
+                "Failed to process push for source %s, keeping %s", source_id, path
+            )
+        else:
+            logger.exception("Invalid push payload for source %s", source_id)
+        raise
+    finally:
+        if not keep_payload:
+            path.unlink(missing_ok=True)
+        metrics.log_metrics(f"push.{source_id}.")
+
+
+@shared_task
+def prune_sync_runs():
+    """Delete SyncRuns older than SYNC_RUN_RETENTION."""
+    deleted, _ = SyncRun.objects.filter(
+        started_at__lt=timezone.now() - SYNC_RUN_RETENTION
+    ).delete()
+    logger.info("Deleted %d old sync runs", deleted)
@@ -0,0 +1,66 @@
+"""
+Distributed locks in Redis, to make sure that a job does not run twice at the same time
+across all workers.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# locks expire after this many seconds unless they are renewed
+LOCK_TTL = 600
+
+_client = None
+
+
+def get_redis() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.CELERY_BROKER_URL)
+    return _client
+
+
+@contextmanager
+def exclusive(name: str, ttl: float = LOCK_TTL, wait: bool = False) -> Iterator[bool]:
+    """
+    Hold the lock with the given name while the block is running. Yields True if the
+    lock was acquired, or False right away if it is held by someone else. With
+    wait=True, blocks until the lock is released instead, and always yields True.
+
+    While the block is running, the lock is renewed every ttl / 3 seconds from a
+    background thread, so that it only expires if the process holding it died.
+    """
+    lock = get_redis().lock(f"lock:{name}", timeout=ttl, thread_local=False)
+    if not lock.acquire(blocking=wait):
+        yield False
+        return
+
+    stop = threading.Event()
+
+    def renew():
+        while not stop.wait(ttl / 3):
+            try:
+                lock.reacquire()
+            except redis.exceptions.LockError:
+                logger.warning(f"Lock {name} was lost")
+                return
+            except redis.RedisError:
+                logger.warning(f"Could not renew lock {name}, retrying", exc_info=True)
+
+    thread = threading.Thread(target=renew, name=f"lock-{name}", daemon=True)
+    thread.start()
+    try:
+        yield True
+    finally:
+        stop.set()
+        thread.join()
+        try:
+            lock.release()
+        except redis.exceptions.LockError:
+            logger.warning(f"Lock {name} expired before it was released")
@@ -0,0 +1,67 @@
+"""
+Lightweight in-process metrics.
+
+Counters, gauges and timings are collected per process and periodically written to the
+log by the long-running components (streaming sources, push processing, ...), so they
+end up next to all other operational information of the backend.
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = defaultdict(float)
+_gauges: Dict[str, float] = {}
+_timings: Dict[str, list] = {}  # name -> [count, total, max]
+
+
+def incr(name: str, amount: float = 1):
+    """Increment a counter."""
+    with _lock:
+        _counters[name] += amount
+
+
+def gauge(name: str, value: float):
+    """Set a gauge to its current value."""
+    with _lock:
+        _gauges[name] = value
+
+
+def timing(name: str, seconds: float):
+    """Record a duration (or any other observed value) in seconds."""
+    with _lock:
+        entry = _timings.setdefault(name, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds)
+
+
+def snapshot() -> Dict[str, float]:
+    """Return the current values of all metrics as a flat dict."""
+    with _lock:
+        result = dict(_counters)
+        result.update(_gauges)
+        for name, (count, total, maximum) in _timings.items():
+            result[f"{name}.count"] = count
+            result[f"{name}.avg"] = total / count if count else 0.0
+            result[f"{name}.max"] = maximum
+    return result
+
+
+def log_metrics(prefix: str = ""):
+    """Write all metrics starting with prefix to the log."""
+    values = {k: v for k, v in sorted(snapshot().items()) if k.startswith(prefix)}
+    if values:
+        logger.info("metrics: %s", ", ".join(f"{k}={v:g}" for k, v in values.items()))
+
+
+def reset():
+    """Reset all metrics (used in tests)."""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _timings.clear()
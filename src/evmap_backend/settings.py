@@ -71,7 +71,6 @@ ALLOWED_HOSTS = (
 )
 CSRF_TRUSTED_ORIGINS = [urlparse(SITE_URL).scheme + "://" + urlparse(SITE_URL).hostname]
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
-DATA_UPLOAD_MAX_MEMORY_SIZE = 1024 * 1024 * 1024
 
 # Application definition
 
@@ -197,6 +196,12 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # Celery
 CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "redis://127.0.0.1:6379/0")
 CELERY_BEAT_SCHEDULER = "celery.beat:Scheduler"
+# pulls and pushes are routed by data type (see DataSource.queue), follow-up tasks of
+# static syncs run on the static queue as well
+CELERY_TASK_ROUTES = {
+    "evmap_backend.chargers.tasks.*": {"queue": "static"},
+    "evmap_backend.data_sources.goingelectric.tasks.*": {"queue": "static"},
+}
 
 if DEBUG:
     INSTALLED_APPS.append("silk")
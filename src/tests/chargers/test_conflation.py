@@ -0,0 +1,160 @@
+"""
+Tests for the conflation of duplicate sites across data sources.
+"""
+
+import pytest
+from django.contrib.gis.geos import Point
+
+from evmap_backend.chargers.conflation import (
+    _score_connectors,
+    conflate_sites,
+    score_site_pair,
+)
+from evmap_backend.chargers.models import Chargepoint, ChargingSite, Connector, Network
+from evmap_backend.helpers.geo import WGS84
+
+BASE = Point(13.4050, 52.5200, srid=WGS84)
+
+
+def _offset_point(offset_m: float) -> Point:
+    """Create a point offset from BASE by approximately offset_m meters east."""
+    return Point(BASE.x + offset_m / 67000.0, BASE.y, srid=WGS84)
+
+
+def _create_site(data_source, id_from_source, offset_m=0.0, network=None, evseids=()):
+    site = ChargingSite.objects.create(
+        data_source=data_source,
+        id_from_source=id_from_source,
+        name=f"Site {id_from_source}",
+        location=_offset_point(offset_m),
+        country="DE",
+        network=network,
+    )
+    for i, evseid in enumerate(evseids or [""]):
+        chargepoint = Chargepoint.objects.create(
+            site=site, id_from_source=f"cp{i}", evseid=evseid
+        )
+        Connector.objects.create(
+            chargepoint=chargepoint,
+            connector_type=Connector.ConnectorTypes.CCS_TYPE_2,
+            max_power=150000,
+        )
+    return site
+
+
+def _duplicate_of(site):
+    site.refresh_from_db()
+    return site.duplicate_of
+
+
+class TestScoring:
+    def test_same_connectors(self):
+        connectors = {(Connector.ConnectorTypes.TYPE_2, 22000.0)}
+        assert _score_connectors(connectors, connectors) == 1.0
+
+    def test_partial_connectors(self):
+        a = {
+            (Connector.ConnectorTypes.TYPE_2, 22000.0),
+            (Connector.ConnectorTypes.CCS_TYPE_2, 150000.0),
+        }
+        b = {(Connector.ConnectorTypes.TYPE_2, 11000.0)}
+        assert _score_connectors(a, b) == pytest.approx(0.75)
+
+    def test_unknown_connectors(self):
+        assert _score_connectors(set(), {(Connector.ConnectorTypes.TYPE_2, 0)}) == 0.5
+
+    def test_score_site_pair(self):
+        connectors = {(Connector.ConnectorTypes.TYPE_2, 22000.0)}
+        assert score_site_pair(0.0, 1, 1, connectors, connectors, 100.0) == 1.0
+        assert score_site_pair(
+            50.0, 1, 2, connectors, connectors, 100.0
+        ) == pytest.approx(0.5)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConflateSites:
+    def test_nearby_sites_linked(self):
+        network = Network.objects.create(name="Test", evse_operator_id="DETST")
+        aggregator = _create_site("aggregator", "a1", network=network)
+        operator = _create_site("operator", "o1", offset_m=20, network=network)
+        other = _create_site("operator", "o2", offset_m=5000, network=network)
+
+        conflate_sites()
+
+        # the older site represents the group
+        assert _duplicate_of(aggregator) is None
+        assert _duplicate_of(operator) == aggregator
+        assert _duplicate_of(other) is None
+
+    def test_same_source_not_linked(self):
+        site1 = _create_site("operator", "o1")
+        site2 = _create_site("operator", "o2", offset_m=10)
+
+        conflate_sites()
+
+        assert _duplicate_of(site1) is None
+        assert _duplicate_of(site2) is None
+
+    def test_evseid_links_first(self):
+        """Shared EVSEIDs win over a closer site without them."""
+        aggregator = _create_site("aggregator", "a1", evseids=["DETSTE1"])
+        operator = _create_site("operator", "o1", offset_m=80, evseids=["DETSTE1"])
+        closer = _create_site("operator", "o2", offset_m=5)
+
+        conflate_sites()
+
+        assert _duplicate_of(aggregator) is None
+        assert _duplicate_of(operator) == aggregator
+        assert _duplicate_of(closer) is None
+
+    def test_representative_has_most_chargepoints(self):
+        site1 = _create_site("aggregator", "a1")
+        site2 = _create_site("operator", "o1", evseids=["DETSTE1", "DETSTE2"])
+
+        conflate_sites()
+
+        assert _duplicate_of(site1) == site2
+        assert _duplicate_of(site2) is None
+
+    def test_incremental(self):
+        aggregator = _create_site("aggregator", "a1")
+        operator = _create_site("operator", "o1", offset_m=20)
+        conflate_sites()
+        assert _duplicate_of(operator) == aggregator
+
+        # the operator's site moves away, a new one appears at the old location
+        operator.location = _offset_point(5000)
+        operator.save()
+        new_site = _create_site("operator", "o2", offset_m=20)
+        conflate_sites([operator.id, new_site.id])
+
+        assert _duplicate_of(operator) is None
+        assert _duplicate_of(new_site) == aggregator
+
+    def test_deleted_representative(self):
+        aggregator = _create_site("aggregator", "a1")
+        operator = _create_site("operator", "o1", offset_m=20)
+        other = _create_site("other", "x1", offset_m=30)
+        conflate_sites()
+        assert _duplicate_of(operator) == aggregator
+        assert _duplicate_of(other) == aggregator
+
+        aggregator_id = aggregator.id
+        aggregator.delete()
+        conflate_sites([aggregator_id, operator.id, other.id])
+
+        assert _duplicate_of(operator) is None
+        assert _duplicate_of(other) == operator
+
+    def test_large_region_conflated_in_full(self, monkeypatch):
+        monkeypatch.setattr("evmap_backend.chargers.conflation.MAX_REGION_SIZE", 1)
+        aggregator = _create_site("aggregator", "a1")
+        operator = _create_site("operator", "o1", offset_m=20)
+        far_away = _create_site("aggregator", "a2", offset_m=5000)
+        other = _create_site("operator", "o2", offset_m=5020)
+
+        # the region of a1 exceeds the limit, so the far away sites are linked as well
+        conflate_sites([aggregator.id])
+
+        assert _duplicate_of(operator) == aggregator
+        assert _duplicate_of(other) == far_away
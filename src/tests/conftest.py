@@ -6,6 +6,26 @@ import pytest
 from django.contrib.gis.geos import Point
 
 from evmap_backend.chargers.models import Chargepoint, ChargingSite, Connector, Network
+from evmap_backend.chargers.tasks import schedule_conflation
+from evmap_backend.data_sources.goingelectric.tasks import schedule_matching
+from evmap_backend.data_sources.signals import sites_changed
+
+# receivers of sites_changed that schedule Celery tasks, which need a broker
+SYNC_TASK_RECEIVERS = {
+    "chargers_conflation": schedule_conflation,
+    "goingelectric_matching": schedule_matching,
+}
+
+
+@pytest.fixture(autouse=True)
+def no_sync_tasks():
+    """Do not schedule conflation and GoingElectric matching after syncs. Tests of
+    these call them directly."""
+    for dispatch_uid in SYNC_TASK_RECEIVERS:
+        sites_changed.disconnect(dispatch_uid=dispatch_uid)
+    yield
+    for dispatch_uid, receiver in SYNC_TASK_RECEIVERS.items():
+        sites_changed.connect(receiver, dispatch_uid=dispatch_uid)
 
 
 @pytest.fixture
@@ -0,0 +1,63 @@
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+
+from evmap_backend.countries.resolver import CountryResolver
+
+
+def make_resolver(**kwargs):
+    # two neighbouring "countries" with a diagonal border, and an island
+    west = MultiPolygon(Polygon(((0, 0), (3, 0), (2, 3), (0, 3), (0, 0))))
+    east = MultiPolygon(Polygon(((3, 0), (6, 0), (6, 3), (2, 3), (3, 0))))
+    island = MultiPolygon(
+        Polygon.from_bbox((10.2, 10.2, 10.4, 10.4)),
+        Polygon.from_bbox((10.6, 10.6, 10.8, 10.8)),
+    )
+    return CountryResolver([("AA", west), ("BB", east), ("CC", island)], **kwargs)
+
+
+def test_resolve():
+    resolver = make_resolver()
+
+    assert resolver.resolve(Point(0.5, 0.5)) == "AA"
+    assert resolver.resolve(Point(2.1, 2.5)) == "AA"
+    assert resolver.resolve(Point(2.7, 0.5)) == "AA"
+    assert resolver.resolve(Point(3.1, 0.5)) == "BB"
+    assert resolver.resolve(Point(5.5, 2.5)) == "BB"
+    assert resolver.resolve((10.3, 10.3)) == "CC"
+    assert resolver.resolve((10.5, 10.5)) is None
+    assert resolver.resolve((-1, -1)) is None
+
+
+def test_resolve_matches_brute_force():
+    resolver = make_resolver(cell_size=0.5)
+    countries = {
+        "AA": MultiPolygon(Polygon(((0, 0), (3, 0), (2, 3), (0, 3), (0, 0)))),
+        "BB": MultiPolygon(Polygon(((3, 0), (6, 0), (6, 3), (2, 3), (3, 0)))),
+    }
+    points = [Point(x / 7, y / 7) for x in range(-3, 45) for y in range(-3, 24)]
+    # points on the border between two countries are ambiguous
+    points = [p for p in points if sum(g.covers(p) for g in countries.values()) < 2]
+
+    expected = [
+        next((iso2 for iso2, geom in countries.items() if geom.covers(p)), None)
+        for p in points
+    ]
+    assert resolver.resolve_many(points) == expected
+
+
+def test_fallback_for_points_outside_simplified_geometries():
+    calls = []
+
+    def fallback(point, candidates):
+        calls.append(candidates)
+        return "XX"
+
+    resolver = make_resolver(fallback=fallback)
+
+    # inside a country, no fallback needed
+    assert resolver.resolve((0.5, 0.5)) == "AA"
+    # in the sea between the islands, the cell has candidates
+    assert resolver.resolve((10.5, 10.5)) == "XX"
+    assert calls == [["CC"]]
+    # far away from any country
+    assert resolver.resolve((-1, -1)) is None
+    assert len(calls) == 1
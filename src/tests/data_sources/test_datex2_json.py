@@ -0,0 +1,190 @@
+import io
+import json
+
+import ijson
+import pytest
+
+from evmap_backend.data_sources.datex2.parser.json import (
+    SITE_PREFIX,
+    Datex2JsonParser,
+    iter_objects,
+)
+
+
+def make_site(i):
+    return {
+        "idG": f"site{i}",
+        "name": {"values": [{"lang": "de", "value": f"Site {i}"}]},
+        "operator": {
+            "afacAnOrganisation": {
+                "name": {"values": [{"lang": "de", "value": "Operator"}]}
+            }
+        },
+        "locationReference": {
+            "locPointLocation": {
+                "coordinatesForDisplay": {"latitude": 48.1, "longitude": 11.5},
+                "locLocationExtensionG": {
+                    "facilityLocation": {
+                        "address": {
+                            "postcode": "80331",
+                            "city": {"values": [{"lang": "de", "value": "München"}]},
+                            "countryCode": "DE",
+                            "addressLine": [
+                                {
+                                    "order": 1,
+                                    "text": {
+                                        "values": [
+                                            {"lang": "de", "value": f"Hauptstraße {i}"}
+                                        ]
+                                    },
+                                }
+                            ],
+                        }
+                    }
+                },
+            }
+        },
+        "energyInfrastructureStation": [
+            {
+                "idG": f"station{i}",
+                "refillPoint": [
+                    {
+                        "aegiElectricChargingPoint": {
+                            "idG": f"DE*ABC*E{i}",
+                            "externalIdentifier": f"DE*ABC*E{i}",
+                            "connector": [
+                                {
+                                    "connectorType": {"value": "iec62196T2Combo"},
+                                    "maxPowerAtSocket": 150000.5,
+                                }
+                            ],
+                        }
+                    }
+                ],
+            }
+        ],
+    }
+
+
+def make_table(publication_key="aegiEnergyInfrastructureTablePublication"):
+    table = {
+        "energyInfrastructureTable": [
+            {"energyInfrastructureSite": [make_site(0), make_site(1)]}
+        ]
+    }
+    if publication_key is None:
+        return table
+    return {"messageContainer": {"payload": [{publication_key: table}]}}
+
+
+@pytest.mark.parametrize(
+    "publication_key",
+    [
+        "aegiEnergyInfrastructureTablePublication",
+        "egiEnergyInfrastructureTablePublication",
+        None,
+    ],
+)
+def test_parse_sites_from_stream(publication_key):
+    root = make_table(publication_key)
+    expected = list(Datex2JsonParser().parse(root))
+    assert [site.id for site in expected] == ["site0", "site1"]
+    assert expected[0].city == "München"
+    assert expected[0].refill_points[0].connectors[0].max_power == 150000.5
+
+    data = json.dumps(root, ensure_ascii=False).encode("utf-8")
+    assert list(Datex2JsonParser().parse(io.BytesIO(data))) == expected
+    assert list(Datex2JsonParser().parse(data.decode("utf-8"))) == expected
+
+
+def test_parse_sites_with_small_chunks():
+    data = json.dumps(make_table()).encode("utf-8")
+    parser = Datex2JsonParser()
+
+    # the prefix is only found after reading several chunks
+    sites = list(iter_objects(io.BytesIO(data), SITE_PREFIX, chunk_size=16))
+    assert [site["idG"] for site in sites] == ["site0", "site1"]
+    assert [site.id for site in parser.parse(data)] == ["site0", "site1"]
+
+
+class CountingStream(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def test_prefix_search_reads_document_once():
+    table = make_table()
+    data = json.dumps({"header": "x" * 10_000, **table}).encode("utf-8")
+
+    stream = CountingStream(data)
+    sites = list(iter_objects(stream, SITE_PREFIX, chunk_size=16))
+    assert [site["idG"] for site in sites] == ["site0", "site1"]
+    assert stream.bytes_read == len(data)
+
+    # the prefix is not searched beyond max_head_size
+    stream = CountingStream(data)
+    with pytest.raises(ValueError):
+        list(iter_objects(stream, SITE_PREFIX, 16, max_head_size=1000))
+    assert stream.bytes_read < 2000
+
+
+def test_empty_table():
+    table = {"energyInfrastructureTable": [{"energyInfrastructureSite": []}]}
+    assert list(Datex2JsonParser().parse(json.dumps(table))) == []
+
+
+@pytest.mark.parametrize(
+    "data, error",
+    [
+        (b"<html><body>502 Bad Gateway</body></html>", ijson.JSONError),
+        (b'{"error": "unauthorized"}', ValueError),
+    ],
+)
+def test_error_document_rejected(data, error):
+    with pytest.raises(error):
+        list(Datex2JsonParser().parse(data))
+    with pytest.raises(error):
+        list(Datex2JsonParser().parse_status(data))
+
+
+def test_parse_statuses():
+    root = {
+        "messageContainer": {
+            "payload": [
+                {
+                    "aegiEnergyInfrastructureStatusPublication": {
+                        "energyInfrastructureSiteStatus": [
+                            {
+                                "reference": {"idG": f"site{i}"},
+                                "lastUpdated": "2025-01-01T12:00:00Z",
+                                "energyInfrastructureStationStatus": [
+                                    {
+                                        "refillPointStatus": [
+                                            {
+                                                "aegiElectricChargingPointStatus": {
+                                                    "reference": {"idG": f"rp{i}"},
+                                                    "status": {"value": "available"},
+                                                }
+                                            }
+                                        ]
+                                    }
+                                ],
+                            }
+                            for i in range(2)
+                        ]
+                    }
+                }
+            ]
+        }
+    }
+    data = io.BytesIO(json.dumps(root).encode("utf-8"))
+
+    statuses = list(Datex2JsonParser().parse_status(data))
+    assert [s.site_id for s in statuses] == ["site0", "site1"]
+    assert statuses[1].refill_point_statuses[0].refill_point_id == "rp1"
@@ -0,0 +1,161 @@
+import gzip
+import io
+
+import pytest
+
+from evmap_backend.data_sources.datex2.parser.xml import Datex2XmlParser, iter_elements
+
+SITES_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<con:messageContainer xmlns:con="http://datex2.eu/schema/3/messageContainer" xmlns:egi="http://datex2.eu/schema/3/energyInfrastructure" xmlns:fac="http://datex2.eu/schema/3/facilities" xmlns:com="http://datex2.eu/schema/3/common" xmlns:loc="http://datex2.eu/schema/3/locationReferencing" xmlns:locx="http://datex2.eu/schema/3/locationExtension" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"><con:payload xsi:type="egi:EnergyInfrastructureTablePublication" lang="de" modelBaseVersion="3">
+<egi:energyInfrastructureTable id="t" version="1">
+<egi:energyInfrastructureSite id="site0" version="1">
+<fac:name><com:values><com:value lang="de">Site 0</com:value></com:values></fac:name>
+<fac:locationReference xsi:type="loc:PointLocation">
+<loc:pointByCoordinates><loc:pointCoordinates><loc:latitude>48.0</loc:latitude><loc:longitude>11.0</loc:longitude></loc:pointCoordinates></loc:pointByCoordinates>
+<loc:_pointLocationExtension><locx:facilityLocation><locx:address>
+<locx:postcode>80000</locx:postcode>
+<locx:city><com:values><com:value lang="de">München</com:value></com:values></locx:city>
+<locx:countryCode>DE</locx:countryCode>
+<locx:addressLine order="1"><locx:text><com:values><com:value lang="de">Hauptstraße 0</com:value></com:values></locx:text></locx:addressLine>
+</locx:address></locx:facilityLocation></loc:_pointLocationExtension>
+</fac:locationReference>
+<fac:operator id="op0"><fac:name><com:values><com:value lang="de">Operator 0</com:value></com:values></fac:name>
+<fac:organisationUnit><fac:contactInformation><fac:telephoneNumber>+49 89 0</fac:telephoneNumber></fac:contactInformation></fac:organisationUnit></fac:operator>
+<egi:energyInfrastructureStation id="station0" version="1">
+<egi:refillPoint xsi:type="egi:ElectricChargingPoint" id="DE*ABC*E0*0" version="1">
+<fac:externalIdentifier>DE*ABC*E0*0</fac:externalIdentifier>
+<egi:connector><egi:connectorType>iec62196T2COMBO</egi:connectorType><egi:chargingMode>mode4DC</egi:chargingMode><egi:maxPowerAtSocket>150000</egi:maxPowerAtSocket></egi:connector>
+</egi:refillPoint>
+<egi:refillPoint xsi:type="egi:ElectricChargingPoint" id="DE*ABC*E0*1" version="1">
+<fac:externalIdentifier>DE*ABC*E0*1</fac:externalIdentifier>
+<egi:connector><egi:connectorType>iec62196T2COMBO</egi:connectorType><egi:chargingMode>mode4DC</egi:chargingMode><egi:maxPowerAtSocket>150000</egi:maxPowerAtSocket></egi:connector>
+</egi:refillPoint>
+</egi:energyInfrastructureStation>
+</egi:energyInfrastructureSite>
+<egi:energyInfrastructureSite id="site1" version="1">
+<fac:name><com:values><com:value lang="de">Site 1</com:value></com:values></fac:name>
+<fac:locationReference xsi:type="loc:PointLocation">
+<loc:pointByCoordinates><loc:pointCoordinates><loc:latitude>48.00001</loc:latitude><loc:longitude>11.00001</loc:longitude></loc:pointCoordinates></loc:pointByCoordinates>
+<loc:_pointLocationExtension><locx:facilityLocation><locx:address>
+<locx:postcode>80001</locx:postcode>
+<locx:city><com:values><com:value lang="de">München</com:value></com:values></locx:city>
+<locx:countryCode>DE</locx:countryCode>
+<locx:addressLine order="1"><locx:text><com:values><com:value lang="de">Hauptstraße 1</com:value></com:values></locx:text></locx:addressLine>
+</locx:address></locx:facilityLocation></loc:_pointLocationExtension>
+</fac:locationReference>
+<fac:operator id="op1"><fac:name><com:values><com:value lang="de">Operator 1</com:value></com:values></fac:name>
+<fac:organisationUnit><fac:contactInformation><fac:telephoneNumber>+49 89 1</fac:telephoneNumber></fac:contactInformation></fac:organisationUnit></fac:operator>
+<egi:energyInfrastructureStation id="station1" version="1">
+<egi:refillPoint xsi:type="egi:ElectricChargingPoint" id="DE*ABC*E1*0" version="1">
+<fac:externalIdentifier>DE*ABC*E1*0</fac:externalIdentifier>
+<egi:connector><egi:connectorType>iec62196T2COMBO</egi:connectorType><egi:chargingMode>mode4DC</egi:chargingMode><egi:maxPowerAtSocket>150000</egi:maxPowerAtSocket></egi:connector>
+</egi:refillPoint>
+<egi:refillPoint xsi:type="egi:ElectricChargingPoint" id="DE*ABC*E1*1" version="1">
+<fac:externalIdentifier>DE*ABC*E1*1</fac:externalIdentifier>
+<egi:connector><egi:connectorType>iec62196T2COMBO</egi:connectorType><egi:chargingMode>mode4DC</egi:chargingMode><egi:maxPowerAtSocket>150000</egi:maxPowerAtSocket></egi:connector>
+</egi:refillPoint>
+</egi:energyInfrastructureStation>
+</egi:energyInfrastructureSite>
+</egi:energyInfrastructureTable>
+</con:payload></con:messageContainer>
+"""
+
+STATUSES_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<con:messageContainer xmlns:con="http://datex2.eu/schema/3/messageContainer" xmlns:egi="http://datex2.eu/schema/3/energyInfrastructure" xmlns:fac="http://datex2.eu/schema/3/facilities" xmlns:com="http://datex2.eu/schema/3/common" xmlns:loc="http://datex2.eu/schema/3/locationReferencing" xmlns:locx="http://datex2.eu/schema/3/locationExtension" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"><con:payload xsi:type="egi:EnergyInfrastructureStatusPublication" lang="de" modelBaseVersion="3">
+<egi:energyInfrastructureSiteStatus>
+<fac:reference targetClass="fac:FacilityObject" id="site0" version="1"/>
+<egi:energyInfrastructureStationStatus>
+<fac:reference targetClass="fac:FacilityObject" id="station0" version="1"/>
+<egi:refillPointStatus>
+<fac:reference targetClass="fac:FacilityObject" id="DE*ABC*E0*0" version="1"/>
+<fac:lastUpdated>2025-01-01T12:00:00Z</fac:lastUpdated>
+<egi:status>available</egi:status>
+</egi:refillPointStatus>
+<egi:refillPointStatus>
+<fac:reference targetClass="fac:FacilityObject" id="DE*ABC*E0*1" version="1"/>
+<fac:lastUpdated>2025-01-01T12:00:00Z</fac:lastUpdated>
+<egi:status>available</egi:status>
+</egi:refillPointStatus>
+</egi:energyInfrastructureStationStatus>
+</egi:energyInfrastructureSiteStatus>
+<egi:energyInfrastructureSiteStatus>
+<fac:reference targetClass="fac:FacilityObject" id="site1" version="1"/>
+<egi:energyInfrastructureStationStatus>
+<fac:reference targetClass="fac:FacilityObject" id="station1" version="1"/>
+<egi:refillPointStatus>
+<fac:reference targetClass="fac:FacilityObject" id="DE*ABC*E1*0" version="1"/>
+<fac:lastUpdated>2025-01-01T12:00:00Z</fac:lastUpdated>
+<egi:status>available</egi:status>
+</egi:refillPointStatus>
+<egi:refillPointStatus>
+<fac:reference targetClass="fac:FacilityObject" id="DE*ABC*E1*1" version="1"/>
+<fac:lastUpdated>2025-01-01T12:00:00Z</fac:lastUpdated>
+<egi:status>available</egi:status>
+</egi:refillPointStatus>
+</egi:energyInfrastructureStationStatus>
+</egi:energyInfrastructureSiteStatus>
+</con:payload></con:messageContainer>
+"""
+
+
+def test_parse_sites():
+    sites = list(Datex2XmlParser().parse(SITES_XML))
+
+    assert [site.id for site in sites] == ["site0", "site1"]
+    site = sites[1]
+    assert site.name.first() == "Site 1"
+    assert site.location == (11.00001, 48.00001)
+    assert site.city == "München"
+    assert site.zipcode == "80001"
+    assert site.street == "Hauptstraße 1"
+    assert site.country == "DE"
+    assert site.operator_phone == "+49 89 1"
+    assert [rp.id for rp in site.refill_points] == ["DE*ABC*E1*0", "DE*ABC*E1*1"]
+    assert site.refill_points[0].connectors[0].max_power == 150000
+
+
+def test_parse_sites_from_stream():
+    expected = list(Datex2XmlParser().parse(SITES_XML))
+    stream = gzip.GzipFile(fileobj=io.BytesIO(gzip.compress(SITES_XML.encode())))
+
+    assert list(Datex2XmlParser().parse(stream)) == expected
+
+
+def test_parse_statuses():
+    statuses = list(Datex2XmlParser().parse_status(STATUSES_XML))
+
+    assert [s.site_id for s in statuses] == ["site0", "site1"]
+    assert [rp.refill_point_id for rp in statuses[0].refill_point_statuses] == [
+        "DE*ABC*E0*0",
+        "DE*ABC*E0*1",
+    ]
+
+    stations = list(
+        Datex2XmlParser(realtime_station_as_site=True).parse_status(STATUSES_XML)
+    )
+    assert [s.site_id for s in stations] == ["station0", "station1"]
+
+
+def test_iter_elements_releases_elements():
+    seen = []
+    for elem in iter_elements(SITES_XML, ["egi:energyInfrastructureSite"]):
+        assert len(elem) > 0
+        seen.append(elem)
+
+    # elements are cleared after they have been processed
+    assert len(seen) == 2
+    assert all(len(elem) == 0 for elem in seen)
+
+
+@pytest.mark.parametrize(
+    "xml",
+    [
+        b"<error>unauthorized</error>",
+        b'<con:messageContainer xmlns:con="http://datex2.eu/schema/3/messageContainer"/>',
+    ],
+)
+def test_error_document_rejected(xml):
+    with pytest.raises(ValueError):
+        list(Datex2XmlParser().parse(xml))
+    with pytest.raises(ValueError):
+        list(Datex2XmlParser().parse_status(xml))
@@ -0,0 +1,204 @@
+import io
+import json
+import tempfile
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from evmap_backend.data_sources.fetch import (
+    Feed,
+    NotModifiedError,
+    _download,
+    fetch_feed,
+    fetch_feeds,
+    track_feeds,
+)
+from evmap_backend.data_sources.models import FeedState
+from evmap_backend.data_sources.opendata_swiss.source import (
+    OpendataSwissRealtimeDataSource,
+)
+
+URL = "https://example.com/feed.json"
+BODY = json.dumps({"data": [1, 2, 3]}).encode("utf-8")
+
+
+class FeedAdapter(BaseAdapter):
+    """Serves a fixed body, answering with 304 if the ETag matches."""
+
+    def __init__(self, body: bytes, etag: str = None):
+        super().__init__()
+        self.body = body
+        self.etag = etag
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        if self.etag is not None and request.headers.get("If-None-Match") == self.etag:
+            response.status_code = 304
+            response.raw = io.BytesIO(b"")
+        else:
+            response.status_code = 200
+            response.raw = io.BytesIO(self.body)
+            if self.etag is not None:
+                response.headers["ETag"] = self.etag
+        return response
+
+    def close(self):
+        pass
+
+
+def make_session(adapter):
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
+
+
+def test_feed_text_uses_header_encoding():
+    feed = Feed(
+        io.BytesIO("Zürich".encode("iso-8859-1")),
+        CaseInsensitiveDict({"Content-Type": "text/plain; charset=ISO-8859-1"}),
+    )
+    assert feed.text() == "Zürich"
+
+
+@pytest.mark.django_db
+def test_unchanged_body_is_skipped():
+    session = make_session(FeedAdapter(BODY))
+
+    with track_feeds():
+        feed = fetch_feed("test_source", URL, session=session)
+        assert feed.json() == {"data": [1, 2, 3]}
+
+    with pytest.raises(NotModifiedError):
+        with track_feeds():
+            fetch_feed("test_source", URL, session=session)
+
+    state = FeedState.objects.get(data_source="test_source", url=URL)
+    assert state.content_length == len(BODY)
+    assert state.bytes_downloaded == 2 * len(BODY)
+    assert state.not_modified_count == 1
+    assert state.time_saved == state.processing_time
+
+
+@pytest.mark.django_db
+def test_not_modified_response_is_skipped():
+    adapter = FeedAdapter(BODY, etag='"v1"')
+    session = make_session(adapter)
+
+    with track_feeds():
+        fetch_feed("test_source", URL, session=session)
+
+    with pytest.raises(NotModifiedError):
+        with track_feeds():
+            fetch_feed("test_source", URL, session=session)
+
+    assert adapter.requests[1].headers["If-None-Match"] == '"v1"'
+    state = FeedState.objects.get(data_source="test_source", url=URL)
+    assert state.etag == '"v1"'
+    assert state.bytes_downloaded == len(BODY)
+    assert state.not_modified_count == 1
+
+
+@pytest.mark.django_db
+def test_state_not_saved_if_pull_fails():
+    session = make_session(FeedAdapter(BODY))
+
+    with pytest.raises(ValueError):
+        with track_feeds():
+            fetch_feed("test_source", URL, session=session)
+            raise ValueError("sync failed")
+
+    assert not FeedState.objects.filter(data_source="test_source").exists()
+
+    # the feed is processed again on the next run
+    with track_feeds():
+        feed = fetch_feed("test_source", URL, session=session)
+        assert feed.content == BODY
+    assert FeedState.objects.filter(data_source="test_source").exists()
+
+
+@pytest.mark.django_db
+def test_unchanged_body_of_dynamic_source_is_processed():
+    session = make_session(FeedAdapter(BODY))
+    source_id = OpendataSwissRealtimeDataSource.id
+
+    for _ in range(2):
+        with track_feeds():
+            feed = fetch_feed(source_id, URL, session=session)
+            assert feed.content == BODY
+
+    state = FeedState.objects.get(data_source=source_id, url=URL)
+    assert state.not_modified_count == 0
+
+
+@pytest.mark.django_db
+def test_feeds_closed_after_pull():
+    session = make_session(FeedAdapter(BODY))
+
+    with track_feeds():
+        feed = fetch_feed("test_source", URL, session=session)
+        assert not feed.file.closed
+    assert feed.file.closed
+
+
+@pytest.mark.django_db
+def test_unchanged_feed_of_several_is_downloaded_again():
+    other_url = "https://example.com/other.json"
+    adapter = FeedAdapter(BODY, etag='"v1"')
+    session = make_session(adapter)
+
+    with track_feeds():
+        fetch_feeds("test_source", [URL, other_url], session=session)
+    FeedState.objects.filter(url=other_url).update(etag="", content_hash="changed")
+
+    with track_feeds():
+        feeds = fetch_feeds("test_source", [URL, other_url], session=session)
+        assert [feed.content for feed in feeds] == [BODY, BODY]
+
+    # the 304 for the unchanged feed is followed by an unconditional download
+    assert [r.headers.get("If-None-Match") for r in adapter.requests[2:]] == [
+        '"v1"',
+        None,
+        None,
+    ]
+    state = FeedState.objects.get(data_source="test_source", url=URL)
+    assert state.not_modified_count == 0
+    assert state.bytes_downloaded == 2 * len(BODY)
+
+
+@pytest.mark.django_db
+def test_several_feeds_skipped_if_all_unchanged():
+    other_url = "https://example.com/other.json"
+    session = make_session(FeedAdapter(BODY, etag='"v1"'))
+
+    with track_feeds():
+        fetch_feeds("test_source", [URL, other_url], session=session)
+
+    with pytest.raises(NotModifiedError):
+        with track_feeds():
+            fetch_feeds("test_source", [URL, other_url], session=session)
+
+    for state in FeedState.objects.filter(data_source="test_source"):
+        assert state.not_modified_count == 1
+
+
+def test_file_closed_if_download_fails(monkeypatch):
+    files = []
+    spool = tempfile.SpooledTemporaryFile
+
+    def spooled_file(*args, **kwargs):
+        files.append(spool(*args, **kwargs))
+        return files[-1]
+
+    monkeypatch.setattr(tempfile, "SpooledTemporaryFile", spooled_file)
+    state = FeedState(data_source="test_source", url=URL)
+    session = make_session(FeedAdapter(BODY, etag='"v1"'))
+
+    with pytest.raises(NotModifiedError):
+        _download(state, session, "GET", {"If-None-Match": '"v1"'}, True)
+    assert files[-1].closed
@@ -0,0 +1,125 @@
+"""
+Tests for the Fintraffic MQTT consumer and the shared streaming helpers.
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.gis.geos import Point
+from django.utils import timezone
+
+from evmap_backend.chargers.models import Chargepoint, ChargingSite
+from evmap_backend.data_sources.fintraffic.source import FintrafficRealtimeDataSource
+from evmap_backend.data_sources.streaming import StatusWriter
+from evmap_backend.realtime.models import RealtimeStatus
+
+
+class FakeWriter:
+    def __init__(self):
+        self.statuses = []
+        self.suppressed = 0
+
+    def put(self, status):
+        self.statuses.append(status)
+        return True
+
+    def record_suppressed(self, data_source):
+        self.suppressed += 1
+
+
+def make_message(evseid, status):
+    return SimpleNamespace(
+        topic=f"status-v1/{evseid}",
+        payload=json.dumps({"status": status}).encode("utf-8"),
+    )
+
+
+@pytest.fixture
+def source():
+    source = FintrafficRealtimeDataSource()
+    source.chargepoints._map = {"FIABCE1": 1, "FIABCE2": 2}
+    source.writer = FakeWriter()
+    return source
+
+
+def test_unknown_chargepoint_ignored(source):
+    source._on_message(None, None, make_message("FI*ABC*E9", "AVAILABLE"))
+    assert source.writer.statuses == []
+
+
+def test_new_status_enqueued(source):
+    source._on_message(None, None, make_message("FI*ABC*E1", "CHARGING"))
+
+    assert len(source.writer.statuses) == 1
+    status = source.writer.statuses[0]
+    assert status.chargepoint_id == 1
+    assert status.status == RealtimeStatus.Status.CHARGING
+    assert status.data_source == "fintraffic_realtime"
+
+
+def test_unchanged_status_suppressed(source):
+    source.latest_statuses = {1: "AVAILABLE"}
+
+    source._on_message(None, None, make_message("FI*ABC*E1", "AVAILABLE"))
+    assert source.writer.statuses == []
+
+    source._on_message(None, None, make_message("FI*ABC*E1", "CHARGING"))
+    source._on_message(None, None, make_message("FI*ABC*E1", "CHARGING"))
+    assert len(source.writer.statuses) == 1
+    assert source.writer.suppressed == 2
+
+
+def test_invalid_status_ignored(source):
+    source._on_message(None, None, make_message("FI*ABC*E1", "EXPLODED"))
+    assert source.writer.statuses == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_status_writer_flushes_on_stop():
+    site = ChargingSite.objects.create(
+        data_source="fintraffic",
+        id_from_source="site_1",
+        name="Site 1",
+        location=Point(25.0, 60.0),
+        country="FI",
+    )
+    chargepoint = Chargepoint.objects.create(site=site, id_from_source="cp_1")
+
+    source = FintrafficRealtimeDataSource()
+    source.chargepoints.refresh()
+    assert len(source.chargepoints) == 0  # chargepoint has no EVSEID
+
+    writer = StatusWriter(flush_interval=60)
+    writer.start()
+    for status in [RealtimeStatus.Status.AVAILABLE, RealtimeStatus.Status.CHARGING]:
+        writer.put(
+            RealtimeStatus(
+                chargepoint_id=chargepoint.id,
+                status=status,
+                data_source="fintraffic_realtime",
+                timestamp=timezone.now(),
+            )
+        )
+    writer.stop()
+
+    assert RealtimeStatus.objects.filter(chargepoint=chargepoint).count() == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_status_writer_skips_deleted_chargepoints():
+    writer = StatusWriter()
+    # the chargepoint does not exist, so nothing is left to write
+    writer._flush(
+        [
+            RealtimeStatus(
+                chargepoint_id=1,
+                status=RealtimeStatus.Status.AVAILABLE,
+                data_source="fintraffic_realtime",
+                timestamp=timezone.now(),
+            )
+        ]
+    )
+
+    assert RealtimeStatus.objects.count() == 0
+    assert writer._runs == {}
@@ -0,0 +1,76 @@
+import io
+
+from evmap_backend.chargers.models import Connector
+from evmap_backend.data_sources.irve.parser import parse_irve_csv
+
+HEADER = (
+    "id_station_itinerance,id_pdc_itinerance,nom_station,nom_operateur,"
+    "adresse_station,consolidated_longitude,consolidated_latitude,"
+    "puissance_nominale,prise_type_2,prise_type_combo_ccs,cable_t2_attache\n"
+)
+ROWS = [
+    "FRABCP001,FR*ABC*E001A,Gare,ABC,1 Rue Lamartine 31110 Luchon,0.59,42.79,22,TRUE,FALSE,FALSE\n",
+    "FRABCP001,FR*ABC*E001B,Gare,ABC,1 Rue Lamartine 31110 Luchon,0.59,42.79,150,FALSE,TRUE,FALSE\n",
+    "FRABCP002,FR*ABC*E002A,Mairie,ABC,2 Place 75001 Paris,2.35,48.86,7.4,TRUE,FALSE,TRUE\n",
+    "FRABCP003,FR*ABC*E003A,Invalide,ABC,3 Rue 75001 Paris,0,0,22,TRUE,FALSE,FALSE\n",
+]
+
+
+def parse(lines, **kwargs):
+    return {
+        item.site.id_from_source: item
+        for item in parse_irve_csv(lines, "irve_france", "IRVE", None, **kwargs)
+    }
+
+
+def test_parse_clustered():
+    sites = parse(io.StringIO(HEADER + "".join(ROWS)))
+
+    assert set(sites) == {"FRABCP001", "FRABCP002"}
+    gare = sites["FRABCP001"]
+    assert gare.site.name == "Gare"
+    assert gare.site.location == (0.59, 42.79)
+    assert (gare.site.zipcode, gare.site.city) == ("31110", "Luchon")
+    assert gare.network_operator_id == "FRABC"
+    assert [cp.chargepoint.evseid for cp in gare.chargepoints] == [
+        "FRABCE001A",
+        "FRABCE001B",
+    ]
+    [type2] = gare.chargepoints[0].connectors
+    assert type2.connector_type == Connector.ConnectorTypes.TYPE_2
+    assert type2.connector_format == Connector.ConnectorFormats.SOCKET
+    assert type2.max_power == 22000
+    [ccs] = gare.chargepoints[1].connectors
+    assert ccs.connector_type == Connector.ConnectorTypes.CCS_TYPE_2
+    assert ccs.connector_format == Connector.ConnectorFormats.CABLE
+
+    [attached] = sites["FRABCP002"].chargepoints[0].connectors
+    assert attached.connector_format == Connector.ConnectorFormats.CABLE
+
+
+def test_parse_unclustered():
+    rows = [ROWS[0], ROWS[2], ROWS[3], ROWS[1]]
+    expected = parse(io.StringIO(HEADER + "".join(ROWS)))
+
+    # seekable file, sorted in memory or on disk in chunks
+    for chunk_size in (100, 1):
+        sites = parse(io.StringIO(HEADER + "".join(rows)), chunk_size=chunk_size)
+        assert sites == expected
+
+    # plain iterable of lines
+    assert parse([HEADER] + rows, chunk_size=2) == expected
+
+
+def test_parse_missing_columns():
+    csv = "id_station_itinerance,id_pdc_itinerance,consolidated_longitude,consolidated_latitude\n"
+    csv += " FRABCP001 ,FR*ABC*E001A,0.59,42.79\n,FR*ABC*E002A,2.35,48.86\n"
+    sites = parse(io.StringIO(csv))
+
+    [item] = sites.values()
+    assert item.site.id_from_source == "FRABCP001"
+    assert item.site.name == ""
+    assert item.chargepoints[0].connectors == []
+
+
+def test_parse_empty():
+    assert parse(io.StringIO("")) == {}
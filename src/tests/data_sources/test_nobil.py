@@ -1,4 +1,5 @@
 from evmap_backend.data_sources.nobil.parser import fix_city_capitalization
+from evmap_backend.data_sources.nobil.source import NobilRealtimeDataSource
 
 
 def test_fix_city_capitalization():
@@ -14,3 +15,23 @@ def test_fix_city_capitalization():
     assert fix_city_capitalization("VANG PÅ HEDMARKEN") == "Vang på Hedmarken"
     assert fix_city_capitalization("MO I RANA") == "Mo i Rana"
     assert fix_city_capitalization("KRISTIANSAND S") == "Kristiansand S"
+
+
+class FakeWriter:
+    def __init__(self):
+        self.statuses = []
+
+    def put(self, status):
+        self.statuses.append(status)
+        return True
+
+
+def test_realtime_message_uses_index():
+    source = NobilRealtimeDataSource()
+    source.chargepoints._map = {("1234", "1"): 42}
+    source.writer = FakeWriter()
+
+    source._on_message({"nobilId": "NOR_01234", "evseUId": "1", "status": "CHARGING"})
+    source._on_message({"nobilId": "NOR_01234", "evseUId": "2", "status": "CHARGING"})
+
+    assert [s.chargepoint_id for s in source.writer.statuses] == [42]
@@ -0,0 +1,138 @@
+import datetime
+import json
+
+import pytest
+
+from evmap_backend.data_sources.models import UpdateState
+from evmap_backend.data_sources.ocpi.model import (
+    OcpiLocation,
+    OcpiLocationStatusOnly,
+)
+from evmap_backend.data_sources.ocpi.parser import OcpiParser
+from evmap_backend.data_sources.ocpi.source import (
+    BaseEcoMovementUkGroupDataSource,
+    group_by_token,
+)
+from evmap_backend.realtime.models import RealtimeStatus
+
+LOCATION = {
+    "id": "LOC1",
+    "name": "Test Location",
+    "address": "Test Street 1",
+    "city": "London",
+    "country": "GBR",
+    "coordinates": {"latitude": "51.5", "longitude": "-0.1"},
+    "time_zone": "Europe/London",
+    "last_updated": "2025-01-01T12:00:00Z",
+    "evses": [
+        {
+            "uid": "EVSE1",
+            "evse_id": "GB*ABC*E1",
+            "status": "CHARGING",
+            "last_updated": "2025-01-01T12:00:00",
+            "connectors": [
+                {
+                    "id": "1",
+                    "standard": "IEC_62196_T2_COMBO",
+                    "format": "CABLE",
+                    "power_type": "DC",
+                    "max_voltage": 400,
+                    "max_amperage": 125,
+                    "last_updated": "2025-01-01T12:00:00Z",
+                }
+            ],
+        },
+        {
+            "uid": "EVSE2",
+            "status": "SOMETHING_NEW",
+            "last_updated": "2025-01-01T12:00:00Z",
+        },
+    ],
+}
+
+
+def test_parse_locations_status_only():
+    # status-only parsing does not need any of the static fields
+    location = {
+        "id": "LOC1",
+        "evses": [{"uid": 1, "status": "AVAILABLE", "last_updated": "2025-01-01"}],
+    }
+    (parsed,) = OcpiParser().parse_locations([location], status_only=True)
+
+    assert type(parsed) is OcpiLocationStatusOnly
+    assert parsed.evses[0].status == "AVAILABLE"
+
+
+def test_parse_locations_full():
+    (parsed,) = OcpiParser().parse_locations([LOCATION])
+
+    assert type(parsed) is OcpiLocation
+    assert parsed.evses[0].connectors[0].max_power() == 50000
+
+
+def test_parse_statuses_from_bytes():
+    body = json.dumps({"data": [LOCATION]}).encode("utf-8")
+
+    (location,) = OcpiParser().parse_statuses(body)
+    items = list(location.convert_status("test_realtime", "test license"))
+
+    assert [item.chargepoint_id_from_source for item in items] == ["EVSE1", "EVSE2"]
+    assert items[0].site_id_from_source == "LOC1"
+    assert items[0].status.status == RealtimeStatus.Status.CHARGING
+    assert items[1].status.status == RealtimeStatus.Status.UNKNOWN
+    # naive timestamps are localized using the time zone of the location
+    assert items[0].status.timestamp == datetime.datetime(
+        2025, 1, 1, 12, tzinfo=datetime.timezone.utc
+    )
+    assert items[0].status.license_attribution_link == ""
+
+
+class FakeMember:
+    def __init__(self, id, token):
+        self.id = id
+        self.token = token
+
+
+def test_group_by_token():
+    a = FakeMember("a", "token_1")
+    b = FakeMember("b", "token_1")
+    c = FakeMember("c", "token_2")
+    d = FakeMember("d", None)
+
+    assert group_by_token([a, b, c, d]) == {"token_1": [a, b], "token_2": [c]}
+
+
+class FakeGroupDataSource(BaseEcoMovementUkGroupDataSource):
+    id = "fake_group"
+    license_attribution = ""
+    member_class = FakeMember
+
+    def __init__(self, members, failing_tokens):
+        self.members = members
+        self.failing_tokens = failing_tokens
+        self.synced = []
+
+    def get_members(self):
+        return self.members
+
+    def fetch(self, member, token):
+        if token in self.failing_tokens:
+            raise ConnectionError("fetch failed")
+        return [OcpiLocationStatusOnly(id=token)]
+
+    def sync(self, member, locations):
+        self.synced.append((member.id, [loc.id for loc in locations]))
+
+
+@pytest.mark.django_db
+def test_group_pull_isolates_fetch_errors():
+    a = FakeMember("a", "token_1")
+    b = FakeMember("b", "token_1")
+    c = FakeMember("c", "token_2")
+    source = FakeGroupDataSource([a, b, c], failing_tokens={"token_1"})
+
+    with pytest.raises(Exception, match="Failed to sync a, b"):
+        source.pull_data()
+
+    assert source.synced == [("c", ["token_2"])]
+    assert set(UpdateState.objects.values_list("data_source", flat=True)) == {"c"}
@@ -0,0 +1,128 @@
+import json
+import threading
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+
+from evmap_backend.data_sources.ocpi import utils
+from evmap_backend.data_sources.ocpi.utils import OcpiClient
+
+
+class FakeAdapter(BaseAdapter):
+    """Answers requests using a handler function instead of the network."""
+
+    def __init__(self, handler):
+        super().__init__()
+        self.handler = handler
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        with self.lock:
+            self.requests.append(request)
+        query = dict(parse_qsl(urlsplit(request.url).query))
+        status, headers, data = self.handler(request, query)
+
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        response._content = json.dumps(
+            {"data": data, "status_code": 1000, "status_message": "Success"}
+        ).encode("utf-8")
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def make_client(handler, **kwargs):
+    client = OcpiClient("token", **kwargs)
+    adapter = FakeAdapter(handler)
+    client.session.mount("https://", adapter)
+    return client, adapter
+
+
+ITEMS = list(range(95))
+
+
+def offset_page(query, page_size=10):
+    offset = int(query.get("offset", 0))
+    return ITEMS[offset : offset + page_size]
+
+
+def test_paginated_with_total_count():
+    def handler(request, query):
+        offset = int(query.get("offset", 0))
+        headers = {"X-Total-Count": str(len(ITEMS)), "X-Limit": "10"}
+        if offset + 10 < len(ITEMS):
+            headers["Link"] = (
+                f'<https://ocpi.test/locations?offset={offset + 10}&limit=10>; rel="next"'
+            )
+        return 200, headers, offset_page(query)
+
+    client, adapter = make_client(handler, prefetch=3)
+    assert list(client.get_paginated("https://ocpi.test/locations")) == ITEMS
+    assert len(adapter.requests) == 10
+
+
+def test_paginated_following_links():
+    def handler(request, query):
+        page = int(query.get("page", 0))
+        headers = {}
+        if page < 9:
+            headers["Link"] = (
+                f'<https://ocpi.test/locations?page={page + 1}>; rel="next"'
+            )
+        return 200, headers, ITEMS[page * 10 : page * 10 + 10]
+
+    client, adapter = make_client(handler)
+    assert list(client.get_paginated("https://ocpi.test/locations")) == ITEMS
+    assert len(adapter.requests) == 10
+
+
+def test_paginated_by_limit():
+    client, adapter = make_client(lambda request, query: (200, {}, offset_page(query)))
+    items = client.get_paginated("https://ocpi.test/locations", limit=10)
+    assert list(items) == ITEMS
+    assert len(adapter.requests) == 10
+
+
+def test_falls_back_to_unencoded_token():
+    def handler(request, query):
+        if request.headers["Authorization"] != "Token token":
+            return 401, {}, None
+        return 200, {}, ["ok"]
+
+    client, adapter = make_client(handler)
+    assert client.get("https://ocpi.test/versions") == ["ok"]
+    assert client.get("https://ocpi.test/versions") == ["ok"]
+    # the second request uses the unencoded token right away
+    assert len(adapter.requests) == 3
+
+
+def test_helpers_close_client(monkeypatch):
+    clients = []
+
+    class FakeClient(OcpiClient):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.session.mount(
+                "https://", FakeAdapter(lambda r, query: (200, {}, ITEMS))
+            )
+            self.closed = False
+            clients.append(self)
+
+        def close(self):
+            super().close()
+            self.closed = True
+
+    monkeypatch.setattr(utils, "OcpiClient", FakeClient)
+    assert utils.ocpi_get("https://ocpi.test/versions", "token") == ITEMS
+    assert clients[-1].closed
+
+    items = utils.ocpi_get_paginated("https://ocpi.test/locations", "token")
+    assert list(items) == ITEMS
+    assert clients[-1].closed
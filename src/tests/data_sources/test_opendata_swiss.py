@@ -1,9 +1,12 @@
 """Tests for the Opendata Swiss OICP parser."""
 
+import random
+
 import pytest
 
 from evmap_backend.chargers.models import Connector
 from evmap_backend.data_sources.opendata_swiss.parser import (
+    _CLUSTER_THRESHOLD,
     _convert_opening_hours,
     _get_station_name,
     _parse_connectors,
@@ -19,8 +22,9 @@ class TestParseCoordinates:
     def test_valid_coordinates(self):
         point = _parse_coordinates({"Google": "46.23432 6.055602"})
         assert point is not None
-        assert point.y == pytest.approx(46.23432)
-        assert point.x == pytest.approx(6.055602)
+        lng, lat = point
+        assert lat == pytest.approx(46.23432)
+        assert lng == pytest.approx(6.055602)
 
     def test_invalid_format(self):
         assert _parse_coordinates({"Google": "None None"}) is None
@@ -95,6 +99,38 @@ class TestSiteClusterer:
         for _ in range(10):
             assert c.get_cluster_key("OP", "Op", "46.23432 6.055602") == first
 
+    def test_same_keys_as_linear_scan(self):
+        """The grid index returns the first matching leader, like a linear scan."""
+
+        def linear_scan(records):
+            leaders = {}
+            for op, lat, lng in records:
+                for leader_lat, leader_lng, key in leaders.setdefault(op, []):
+                    if (
+                        abs(lat - leader_lat) < _CLUSTER_THRESHOLD
+                        and abs(lng - leader_lng) < _CLUSTER_THRESHOLD
+                    ):
+                        yield key
+                        break
+                else:
+                    key = f"{lat:.6f} {lng:.6f}"
+                    leaders[op].append((lat, lng, key))
+                    yield key
+
+        rng = random.Random(42)
+        # dense enough that many records are close to several leaders
+        records = [
+            (
+                rng.choice(["OP1", "OP2"]),
+                round(47 + rng.uniform(0, 0.01), 6),
+                round(8 + rng.uniform(0, 0.01), 6),
+            )
+            for _ in range(2000)
+        ]
+        c = _SiteClusterer()
+        keys = [c.get_cluster_key(op, op, f"{lat} {lng}") for op, lat, lng in records]
+        assert keys == list(linear_scan(records))
+
 
 class TestGetStationName:
     def test_prefer_english(self):
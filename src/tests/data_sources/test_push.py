@@ -0,0 +1,80 @@
+import gzip
+import io
+from contextlib import contextmanager
+
+import pytest
+from django.db import OperationalError
+
+from evmap_backend.data_sources import tasks
+from evmap_backend.data_sources.push import (
+    newer_push_exists,
+    open_push,
+    spool_push,
+)
+
+
+def test_spool_push_roundtrip(settings, tmp_path):
+    settings.DATA_DIR = tmp_path
+    payload = b"<payload>" * 1000
+
+    path = spool_push("test", io.BytesIO(payload), compressed=False)
+    assert path.parent == tmp_path / "push" / "test"
+    with open_push(path) as f:
+        assert f.read() == payload
+
+    path = spool_push("test", io.BytesIO(gzip.compress(payload)), compressed=True)
+    assert path.suffix == ".gz"
+    with open_push(path) as f:
+        assert f.read() == payload
+
+    # no temporary files are left behind
+    assert sorted(p.suffix for p in path.parent.iterdir()) == [".gz", ".raw"]
+
+
+def test_newer_push_exists(settings, tmp_path):
+    settings.DATA_DIR = tmp_path
+
+    first = spool_push("test", io.BytesIO(b"first"), compressed=False)
+    assert not newer_push_exists(first)
+
+    second = spool_push("test", io.BytesIO(b"second"), compressed=False)
+    assert newer_push_exists(first)
+    assert not newer_push_exists(second)
+
+    # payloads of other data sources are not considered
+    spool_push("other", io.BytesIO(b"other"), compressed=False)
+    assert not newer_push_exists(second)
+
+
+class FailingSource:
+    id = "test"
+    coalesce_pushes = False
+
+    def __init__(self, error):
+        self.error = error
+
+    def process_push(self, body):
+        raise self.error
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "error, kept",
+    [(ValueError("invalid payload"), False), (OperationalError("db down"), True)],
+)
+def test_failed_push_kept_for_reprocessing(
+    settings, tmp_path, monkeypatch, error, kept
+):
+    settings.DATA_DIR = tmp_path
+
+    @contextmanager
+    def exclusive(name, wait=False):
+        yield True
+
+    monkeypatch.setattr(tasks, "exclusive", exclusive)
+    monkeypatch.setattr(tasks, "get_data_source", lambda id: FailingSource(error))
+
+    path = spool_push("test", io.BytesIO(b"payload"), compressed=False)
+    with pytest.raises(type(error)):
+        tasks.process_push("test", str(path), 0)
+    assert path.exists() == kept
@@ -0,0 +1,39 @@
+import time
+from types import SimpleNamespace
+
+from celery.app.task import Context
+
+from evmap_backend.celery import add_enqueued_at, record_queue_lag
+from evmap_backend.data_sources import REALTIME_QUEUE
+from evmap_backend.helpers import metrics
+
+
+def test_queue_lag_recorded():
+    metrics.reset()
+    task = SimpleNamespace(
+        request=Context(
+            enqueued_at=time.time() - 5,
+            delivery_info={"routing_key": REALTIME_QUEUE},
+        )
+    )
+    try:
+        record_queue_lag(task=task)
+        # tasks published without the header are not timed
+        record_queue_lag(task=SimpleNamespace(request=Context()))
+
+        values = metrics.snapshot()
+        assert values[f"celery.{REALTIME_QUEUE}.lag.count"] == 1
+        assert 5 <= values[f"celery.{REALTIME_QUEUE}.lag.max"] < 60
+    finally:
+        metrics.reset()
+
+
+def test_enqueued_at_header():
+    headers = {}
+    add_enqueued_at(headers=headers)
+    assert isinstance(headers["enqueued_at"], float)
+
+    # existing timestamps are kept
+    existing = {"enqueued_at": 1.0}
+    add_enqueued_at(headers=existing)
+    assert existing["enqueued_at"] == 1.0
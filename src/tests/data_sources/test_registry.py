@@ -0,0 +1,25 @@
+import pytest
+
+from evmap_backend.data_sources.registry import (
+    DATA_SOURCES,
+    get_data_source,
+    get_data_source_class,
+    iter_data_source_classes,
+)
+
+
+def test_registered_paths_match_ids():
+    classes = list(iter_data_source_classes())
+    assert [cls.id for cls in classes] == list(DATA_SOURCES)
+
+
+def test_class_is_cached():
+    assert get_data_source_class("goingelectric") is get_data_source_class(
+        "goingelectric"
+    )
+    assert get_data_source("goingelectric").id == "goingelectric"
+
+
+def test_unknown_source():
+    with pytest.raises(ValueError):
+        get_data_source("unknown")
@@ -0,0 +1,37 @@
+import pytest
+
+from evmap_backend.data_sources.models import SyncRun
+from evmap_backend.data_sources.runs import db_timer, record_run_stats, track_run
+
+
+def test_stats_outside_of_run_are_ignored():
+    record_run_stats(sites_created=1)
+
+
+@pytest.mark.django_db
+def test_track_run():
+    with track_run("test_source", SyncRun.Kind.PULL) as run:
+        record_run_stats(sites_created=2, sites_unchanged=5)
+        record_run_stats(sites_updated=1, statuses_created=3, statuses_suppressed=4)
+        with db_timer():
+            pass
+
+    assert run.changes == 6
+    run = SyncRun.objects.get(data_source="test_source")
+    assert run.kind == SyncRun.Kind.PULL
+    assert (run.sites_created, run.sites_updated, run.sites_unchanged) == (2, 1, 5)
+    assert (run.statuses_created, run.statuses_suppressed) == (3, 4)
+    assert run.finished_at >= run.started_at
+    assert run.db_time > 0
+    assert run.duration == pytest.approx(run.db_time + run.parse_time)
+    assert run.error == ""
+
+
+@pytest.mark.django_db
+def test_track_run_records_error():
+    with pytest.raises(ValueError):
+        with track_run("test_source", SyncRun.Kind.PUSH):
+            raise ValueError("sync failed")
+
+    run = SyncRun.objects.get(data_source="test_source")
+    assert run.error == "ValueError: sync failed"
@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta, timezone
+
+from celery.beat import Scheduler, Service
+from celery.signals import beat_init
+
+from evmap_backend.celery import app
+from evmap_backend.data_sources.models import UpdateState
+from evmap_backend.data_sources.opendata_swiss.source import (
+    OpendataSwissRealtimeDataSource,
+)
+from evmap_backend.data_sources.schedule import (
+    is_due,
+    next_sync_interval,
+)
+
+MIN = timedelta(minutes=1)
+MAX = timedelta(minutes=35)
+NOW = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def test_next_sync_interval():
+    interval = timedelta(minutes=5)
+
+    # unchanged feeds back off up to the maximum
+    assert next_sync_interval(interval, 0, 1000, MIN, MAX) == timedelta(minutes=7.5)
+    for _ in range(10):
+        interval = next_sync_interval(interval, 0, 1000, MIN, MAX)
+    assert interval == MAX
+
+    # feeds with a moderate share of changes keep their interval
+    assert next_sync_interval(interval, 5, 1000, MIN, MAX) == MAX
+
+    # busy feeds speed up down to the minimum
+    assert next_sync_interval(interval, 30, 1000, MIN, MAX) == MAX / 2
+    for _ in range(10):
+        interval = next_sync_interval(interval, 30, 1000, MIN, MAX)
+    assert interval == MIN
+
+
+def simulate(interval, sites, changes_per_minute, pulls=100):
+    """Pull a feed with a steady rate of changes and return the intervals."""
+    elapsed = 0.0
+    intervals = []
+    for _ in range(pulls):
+        minutes = interval.total_seconds() / 60
+        changes = int((elapsed + minutes) * changes_per_minute) - int(
+            elapsed * changes_per_minute
+        )
+        elapsed += minutes
+        interval = next_sync_interval(interval, changes, sites, MIN, MAX)
+        intervals.append(interval)
+    return intervals
+
+
+def test_trickle_of_changes_backs_off():
+    # a static feed of 10000 sites where one site changes every five minutes
+    intervals = simulate(timedelta(minutes=5), 10000, 0.2)
+    assert intervals[-1] == MAX
+    assert min(intervals) == timedelta(minutes=7.5)
+
+
+def test_busy_feed_settles_at_short_interval():
+    # a realtime feed of 5000 chargepoints of which 25 change status per minute
+    intervals = simulate(MAX, 5000, 25)
+    assert max(intervals[-50:]) <= timedelta(minutes=2)
+
+
+def test_is_due():
+    source = OpendataSwissRealtimeDataSource
+    assert is_due(source, None, NOW)
+
+    state = UpdateState(
+        data_source=source.id,
+        push=False,
+        last_update=NOW - timedelta(minutes=10),
+        sync_interval=timedelta(minutes=15),
+    )
+    assert not is_due(source, state, NOW)
+    # runs triggered slightly before the interval has passed are not delayed
+    assert is_due(
+        source, state, NOW + timedelta(minutes=5) - source.min_sync_interval / 2
+    )
+
+
+def test_sync_interval_bounds():
+    source = OpendataSwissRealtimeDataSource
+    assert source.min_sync_interval == MIN
+    assert source.max_sync_interval == MAX
+
+
+def test_beat_schedule_set_up_in_beat():
+    # workers finalize the app without building the schedule
+    app.finalize()
+    assert "prune-sync-runs" not in app.conf.beat_schedule
+
+    service = Service(app, scheduler_cls=Scheduler)
+    try:
+        beat_init.send(sender=service)
+        assert "prune-sync-runs" in service.scheduler.schedule
+        assert (
+            f"pull-{OpendataSwissRealtimeDataSource.id}" in service.scheduler.schedule
+        )
+    finally:
+        app.conf.beat_schedule.clear()
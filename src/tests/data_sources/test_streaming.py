@@ -0,0 +1,116 @@
+import asyncio
+
+from evmap_backend.data_sources.streaming import (
+    BaseStreamingDataSource,
+    StatusWriter,
+    _run_with_reconnect,
+)
+from evmap_backend.realtime.models import RealtimeStatus
+
+
+class FlakySource(BaseStreamingDataSource):
+    id = "flaky_realtime"
+    license_attribution = ""
+    license_attribution_link = ""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+        self.attempts = 0
+        self.connected = asyncio.Event()
+
+    def _load_chargepoints(self):
+        return []
+
+    async def connect(self):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise ConnectionError("connection refused")
+        self.connected.set()
+        await asyncio.Event().wait()
+
+
+def test_reconnects_after_failures():
+    source = FlakySource(failures=2)
+
+    async def run():
+        task = asyncio.create_task(
+            _run_with_reconnect(
+                source, stale_timeout=60, min_backoff=0.01, max_backoff=0.05
+            )
+        )
+        await asyncio.wait_for(source.connected.wait(), timeout=5)
+        task.cancel()
+
+    asyncio.run(run())
+    assert source.attempts == 3
+
+
+def test_reconnects_stale_connection():
+    source = FlakySource(failures=0)
+
+    async def run():
+        task = asyncio.create_task(
+            _run_with_reconnect(
+                source, stale_timeout=0.05, min_backoff=0.01, max_backoff=0.05
+            )
+        )
+        while source.attempts < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5))
+    assert source.attempts >= 2
+
+
+class IndexedSource(BaseStreamingDataSource):
+    id = "indexed_realtime"
+    license_attribution = ""
+    license_attribution_link = ""
+
+    def _load_chargepoints(self):
+        return [("A", 1), ("B", 2)]
+
+    async def connect(self):
+        pass
+
+
+def make_source(max_queue_size=100):
+    source = IndexedSource()
+    source.chargepoints.refresh()
+    source.writer = StatusWriter(max_queue_size=max_queue_size)
+    source.writer.on_failure(source.id, source._forget_statuses)
+    return source
+
+
+def test_dropped_status_not_cached():
+    source = make_source(max_queue_size=1)
+    source._handle_status("A", "AVAILABLE")
+    # the queue is full, so the status is dropped
+    source._handle_status("B", "AVAILABLE")
+
+    assert source.latest_statuses == {1: RealtimeStatus.Status.AVAILABLE}
+
+
+def test_unchanged_status_suppressed():
+    source = make_source()
+    source._handle_status("A", "AVAILABLE")
+    source._handle_status("A", "AVAILABLE")
+    source._handle_status("A", "CHARGING")
+
+    assert source.writer.queue_size == 2
+    source.writer._drain_suppressed()
+    assert source.writer._runs[source.id].statuses_suppressed == 1
+
+
+def test_failed_statuses_forgotten():
+    source = make_source()
+    source._handle_status("A", "AVAILABLE")
+    source._handle_status("B", "AVAILABLE")
+    failed = [source.writer._queue.get_nowait(), source.writer._queue.get_nowait()]
+    # a newer status of B arrived in the meantime
+    source._handle_status("B", "CHARGING")
+
+    source._forget_statuses(failed)
+
+    assert source.latest_statuses == {2: RealtimeStatus.Status.CHARGING}
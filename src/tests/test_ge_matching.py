@@ -2,16 +2,20 @@
 Tests for GoingElectric matching algorithm.
 """
 
+import random
+
 import pytest
 from django.contrib.gis.geos import Point
 
+from evmap_backend.chargers.conflation import power_matches, score_distance
 from evmap_backend.chargers.models import Chargepoint, ChargingSite, Connector, Network
 from evmap_backend.data_sources.goingelectric.matching import (
-    _power_matches,
     _score_chargepoints,
-    _score_distance,
     _score_network,
     match_ge_locations,
+    match_ge_locations_incremental,
+    score_candidates,
+    score_match,
 )
 from evmap_backend.data_sources.goingelectric.models import (
     GoingElectricChargeLocation,
@@ -108,37 +112,37 @@ def _create_connector(site, connector_type, max_power_w):
 
 class TestScoreDistance:
     def test_zero_distance(self):
-        assert _score_distance(0.0, 200.0) == 1.0
+        assert score_distance(0.0, 200.0) == 1.0
 
     def test_max_distance(self):
-        assert _score_distance(200.0, 200.0) == 0.0
+        assert score_distance(200.0, 200.0) == 0.0
 
     def test_half_distance(self):
-        assert _score_distance(100.0, 200.0) == pytest.approx(0.5)
+        assert score_distance(100.0, 200.0) == pytest.approx(0.5)
 
     def test_over_max_distance(self):
-        assert _score_distance(300.0, 200.0) == 0.0
+        assert score_distance(300.0, 200.0) == 0.0
 
 
 class TestPowerMatches:
     def test_equal_power(self):
-        assert _power_matches(22000, 22000) is True
+        assert power_matches(22000, 22000) is True
 
     def test_11kw_vs_22kw(self):
         """Key real-world case: 11kW at GE, 22kW at other source."""
-        assert _power_matches(11000, 22000) is True
+        assert power_matches(11000, 22000) is True
 
     def test_22kw_vs_11kw(self):
-        assert _power_matches(22000, 11000) is True
+        assert power_matches(22000, 11000) is True
 
     def test_too_far_apart(self):
         """50kW vs 150kW should not match (ratio > 2)."""
-        assert _power_matches(50000, 150000) is False
+        assert power_matches(50000, 150000) is False
 
     def test_zero_power(self):
         """Zero power should not penalize."""
-        assert _power_matches(0, 22000) is True
-        assert _power_matches(22000, 0) is True
+        assert power_matches(0, 22000) is True
+        assert power_matches(22000, 0) is True
 
 
 class TestScoreNetwork:
@@ -243,6 +247,81 @@ class TestScoreChargepoints:
         assert _score_chargepoints([ge_cp], [site_conn]) == 0.0
 
 
+class TestScoreCandidates:
+    @pytest.mark.parametrize("chunk_size", [10_000, 7])
+    def test_same_scores_as_score_match(self, monkeypatch, chunk_size):
+        """Vectorized scores are identical to those of score_match."""
+        monkeypatch.setattr(
+            "evmap_backend.data_sources.goingelectric.matching.SCORE_CHUNK_SIZE",
+            chunk_size,
+        )
+        rng = random.Random(42)
+        ge_types = list(GoingElectricChargepoint.ConnectorTypes)
+        site_types = list(Connector.ConnectorTypes)
+        powers = [0.0, 3.7, 11.0, 22.0, 50.0, 150.0, 300.0]
+        network_mapping = {1: {10}, 2: {20, 21}, 3: set()}
+        networks = [None, 1, 2, 3, 4]
+        site_networks = [None, 10, 20, 21, 30]
+
+        ge_chargepoints = {
+            ge_id: [
+                GoingElectricChargepoint(
+                    type=rng.choice(ge_types), power=rng.choice(powers), count=1
+                )
+                for _ in range(rng.randint(0, 3))
+            ]
+            for ge_id in range(50)
+        }
+        connectors = {
+            site_id: [
+                Connector(
+                    connector_type=rng.choice(site_types),
+                    max_power=rng.choice(powers) * 1000,
+                )
+                for _ in range(rng.randint(0, 4))
+            ]
+            for site_id in range(50)
+        }
+        ge_network_by_id = {ge_id: rng.choice(networks) for ge_id in range(50)}
+        pairs = [
+            (
+                rng.randrange(50),
+                rng.randrange(50),
+                rng.uniform(0, 250),
+                rng.choice(site_networks),
+            )
+            for _ in range(2000)
+        ]
+
+        scores = score_candidates(
+            [ge_id for ge_id, _, _, _ in pairs],
+            [site_id for _, site_id, _, _ in pairs],
+            distances=[distance for _, _, distance, _ in pairs],
+            ge_network_ids=[ge_network_by_id[ge_id] for ge_id, _, _, _ in pairs],
+            site_network_ids=[network for _, _, _, network in pairs],
+            network_mapping=network_mapping,
+            ge_chargepoints_by_location=ge_chargepoints,
+            connectors_by_site=connectors,
+        )
+
+        expected = [
+            score_match(
+                distance_m=distance,
+                ge_network_id=ge_network_by_id[ge_id],
+                site_network_id=site_network_id,
+                network_mapping=network_mapping,
+                ge_chargepoints=ge_chargepoints[ge_id],
+                site_connectors=connectors[site_id],
+            )
+            for ge_id, site_id, distance, site_network_id in pairs
+        ]
+        assert scores.tolist() == expected
+
+    def test_no_candidates(self):
+        scores = score_candidates([], [], [], [], [], {}, {}, {})
+        assert scores.tolist() == []
+
+
 # --- Integration tests for match_ge_locations ---
 
 
@@ -516,3 +595,78 @@ class TestMatchGeLocations:
 
         ge_loc.refresh_from_db()
         assert ge_loc.matched_site is None
+
+
+@pytest.mark.django_db(transaction=True)
+class TestMatchGeLocationsIncremental:
+    def _matches(self):
+        return dict(
+            GoingElectricChargeLocation.objects.values_list("id", "matched_site_id")
+        )
+
+    def test_moved_location_frees_site(self, base_location):
+        """A competitor of a moved GE location takes over its site, as in a full run."""
+        site = _create_charging_site("s1", base_location)
+        _create_connector(site, Connector.ConnectorTypes.TYPE_2, 22000)
+        ge_loc1 = _create_ge_location(1, base_location)
+        _create_ge_chargepoint(
+            ge_loc1, GoingElectricChargepoint.ConnectorTypes.TYPE_2, 22.0
+        )
+        ge_loc2 = _create_ge_location(2, _offset_point(base_location, 50))
+        _create_ge_chargepoint(
+            ge_loc2, GoingElectricChargepoint.ConnectorTypes.TYPE_2, 22.0
+        )
+        match_ge_locations()
+        assert self._matches() == {1: site.id, 2: None}
+
+        ge_loc1.coordinates = _offset_point(base_location, 5000)
+        ge_loc1.save()
+        match_ge_locations_incremental(ge_ids=[1])
+        incremental = self._matches()
+
+        match_ge_locations()
+        assert incremental == self._matches() == {1: None, 2: site.id}
+
+    def test_deleted_site(self, base_location):
+        """GE locations whose site was deleted are re-matched."""
+        site = _create_charging_site("s1", base_location)
+        ge_loc = _create_ge_location(1, base_location)
+        match_ge_locations()
+        ge_loc.refresh_from_db()
+        assert ge_loc.matched_site == site
+
+        site.delete()
+        new_site = _create_charging_site("s2", _offset_point(base_location, 20))
+        match_ge_locations_incremental(site_ids=[new_site.id])
+
+        ge_loc.refresh_from_db()
+        assert ge_loc.matched_site == new_site
+
+    def test_unrelated_locations_untouched(self, base_location):
+        """Matches outside of the changed region are not rewritten."""
+        site = _create_charging_site("s1", base_location)
+        _create_ge_location(1, base_location)
+        far_site = _create_charging_site("s2", _offset_point(base_location, 5000))
+        far_loc = _create_ge_location(2, _offset_point(base_location, 5000))
+        match_ge_locations()
+
+        GoingElectricChargeLocation.objects.filter(id=2).update(match_confidence=0.99)
+        match_ge_locations_incremental(site_ids=[site.id])
+
+        far_loc.refresh_from_db()
+        assert far_loc.matched_site == far_site
+        assert far_loc.match_confidence == 0.99
+
+    def test_large_region_matched_in_full(self, base_location, monkeypatch):
+        monkeypatch.setattr(
+            "evmap_backend.data_sources.goingelectric.matching.FULL_MATCH_THRESHOLD", 1
+        )
+        site = _create_charging_site("s1", base_location)
+        _create_ge_location(1, base_location)
+        far_site = _create_charging_site("s2", _offset_point(base_location, 5000))
+        _create_ge_location(2, _offset_point(base_location, 5000))
+
+        # the region of s1 exceeds the limit, so the far away location is matched too
+        match_ge_locations_incremental(site_ids=[site.id])
+
+        assert self._matches() == {1: site.id, 2: far_site.id}
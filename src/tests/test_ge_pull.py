@@ -0,0 +1,120 @@
+"""
+Tests for the bulk sync of GoingElectric locations.
+"""
+
+import copy
+
+import pytest
+
+from evmap_backend.data_sources.goingelectric.models import (
+    GoingElectricChargeLocation,
+    GoingElectricChargepoint,
+    GoingElectricNetwork,
+)
+from evmap_backend.data_sources.goingelectric.source import _sync_page
+
+
+def make_location(ge_id, network="TestNetwork", chargepoints=None):
+    return {
+        "ge_id": ge_id,
+        "name": f"Location {ge_id}",
+        "coordinates": {"lat": 50.0, "lng": 10.0 + ge_id / 1000},
+        "address": {
+            "city": "Berlin",
+            "country": "Deutschland",
+            "postcode": None,
+            "street": "Hauptstraße 1",
+        },
+        "network": network,
+        "url": f"//www.goingelectric.de/stromtankstellen/{ge_id}/",
+        "fault_report": False,
+        "verified": True,
+        "chargepoints": (
+            chargepoints
+            if chargepoints is not None
+            else [{"type": "Typ2", "power": 22, "count": 2}]
+        ),
+    }
+
+
+@pytest.mark.django_db
+class TestSyncPage:
+    def test_create(self):
+        locations = [
+            make_location(1),
+            make_location(2),
+            make_location(3, network=None, chargepoints=[]),
+        ]
+        created, changed, rematch = _sync_page(locations, {})
+
+        assert created == 3
+        assert changed == rematch == {1, 2, 3}
+        assert GoingElectricNetwork.objects.count() == 1
+        location = GoingElectricChargeLocation.objects.get(id=1)
+        assert location.network.name == "TestNetwork"
+        assert location.address_postcode == ""
+        assert GoingElectricChargeLocation.objects.get(id=3).network is None
+        assert GoingElectricChargepoint.objects.filter(chargelocation_id=1).count() == 1
+
+    def test_unchanged(self):
+        locations = [make_location(1), make_location(2)]
+        _sync_page(copy.deepcopy(locations), {})
+        chargepoint_ids = set(
+            GoingElectricChargepoint.objects.values_list("id", flat=True)
+        )
+
+        created, changed, rematch = _sync_page(copy.deepcopy(locations), {})
+
+        assert created == 0
+        assert changed == rematch == set()
+        assert (
+            set(GoingElectricChargepoint.objects.values_list("id", flat=True))
+            == chargepoint_ids
+        )
+
+    def test_changed(self):
+        network_ids = {}
+        _sync_page([make_location(1), make_location(2)], network_ids)
+
+        updated = make_location(1, network="OtherNetwork")
+        updated["name"] = "Renamed"
+        new_chargepoints = [
+            {"type": "CCS", "power": 150, "count": 1},
+            {"type": "Typ2", "power": 22, "count": 2},
+        ]
+        created, changed, rematch = _sync_page(
+            [updated, make_location(2, chargepoints=new_chargepoints)], network_ids
+        )
+
+        assert created == 0
+        assert changed == rematch == {1, 2}
+        location = GoingElectricChargeLocation.objects.get(id=1)
+        assert location.name == "Renamed"
+        assert location.network.name == "OtherNetwork"
+        assert set(
+            GoingElectricChargepoint.objects.filter(chargelocation_id=2).values_list(
+                "type", "power", "count"
+            )
+        ) == {("CCS", 150, 1), ("Typ2", 22, 2)}
+
+    def test_text_change_not_rematched(self):
+        _sync_page([make_location(1), make_location(2)], {})
+
+        renamed = make_location(1)
+        renamed["name"] = "Renamed"
+        moved = make_location(2)
+        moved["coordinates"]["lat"] = 50.1
+        created, changed, rematch = _sync_page([renamed, moved], {})
+
+        assert changed == {1, 2}
+        assert rematch == {2}
+
+    def test_existing_network_reused(self):
+        network = GoingElectricNetwork.objects.create(name="TestNetwork")
+        _sync_page([make_location(1)], {})
+        assert GoingElectricChargeLocation.objects.get(id=1).network == network
+
+    def test_duplicate_location_in_page(self):
+        created, changed, rematch = _sync_page([make_location(1), make_location(1)], {})
+        assert created == 1
+        assert GoingElectricChargepoint.objects.count() == 1
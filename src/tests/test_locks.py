@@ -0,0 +1,95 @@
+"""
+Tests for the distributed locks, using an in-process stand-in for the Redis client.
+"""
+
+import threading
+from collections import defaultdict
+
+import pytest
+
+from evmap_backend.data_sources import tasks
+from evmap_backend.helpers import metrics
+from evmap_backend.helpers.locks import exclusive
+
+
+class FakeLock:
+    def __init__(self, locks, name):
+        self._lock = locks[name]
+
+    def acquire(self, blocking=True):
+        return self._lock.acquire(blocking)
+
+    def reacquire(self):
+        pass
+
+    def release(self):
+        self._lock.release()
+
+
+class FakeRedis:
+    def __init__(self):
+        self.locks = defaultdict(threading.Lock)
+
+    def lock(self, name, timeout, thread_local=True):
+        return FakeLock(self.locks, name)
+
+
+@pytest.fixture(autouse=True)
+def fake_redis(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr("evmap_backend.helpers.locks.get_redis", lambda: redis)
+    metrics.reset()
+    yield redis
+    metrics.reset()
+
+
+@pytest.fixture
+def pulls(monkeypatch):
+    pulled = []
+    monkeypatch.setattr(tasks, "_pull_data_source", pulled.append)
+    return pulled
+
+
+def test_pull_skipped_while_locked(pulls):
+    with exclusive("pull:test_source") as acquired:
+        assert acquired
+        tasks.pull_data_source("test_source")
+    assert pulls == []
+    assert metrics.snapshot()["pull.test_source.skipped"] == 1
+
+    tasks.pull_data_source("test_source")
+    assert pulls == ["test_source"]
+
+
+def test_lock_released_on_exception(monkeypatch):
+    with pytest.raises(RuntimeError):
+        with exclusive("job"):
+            raise RuntimeError("failed")
+    with exclusive("job") as acquired:
+        assert acquired
+
+    def fail(source_id):
+        raise RuntimeError("pull failed")
+
+    monkeypatch.setattr(tasks, "_pull_data_source", fail)
+    with pytest.raises(RuntimeError):
+        tasks.pull_data_source("test_source")
+    with exclusive("pull:test_source") as acquired:
+        assert acquired
+
+
+def test_wait_blocks_until_released():
+    entered = threading.Event()
+
+    def wait_for_lock():
+        with exclusive("job", wait=True) as acquired:
+            assert acquired
+            entered.set()
+
+    with exclusive("job"):
+        thread = threading.Thread(target=wait_for_lock)
+        thread.start()
+        assert not entered.wait(0.2)
+
+    assert entered.wait(5)
+    thread.join()
@@ -4,11 +4,16 @@ Tests for the sync_chargers bulk operations.
 
 import pytest
 
-from evmap_backend.chargers.models import Chargepoint, ChargingSite, Connector
+from evmap_backend.chargers.models import Chargepoint, ChargingSite, Connector, Network
+from evmap_backend.data_sources.signals import sites_changed
 from evmap_backend.data_sources.sync import (
     ChargepointItem,
+    ChargepointRecord,
     ChargingSiteItem,
+    ConnectorRecord,
+    SiteRecord,
     sync_chargers,
+    to_models,
 )
 
 
@@ -205,6 +210,57 @@ class TestSyncChargers:
             chargepoint=saved_cp, id_from_source="conn_2"
         ).exists()
 
+    def test_sync_sends_changed_sites(
+        self, data_source, create_site, create_chargepoint, create_connector
+    ):
+        """Test that sites_changed is sent with created, changed and deleted sites."""
+        received = []
+
+        def receiver(sender, site_ids, **kwargs):
+            received.append(set(site_ids))
+
+        sites_changed.connect(receiver)
+        try:
+            sync_chargers(
+                data_source,
+                [
+                    site_item(
+                        create_site(f"site_{i}"), [(create_chargepoint("cp"), [])]
+                    )
+                    for i in range(3)
+                ],
+            )
+            ids = dict(ChargingSite.objects.values_list("id_from_source", "id"))
+            assert received == [set(ids.values())]
+
+            # site_0 unchanged, site_1 with a new connector, site_2 deleted
+            sync_chargers(
+                data_source,
+                [
+                    site_item(create_site("site_0"), [(create_chargepoint("cp"), [])]),
+                    site_item(
+                        create_site("site_1"),
+                        [(create_chargepoint("cp"), [create_connector("conn_1")])],
+                    ),
+                ],
+            )
+            assert received[1] == {ids["site_1"], ids["site_2"]}
+
+            # nothing changed
+            sync_chargers(
+                data_source,
+                [
+                    site_item(create_site("site_0"), [(create_chargepoint("cp"), [])]),
+                    site_item(
+                        create_site("site_1"),
+                        [(create_chargepoint("cp"), [create_connector("conn_1")])],
+                    ),
+                ],
+            )
+            assert len(received) == 2
+        finally:
+            sites_changed.disconnect(receiver)
+
     def test_sync_multiple_chargepoints_per_site(
         self, data_source, create_site, create_chargepoint, create_connector
     ):
@@ -369,3 +425,116 @@ class TestSyncChargers:
 
         assert ChargingSite.objects.count() == 1
         assert ChargingSite.objects.filter(data_source="source_2").count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSyncNetworks:
+    def test_networks_created_and_reused(
+        self, data_source, create_site, create_chargepoint
+    ):
+        """Test that networks are created once per operator ID and reused."""
+        existing = Network.objects.create(evse_operator_id="DEABC", name="ABC")
+        items = []
+        for i, operator_id in enumerate(["DEABC", "DEXYZ", "DEXYZ", None]):
+            item = site_item(create_site(f"site_{i}"), [(create_chargepoint("cp"), [])])
+            item.network_operator_id = operator_id
+            item.network_name = f"Network {i}"
+            items.append(item)
+
+        sync_chargers(data_source, items)
+
+        sites = {
+            s.id_from_source: s
+            for s in ChargingSite.objects.filter(data_source=data_source)
+        }
+        assert sites["site_0"].network_id == existing.id
+        assert sites["site_1"].network_id == sites["site_2"].network_id
+        assert sites["site_3"].network_id is None
+
+        created = Network.objects.get(evse_operator_id="DEXYZ")
+        assert created.name == "Network 1"
+        assert Network.objects.get(evse_operator_id="DEABC").name == "ABC"
+
+    def test_deleted_network_not_reused(
+        self, data_source, create_site, create_chargepoint
+    ):
+        """Test that networks deleted between syncs are recreated."""
+        item = site_item(create_site("site_1"), [(create_chargepoint("cp"), [])])
+        item.network_operator_id = "DEABC"
+        sync_chargers(data_source, [item])
+        Network.objects.all().delete()
+
+        item = site_item(create_site("site_1"), [(create_chargepoint("cp"), [])])
+        item.network_operator_id = "DEABC"
+        sync_chargers(data_source, [item])
+
+        site = ChargingSite.objects.get(data_source=data_source)
+        assert site.network.evse_operator_id == "DEABC"
+
+    def test_unnormalized_operator_ids(
+        self, data_source, create_site, create_chargepoint
+    ):
+        """Test that operator IDs with separators match their normalized networks."""
+        existing = Network.objects.create(evse_operator_id="DEABC", name="ABC")
+        items = []
+        for i, operator_id in enumerate(["de*abc", "DE*XYZ", "DEXYZ"]):
+            item = site_item(create_site(f"site_{i}"), [(create_chargepoint("cp"), [])])
+            item.network_operator_id = operator_id
+            items.append(item)
+
+        sync_chargers(data_source, items)
+
+        sites = {
+            s.id_from_source: s
+            for s in ChargingSite.objects.filter(data_source=data_source)
+        }
+        assert sites["site_0"].network_id == existing.id
+        assert sites["site_1"].network_id == sites["site_2"].network_id
+        assert Network.objects.filter(evse_operator_id="DEXYZ").count() == 1
+
+
+def record_item():
+    return ChargingSiteItem(
+        site=SiteRecord(
+            id_from_source="site_1",
+            name="Site 1",
+            location=(13.4, 52.5),
+            country="DE",
+        ),
+        chargepoints=[
+            ChargepointItem(
+                chargepoint=ChargepointRecord("cp_1", evseid="DEABCE1"),
+                connectors=[
+                    ConnectorRecord(Connector.ConnectorTypes.CCS_TYPE_2, 150000.0),
+                    ConnectorRecord(Connector.ConnectorTypes.TYPE_2, 22000.0),
+                ],
+            )
+        ],
+    )
+
+
+def test_records_converted_to_models():
+    item = to_models(record_item())
+
+    assert isinstance(item.site, ChargingSite)
+    assert (item.site.location.x, item.site.location.y) == (13.4, 52.5)
+    assert item.site.country == "DE"
+    cp_item = item.chargepoints[0]
+    assert isinstance(cp_item.chargepoint, Chargepoint)
+    assert cp_item.chargepoint.evseid == "DEABCE1"
+    assert [c.max_power for c in cp_item.connectors] == [150000.0, 22000.0]
+    assert all(isinstance(c, Connector) for c in cp_item.connectors)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sync_records(data_source):
+    """Test that records are synced like model instances."""
+    sync_chargers(data_source, [record_item()])
+    sync_chargers(data_source, [record_item()])
+
+    site = ChargingSite.objects.get(data_source=data_source)
+    assert site.name == "Site 1"
+    assert site.location.x == pytest.approx(13.4)
+    chargepoint = Chargepoint.objects.get(site=site)
+    assert chargepoint.evseid == "DEABCE1"
+    assert chargepoint.connectors.count() == 2